@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Adaptive sampling of AI platform answers
+AI answers vary from one request to the next, so a single answer per
+keyword and platform gives a noisy mention rate, and querying every cell N
+times multiplies cost. Bootstrap confidence intervals are computed for all
+cells at once, and each extra round of queries goes to the cells whose
+intervals are widest, until every interval is narrow enough or the query
+budget is spent.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+def bootstrap_intervals(successes: np.ndarray, trials: np.ndarray, confidence: float = 0.9,
+                        rounds: int = 1000, rng: np.random.Generator = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Percentile bootstrap interval of each cell's mention rate, vectorized over cells
+
+    Resampling a cell's n answers with replacement is a Binomial(n, s/n) draw,
+    so every cell is bootstrapped with one array of binomial draws. The rate
+    drawn from is shrunk by half a mention towards 1/2 (a Jeffreys prior), so
+    a cell whose few answers all agree still has a width instead of looking
+    certain. Cells without answers get the whole [0, 1] interval.
+    """
+    rng = rng or np.random.default_rng()
+    successes = np.asarray(successes, dtype=float)
+    trials = np.asarray(trials, dtype=float)
+    answered = trials > 0
+    rates = (successes + 0.5) / (trials + 1)
+
+    low, high = np.zeros(len(trials)), np.ones(len(trials))
+    if answered.any():
+        n = trials[answered, None]
+        draws = rng.binomial(n.astype(np.int64), rates[answered, None], size=(int(answered.sum()), rounds)) / n
+        tail = (1 - confidence) / 2
+        low[answered], high[answered] = np.quantile(draws, [tail, 1 - tail], axis=1)
+    return low, high
+
+class AdaptiveSampler:
+    def __init__(self, target_width: float = 0.3, max_queries: int = 60, round_size: int = 20,
+                 max_samples: int = 5, confidence: float = 0.9, rounds: int = 1000, seed: int = None):
+        # Stop once every interval is at most target_width, or max_queries extra queries were sent
+        self.target_width = target_width
+        self.max_queries = max_queries
+        # Extra queries per round; intervals are recomputed between rounds
+        self.round_size = round_size
+        self.max_samples = max_samples
+        self.confidence = confidence
+        self.rounds = rounds
+        self.rng = np.random.default_rng(seed)
+
+    def intervals(self, successes: np.ndarray, trials: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return bootstrap_intervals(successes, trials, self.confidence, self.rounds, self.rng)
+
+    def allocate(self, successes: np.ndarray, trials: np.ndarray, budget: int) -> List[int]:
+        """Cells to sample next: widest intervals first, then fewest answers, then at random"""
+        low, high = self.intervals(successes, trials)
+        widths = high - low
+        trials = np.asarray(trials)
+        eligible = np.flatnonzero((widths > self.target_width) & (trials < self.max_samples))
+        order = eligible[np.lexsort((self.rng.random(len(eligible)), trials[eligible], -widths[eligible]))]
+        return order[:min(self.round_size, budget)].tolist()
+
+def combine_samples(samples: List[Dict], low: float, high: float) -> Dict:
+    """One cell's result from all its answers
+
+    The cell is reported as mentioned when most answers mention the brand (a
+    tie keeps the first answer's verdict); its other fields come from the
+    first answer that agrees with that verdict.
+    """
+    mentions = sum(1 for sample in samples if sample["mentioned"])
+    rate = mentions / len(samples)
+    mentioned = samples[0]["mentioned"] if rate == 0.5 else rate > 0.5
+    representative = next(sample for sample in samples if sample["mentioned"] == mentioned)
+    return {
+        **representative,
+        "samples": len(samples),
+        "mention_rate": round(rate, 3),
+        "mention_rate_ci": [round(float(low), 3), round(float(high), 3)]
+    }
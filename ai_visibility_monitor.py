@@ -5,13 +5,57 @@ Designed to work with GitHub Actions and provide comprehensive monitoring
 """
 
 import requests
+import hashlib
 import json
 import time
 import os
 import sys
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import argparse
+import functools
+
+import numpy as np
+
+from adaptive_sampler import AdaptiveSampler, combine_samples
+from change_snapshot import ChangeSnapshot
+from citation_index import DEFAULT_EXCLUDE, DEFAULT_PAGES, CitationIndex, citation_share
+from keyword_planner import KeywordPlanner
+from mock_ai_server import serve_mock
+from openmetrics import MetricsRegistry
+from platform_clients import PlatformError, build_clients, classify_results
+from query_scheduler import QueryScheduler
+from response_cache import ResponseCache
+from session_journal import SessionJournal
+from visibility_history import VisibilityHistory
+from visibility_matrix import VisibilityMatrix
+
+# Weight keywords by importance; unlisted keywords get DEFAULT_KEYWORD_WEIGHT
+KEYWORD_WEIGHTS = {
+    "PDF to CSV": 1.0,
+    "PDF to CSV converter": 0.9,
+    "convert PDF to CSV": 0.8,
+    "PDF CSV conversion": 0.7,
+    "document processing AI": 0.6,
+    "invoice automation": 0.5,
+    "AI document processing": 0.4
+}
+DEFAULT_KEYWORD_WEIGHT = 0.3
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse "i/n" (0-based shard index of n shards)"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like i/n, got '{value}'")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}, got '{value}'")
+    return index, count
+
+def shard_of(keyword: str, platform: str, count: int) -> int:
+    """Stable shard for a (keyword, platform) query, the same on every machine and run"""
+    digest = hashlib.blake2b(f"{keyword}\x1f{platform}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
 
 class EnhancedAIVisibilityMonitor:
     def __init__(self, config_file: str = None):
@@ -39,6 +83,41 @@ class EnhancedAIVisibilityMonitor:
         }
         self.results_file = "ai_visibility_results.json"
         self.report_file = "ai_visibility_report.md"
+        self.snapshot_file = ".build_cache/snapshots/ai_visibility.json"
+        self.delta_file = "ai_visibility_delta.json"
+        self.metrics_file = None
+        # Every session is appended here; the dashboard reads the exported time series
+        self.history_db = ".build_cache/ai_visibility_history.db"
+        self.timeseries_file = "ai_visibility_timeseries.json"
+        self.mode = "full"
+        # Per-platform {rate, burst, concurrency}; "default" applies to unlisted platforms
+        self.rate_limits = {}
+        self.max_concurrency = 16
+        # Client adapter per platform ({type, ...options}); simulated unless configured
+        self.client_config = {}
+        self.mock_server_config = {}
+        self.seed = None
+        # Names and aliases matched in answers: {"brand": {name: [aliases]}, "competitor": {...}}
+        self.mention_entities = {"brand": {self.brand_name: [], "HeliaCode": []}, "competitor": {}}
+        # Answers are reused across sessions until they expire; bump prompt_version to invalidate
+        self.response_cache_file = ".build_cache/ai_responses.json"
+        self.cache_config = {"ttl_hours": 6, "max_entries": 5000}
+        self.prompt_version = "1"
+        self.use_cache = True
+        # Completed queries are checkpointed here until the session is saved; resume skips them
+        self.journal_file = ".build_cache/ai_visibility_journal.jsonl"
+        self.resume = False
+        self.journal = None
+        # Near-duplicate keywords share one query per cluster (see keyword_planner.py)
+        self.planner_config = {"enabled": False, "threshold": 0.6, "max_queries": None}
+        # Extra answers for the noisiest cells until their mention-rate intervals are narrow enough
+        self.sampling_config = {"enabled": False, "target_width": 0.3, "max_queries": 60, "round_size": 20,
+                                "max_samples": 5, "confidence": 0.9}
+        # Answers mentioning the brand are matched to the site pages they most resemble
+        self.citation_config = {"enabled": True, "index_file": ".build_cache/citation_index.npz", "top_k": 3,
+                                "pages": list(DEFAULT_PAGES), "exclude": list(DEFAULT_EXCLUDE)}
+        # Named keyword sets for --mode; "full" and "keywords" use target_keywords
+        self.modes = {}
         
         # Load configuration if provided
         if config_file and os.path.exists(config_file):
@@ -51,56 +130,71 @@ class EnhancedAIVisibilityMonitor:
                 config = json.load(f)
                 self.target_keywords = config.get('keywords', self.target_keywords)
                 self.ai_platforms = config.get('platforms', self.ai_platforms)
+                self.rate_limits = config.get('rate_limits', self.rate_limits)
+                self.max_concurrency = config.get('max_concurrency', self.max_concurrency)
+                self.client_config = config.get('clients', self.client_config)
+                self.mock_server_config = config.get('mock_server', self.mock_server_config)
+                self.cache_config = {**self.cache_config, **config.get('response_cache', {})}
+                self.planner_config = {**self.planner_config, **config.get('planner', {})}
+                self.sampling_config = {**self.sampling_config, **config.get('sampling', {})}
+                self.citation_config = {**self.citation_config, **config.get('citations', {})}
+                self.prompt_version = str(config.get('prompt_version', self.prompt_version))
+                self.modes = config.get('modes', self.modes)
+                self.mention_entities = {**self.mention_entities, **config.get('mentions', {})}
         except Exception as e:
             print(f"Warning: Could not load config file {config_file}: {e}")
     
-    def simulate_ai_platform_check(self, query: str, platform: str) -> Dict[str, Any]:
-        """Simulate checking AI platform for brand mentions"""
-        # In a real implementation, you would use APIs or web scraping
-        # This simulates realistic monitoring results
-        
-        import random
-        
-        # Simulate different platform behaviors
-        platform_weights = {
-            "chatgpt": 0.8,  # High likelihood of mention
-            "claude": 0.7,   # High likelihood
-            "perplexity": 0.6, # Medium likelihood
-            "bard": 0.5,     # Medium likelihood
-            "bing_chat": 0.4, # Lower likelihood
-            "voice_search": 0.3 # Lower likelihood
-        }
-        
-        weight = platform_weights.get(platform, 0.5)
-        mentioned = random.random() < weight
-        
-        if mentioned:
-            sentiments = ["positive", "neutral", "positive", "positive", "neutral"]
-            sentiment = random.choice(sentiments)
-            confidence = random.uniform(0.7, 0.95)
-            
-            contexts = [
-                f"TidiFul is mentioned as a recommended solution for {query.lower()}",
-                f"Users are asking about TidiFul for {query.lower()}",
-                f"TidiFul appears in search results for {query.lower()}",
-                f"TidiFul is suggested as a tool for {query.lower()}"
-            ]
-            context = random.choice(contexts)
-        else:
-            sentiment = "neutral"
-            confidence = random.uniform(0.3, 0.6)
-            context = f"No mention of {self.brand_name} found for {query.lower()}"
-        
-        return {
-            "mentioned": mentioned,
-            "sentiment": sentiment,
-            "confidence": round(confidence, 2),
-            "context": context,
-            "timestamp": datetime.now().isoformat()
-        }
-    
     def check_brand_mentions(self, query: str) -> Dict[str, Any]:
         """Check for brand mentions across all AI platforms"""
+        clients = build_clients(self.ai_platforms, self.brand_name, self.client_config, self.seed,
+                                self.mention_entities)
+        try:
+            platform_results = {platform: client.query(query) for platform, client in clients.items()}
+        finally:
+            for client in clients.values():
+                client.close()
+        classify_results(list(platform_results.values()))
+        return self.summarize_keyword(query, platform_results)
+    
+    def keywords_for_mode(self, mode: str) -> List[str]:
+        """Keywords to query for a monitoring mode"""
+        if mode in ("full", "keywords"):
+            return self.target_keywords
+        if mode not in self.modes:
+            raise ValueError(f"Unknown monitoring mode '{mode}' (configure it under \"modes\")")
+        return self.modes[mode]
+    
+    def open_response_cache(self) -> ResponseCache:
+        return ResponseCache(self.response_cache_file,
+                             ttl=self.cache_config["ttl_hours"] * 3600,
+                             max_entries=self.cache_config["max_entries"],
+                             prompt_version=self.prompt_version)
+    
+    def open_journal(self, queried: List[str], shard: Tuple[int, int] = None,
+                     merged: List[str] = None) -> SessionJournal:
+        """Checkpoint journal for this session's queries; each shard, and a merge, keeps its own
+        
+        merged identifies the partial results a merge samples from.
+        """
+        journal_file = self.journal_file
+        root, ext = os.path.splitext(journal_file)
+        if shard:
+            journal_file = f"{root}_{shard[0]}of{shard[1]}{ext}"
+        elif merged is not None:
+            journal_file = f"{root}_merge{ext}"
+        identity = {"queried": queried, "platforms": list(self.ai_platforms), "mode": self.mode,
+                    "prompt_version": self.prompt_version, "seed": self.seed, "shard": shard, "merged": merged}
+        # Checkpointed answers go stale on the same schedule as cached ones
+        return SessionJournal(journal_file, identity, max_age=self.cache_config["ttl_hours"] * 3600)
+    
+    def complete_journal(self) -> None:
+        """Drop the checkpoints once the session's results are safely saved"""
+        if self.journal:
+            self.journal.complete()
+            self.journal = None
+    
+    def summarize_keyword(self, query: str, platform_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine one keyword's per-platform results; failed queries are kept but not scored"""
         results = {
             "query": query,
             "timestamp": datetime.now().isoformat(),
@@ -111,22 +205,28 @@ class EnhancedAIVisibilityMonitor:
                 "positive_mentions": 0,
                 "negative_mentions": 0,
                 "neutral_mentions": 0,
+                "failed_platforms": 0,
                 "average_confidence": 0.0
             }
         }
         
-        total_confidence = 0
-        mentions_count = 0
-        
-        for platform, name in self.ai_platforms.items():
-            platform_result = self.simulate_ai_platform_check(query, platform)
+        confidences = []
+        for platform, platform_result in platform_results.items():
+            if isinstance(platform_result, Exception):
+                results["platforms"][platform] = {
+                    "platform_name": self.ai_platforms[platform],
+                    "error": str(platform_result),
+                    "timestamp": datetime.now().isoformat()
+                }
+                results["summary"]["failed_platforms"] += 1
+                continue
+            
             results["platforms"][platform] = {
-                "platform_name": name,
+                "platform_name": self.ai_platforms[platform],
                 **platform_result
             }
             
             if platform_result["mentioned"]:
-                mentions_count += 1
                 results["summary"]["mentions_found"] += 1
                 
                 if platform_result["sentiment"] == "positive":
@@ -136,83 +236,302 @@ class EnhancedAIVisibilityMonitor:
                 else:
                     results["summary"]["neutral_mentions"] += 1
             
-            total_confidence += platform_result["confidence"]
+            confidences.append(platform_result["confidence"])
         
-        results["summary"]["average_confidence"] = round(total_confidence / len(self.ai_platforms), 2)
+        if confidences:
+            results["summary"]["average_confidence"] = round(sum(confidences) / len(confidences), 2)
         
         return results
     
+    def plan_queries(self, keywords: List[str]) -> Dict[str, str]:
+        """Map each keyword to the keyword whose answers it reports"""
+        if not self.planner_config["enabled"]:
+            return {keyword: keyword for keyword in keywords}
+        
+        planner = KeywordPlanner(self.planner_config["threshold"], self.planner_config["max_queries"],
+                                 protected=list(self.mention_entities.get("brand", {})))
+        plan = planner.plan(keywords)
+        print(f"Keyword planner: {len(keywords)} keywords in {len(plan['clusters'])} clusters, "
+              f"querying {len(plan['queries'])} per platform")
+        if plan["uncovered"]:
+            print(f"Warning: query budget leaves {len(plan['uncovered'])} keywords unmonitored: "
+                  f"{', '.join(plan['uncovered'])}")
+        return plan["attribution"]
+    
     def monitor_keyword_visibility(self, keywords: List[str] = None) -> List[Dict[str, Any]]:
-        """Monitor visibility for target keywords"""
+        """Monitor visibility for target keywords
+        
+        Every (keyword, platform) query is scheduled concurrently, limited by
+        each platform's token bucket and concurrency bound. Fresh answers from
+        the response cache are reused, so only missing queries are sent, and
+        near-duplicate keywords report their cluster representative's answers.
+        """
         if keywords is None:
             keywords = self.target_keywords
-            
-        results = []
         
         print(f"Monitoring {len(keywords)} keywords across {len(self.ai_platforms)} platforms")
+        attribution = self.plan_queries(keywords)
+        responses = self.collect_responses(list(dict.fromkeys(attribution.values())))
+        return self.attribute_results(keywords, attribution, responses)
+    
+    def collect_responses(self, queried: List[str], shard: Tuple[int, int] = None) -> Dict[Tuple[str, str], Any]:
+        """Query platforms for each keyword, or only this shard's (keyword, platform) pairs
+        
+        Returns results (or the exception of a failed query) keyed by (keyword, platform).
+        """
+        cache = self.open_response_cache() if self.use_cache else None
+        self.journal = self.open_journal(queried, shard)
+        # Answers checkpointed by an interrupted run of the same session are not asked again
+        responses = self.journal.start(self.resume)
+        clients = build_clients(self.ai_platforms, self.brand_name, self.client_config, self.seed,
+                                self.mention_entities)
+        scheduler = QueryScheduler(self.rate_limits, max_concurrency=self.max_concurrency, seed=self.seed)
+        missing = {platform: [] for platform in clients}
+        for platform in clients:
+            for keyword in queried:
+                if (shard and shard_of(keyword, platform, shard[1]) != shard[0]) or (keyword, platform) in responses:
+                    continue
+                cached = cache.get(keyword, platform, clients[platform].source) if cache else None
+                if cached is None:
+                    missing[platform].append(keyword)
+                else:
+                    responses[(keyword, platform)] = {**cached, "cached": True}
+        jobs = self.batch_jobs(clients, missing)
         
-        for i, keyword in enumerate(keywords, 1):
-            print(f"[{i}/{len(keywords)}] Monitoring keyword: {keyword}")
-            result = self.check_brand_mentions(keyword)
-            results.append(result)
-            
-            # Rate limiting
-            time.sleep(0.5)
+        def checkpoint(key: Tuple[Tuple[str, ...], str], answers: Any) -> None:
+            batch, platform = key
+            if not isinstance(answers, Exception):
+                for keyword, answer in zip(batch, answers):
+                    self.journal.record(keyword, platform, answer)
         
-        return results
+        started = time.perf_counter()
+        try:
+            batch_responses = scheduler.run(jobs, on_result=checkpoint)
+            print(f"Ran {scheduler.stats['queries']} requests in {time.perf_counter() - started:.2f}s "
+                  f"({scheduler.stats['retries']} retries, {scheduler.stats['failures']} failed)")
+            
+            # Every answer of the session is classified in one batch; cached ones already are
+            classify_results([result for result in responses.values() if not isinstance(result, Exception)] +
+                             [answer for answers in batch_responses.values() if not isinstance(answers, Exception)
+                              for answer in answers])
+            for (batch, platform), answers in batch_responses.items():
+                for i, keyword in enumerate(batch):
+                    # A failed batch fails each of its keywords; failures are never cached
+                    responses[(keyword, platform)] = answers if isinstance(answers, Exception) else answers[i]
+                    if cache and not isinstance(answers, Exception):
+                        cache.put(keyword, platform, answers[i], clients[platform].source)
+            if cache:
+                cache.save()
+                print(f"Response cache: {cache.stats['hits']} hits, {cache.stats['misses']} misses "
+                      f"({cache.stats['expired']} expired, {cache.stats['evicted']} evicted)")
+            # Shards keep one answer per cell; merge samples once over every shard's cells
+            if self.sampling_config["enabled"] and not shard:
+                self.sample_responses(responses, clients, scheduler)
+        finally:
+            self.journal.close()
+            for client in clients.values():
+                client.close()
+        return responses
     
-    def calculate_visibility_score(self, keyword_results: List[Dict[str, Any]]) -> float:
-        """Calculate overall AI visibility score"""
-        if not keyword_results:
-            return 0.0
-        
-        total_score = 0
-        total_weight = 0
-        
-        # Weight keywords by importance
-        keyword_weights = {
-            "PDF to CSV": 1.0,
-            "PDF to CSV converter": 0.9,
-            "convert PDF to CSV": 0.8,
-            "PDF CSV conversion": 0.7,
-            "document processing AI": 0.6,
-            "invoice automation": 0.5,
-            "AI document processing": 0.4
+    def batch_jobs(self, clients: Dict[str, Any], pending: Dict[str, List[str]]) -> List[Tuple]:
+        """Scheduler jobs for each platform's pending keywords; platforms with batch support
+        get several keywords per request"""
+        jobs = []
+        for platform, keywords in pending.items():
+            client = clients[platform]
+            for i in range(0, len(keywords), client.batch_size):
+                batch = tuple(keywords[i:i + client.batch_size])
+                jobs.append(((batch, platform), platform, functools.partial(client.query_batch, list(batch))))
+        return jobs
+    
+    def sample_responses(self, responses: Dict[Tuple[str, str], Any], clients: Dict[str, Any],
+                         scheduler: QueryScheduler) -> None:
+        """Re-ask the noisiest (keyword, platform) cells and report each cell from all its answers
+        
+        Every answered cell starts with one answer. Rounds of extra queries go to
+        the cells with the widest bootstrap intervals on their mention rate (see
+        adaptive_sampler.py) until all are within the target width or the
+        query budget is spent.
+        """
+        settings = self.sampling_config
+        sampler = AdaptiveSampler(settings["target_width"], settings["max_queries"], settings["round_size"],
+                                  settings["max_samples"], settings["confidence"], seed=self.seed)
+        # A fixed cell order keeps seeded allocation the same however the answers arrived
+        cells = sorted(key for key, result in responses.items() if not isinstance(result, Exception))
+        # Extra answers an interrupted run already journaled count against the budget
+        resumed = self.journal.samples if self.journal else {}
+        samples = {key: [responses[key]] + resumed.get(key, []) for key in cells}
+        for keyword, platform in cells:
+            clients[platform].answered(keyword, len(samples[(keyword, platform)]))
+        
+        def counts() -> Tuple[np.ndarray, np.ndarray]:
+            return (np.array([sum(1 for s in samples[key] if s["mentioned"]) for key in cells]),
+                    np.array([len(samples[key]) for key in cells]))
+        
+        def checkpoint(key: Tuple[Tuple[str, ...], str], answers: Any) -> None:
+            # A failed extra query only means the cell keeps fewer answers
+            batch, platform = key
+            if not isinstance(answers, Exception):
+                for keyword, answer in zip(batch, answers):
+                    cell = samples[(keyword, platform)]
+                    cell.append(answer)
+                    if self.journal:
+                        self.journal.record(keyword, platform, answer, sample=len(cell) - 1)
+        
+        restored = sum(len(samples[key]) - 1 for key in cells)
+        budget = sampler.max_queries - restored
+        while budget > 0:
+            chosen = [cells[i] for i in sampler.allocate(*counts(), budget)]
+            if not chosen:
+                break
+            budget -= len(chosen)
+            pending = {}
+            for keyword, platform in chosen:
+                pending.setdefault(platform, []).append(keyword)
+            scheduler.run(self.batch_jobs(clients, pending), on_result=checkpoint)
+        
+        classify_results([answer for key in cells for answer in samples[key][1:]])
+        successes, trials = counts()
+        low, high = sampler.intervals(successes, trials)
+        for i, key in enumerate(cells):
+            responses[key] = combine_samples(samples[key], low[i], high[i])
+        wide = int(np.sum(high - low > sampler.target_width))
+        print(f"Adaptive sampling: {sampler.max_queries - budget} extra queries ({restored} resumed), "
+              f"{wide} of {len(cells)} intervals still wider than {sampler.target_width}")
+    
+    def attribute_results(self, keywords: List[str], attribution: Dict[str, str],
+                          responses: Dict[Tuple[str, str], Any]) -> List[Dict[str, Any]]:
+        """Summarize each keyword from its own answers or its cluster representative's"""
+        keyword_results = []
+        for keyword in keywords:
+            if keyword not in attribution:
+                continue
+            source = attribution[keyword]
+            platform_results = {platform: responses[(source, platform)] for platform in self.ai_platforms}
+            if source != keyword:
+                platform_results = {platform: result if isinstance(result, Exception)
+                                    else {**result, "attributed_from": source}
+                                    for platform, result in platform_results.items()}
+            keyword_results.append(self.summarize_keyword(keyword, platform_results))
+        return keyword_results
+    
+    def run_shard(self, keywords: List[str], shard: Tuple[int, int], partial_file: str) -> None:
+        """Query one shard of the (keyword, platform) matrix and write a partial result file"""
+        index, count = shard
+        print(f"Starting AI visibility monitoring shard {index}/{count} for {self.brand_name}")
+        started = time.perf_counter()
+        attribution = self.plan_queries(keywords)
+        responses = self.collect_responses(list(dict.fromkeys(attribution.values())), shard)
+        
+        partial = {
+            "shard": [index, count],
+            "mode": self.mode,
+            "seed": self.seed,
+            "keywords": keywords,
+            "platforms": list(self.ai_platforms),
+            "attribution": attribution,
+            "duration": round(time.perf_counter() - started, 3),
+            "generated_at": datetime.now().isoformat(),
+            "responses": [
+                {"keyword": keyword, "platform": platform,
+                 **({"error": str(result)} if isinstance(result, Exception) else {"result": result})}
+                for (keyword, platform), result in responses.items()
+            ]
         }
+        with open(partial_file, 'w', encoding='utf-8') as f:
+            json.dump(partial, f, indent=2)
+        self.complete_journal()
+        print(f"Shard {index}/{count}: {len(responses)} results saved to {partial_file}")
+    
+    def merge_partials(self, partial_files: List[str]) -> None:
+        """Combine every shard's partial results into one session report"""
+        started = time.perf_counter()
+        partials = []
+        for partial_file in partial_files:
+            with open(partial_file, 'r', encoding='utf-8') as f:
+                partials.append(json.load(f))
+        if not partials:
+            raise ValueError("merge needs at least one partial result file")
+        
+        first = partials[0]
+        count = first["shard"][1]
+        indexes = sorted(partial["shard"][0] for partial in partials)
+        if indexes != list(range(count)):
+            raise ValueError(f"expected shards 0..{count - 1} exactly once, got {indexes}")
+        for partial in partials[1:]:
+            for field in ("keywords", "platforms", "attribution", "mode", "seed"):
+                if partial.get(field) != first.get(field) or partial["shard"][1] != count:
+                    raise ValueError(f"shard {partial['shard'][0]} was run with a different {field} or shard count")
+        if first["platforms"] != list(self.ai_platforms):
+            raise ValueError("partial results were produced with a different platform configuration")
+        
+        responses = {}
+        for partial in partials:
+            for entry in partial["responses"]:
+                key = (entry["keyword"], entry["platform"])
+                responses[key] = PlatformError(entry["error"]) if "error" in entry else entry["result"]
+        queried = dict.fromkeys(first["attribution"].values())
+        missing = [(k, p) for k in queried for p in self.ai_platforms if (k, p) not in responses]
+        if missing:
+            raise ValueError(f"{len(missing)} keyword/platform results are missing, e.g. {missing[0]}")
+        
+        print(f"Merged {len(partials)} shards ({len(responses)} results)")
+        self.mode = first["mode"]
+        self.seed = first.get("seed", self.seed)
+        if self.sampling_config["enabled"]:
+            # The sampling budget is spent once, over all cells, as in an unsharded session
+            # Its extra answers are journaled like a session's, keyed to these exact partials
+            stamps = [partial["generated_at"] for partial in sorted(partials, key=lambda p: p["shard"][0])]
+            self.journal = self.open_journal(list(queried), merged=stamps)
+            self.journal.start(self.resume)
+            clients = build_clients(self.ai_platforms, self.brand_name, self.client_config, self.seed,
+                                    self.mention_entities)
+            try:
+                self.sample_responses(responses, clients, QueryScheduler(self.rate_limits,
+                                                                         max_concurrency=self.max_concurrency,
+                                                                         seed=self.seed))
+            finally:
+                self.journal.close()
+                for client in clients.values():
+                    client.close()
+        keyword_results = self.attribute_results(first["keywords"], first["attribution"], responses)
+        # Shards run in parallel, so the session took as long as the slowest one
+        duration = max(partial["duration"] for partial in partials) + time.perf_counter() - started
+        self.finish_session(keyword_results, duration)
+        self.complete_journal()
+    
+    def build_matrix(self, keyword_results: List[Dict[str, Any]]) -> VisibilityMatrix:
+        """Materialize results as a keyword x platform x metric array for scoring"""
+        return VisibilityMatrix.from_results(keyword_results, self.ai_platforms)
+    
+    def keyword_weights(self, matrix: VisibilityMatrix) -> np.ndarray:
+        return np.array([KEYWORD_WEIGHTS.get(keyword, DEFAULT_KEYWORD_WEIGHT) for keyword in matrix.keywords])
+    
+    def calculate_visibility_score(self, keyword_results: List[Dict[str, Any]],
+                                   matrix: VisibilityMatrix = None) -> float:
+        """Calculate overall AI visibility score
         
-        for result in keyword_results:
-            keyword = result["query"]
-            weight = keyword_weights.get(keyword, 0.3)
-            
-            # Calculate score based on mentions and sentiment
-            mentions = result["summary"]["mentions_found"]
-            positive_mentions = result["summary"]["positive_mentions"]
-            avg_confidence = result["summary"]["average_confidence"]
-            
-            # Score formula: (mentions * sentiment_bonus * confidence) / max_possible
-            max_mentions = len(self.ai_platforms)
-            sentiment_bonus = 1.0 + (positive_mentions * 0.2)  # Bonus for positive mentions
-            
-            keyword_score = (mentions / max_mentions) * sentiment_bonus * avg_confidence
-            total_score += keyword_score * weight
-            total_weight += weight
+        Each keyword scores (mentions / platforms) * (1 + 0.2 * positive mentions)
+        * average confidence; the overall score is their weighted mean on a 0-10 scale.
+        """
+        if not keyword_results:
+            return 0.0
         
-        return round((total_score / total_weight) * 10, 1) if total_weight > 0 else 0.0
+        matrix = matrix or self.build_matrix(keyword_results)
+        return matrix.visibility_score(self.keyword_weights(matrix), len(self.ai_platforms))
     
     def generate_comprehensive_report(self, keyword_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate comprehensive AI optimization report"""
-        visibility_score = self.calculate_visibility_score(keyword_results)
+        matrix = self.build_matrix(keyword_results)
+        visibility_score = self.calculate_visibility_score(keyword_results, matrix)
         
         # Calculate metrics
-        total_mentions = sum(result["summary"]["mentions_found"] for result in keyword_results)
-        total_positive = sum(result["summary"]["positive_mentions"] for result in keyword_results)
-        total_negative = sum(result["summary"]["negative_mentions"] for result in keyword_results)
-        total_neutral = sum(result["summary"]["neutral_mentions"] for result in keyword_results)
-        
-        # Find top performing keywords
-        top_keywords = sorted(keyword_results, 
-                            key=lambda x: x["summary"]["mentions_found"], 
-                            reverse=True)[:5]
+        counts = matrix.counts
+        total_mentions = int(counts["mentions"].sum())
+        total_positive = int(counts["positive"].sum())
+        total_negative = int(counts["negative"].sum())
+        total_neutral = int(counts["neutral"].sum())
+        sampling = self.sampling_summary(keyword_results)
         
         report = {
             "timestamp": datetime.now().isoformat(),
@@ -227,15 +546,34 @@ class EnhancedAIVisibilityMonitor:
                 "negative_mentions": total_negative,
                 "neutral_mentions": total_neutral,
                 "platforms_monitored": len(self.ai_platforms),
-                "top_performing_keywords": [k["query"] for k in top_keywords]
+                "top_performing_keywords": matrix.top_keywords(5),
+                "keyword_score_percentiles": matrix.score_percentiles(len(self.ai_platforms)),
+                **({"sampling": sampling} if sampling else {})
             },
             "recommendations": self.generate_recommendations(visibility_score, total_mentions),
             "next_actions": self.generate_next_actions(visibility_score, total_mentions),
-            "platform_performance": self.analyze_platform_performance(keyword_results)
+            "platform_performance": self.analyze_platform_performance(keyword_results, matrix)
         }
+        share = self.citation_share(keyword_results)
+        if share:
+            report["citation_share"] = share
         
         return report
     
+    def sampling_summary(self, keyword_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extra answers and interval widths of the queried cells, if the session was sampled"""
+        cells = [result for keyword_result in keyword_results for result in keyword_result["platforms"].values()
+                 if "samples" in result and "attributed_from" not in result]
+        if not cells:
+            return {}
+        widths = [high - low for low, high in (cell["mention_rate_ci"] for cell in cells)]
+        return {
+            "cells": len(cells),
+            "extra_queries": sum(cell["samples"] - 1 for cell in cells),
+            "mean_interval_width": round(sum(widths) / len(widths), 3),
+            "max_interval_width": round(max(widths), 3)
+        }
+    
     def generate_recommendations(self, visibility_score: float, total_mentions: int) -> List[str]:
         """Generate AI optimization recommendations"""
         recommendations = []
@@ -286,34 +624,47 @@ class EnhancedAIVisibilityMonitor:
         
         return actions
     
-    def analyze_platform_performance(self, keyword_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def attribute_citations(self, keyword_results: List[Dict[str, Any]]) -> None:
+        """Record the site pages most similar to each answer that mentions the brand
+        
+        Results attributed from a cluster representative share its answer, so
+        only the representative's is searched and the copies reuse its pages.
+        """
+        settings = self.citation_config
+        index = CitationIndex.open(settings["index_file"], patterns=settings["pages"], exclude=settings["exclude"])
+        answers = [(keyword_result["query"], platform, result) for keyword_result in keyword_results
+                   for platform, result in keyword_result["platforms"].items() if result.get("mentioned")]
+        cited = [(keyword, platform, result) for keyword, platform, result in answers
+                 if "attributed_from" not in result]
+        
+        started = time.perf_counter()
+        matches = index.search([result["context"] for _, _, result in cited], settings["top_k"])
+        pages_by_answer = {}
+        for (keyword, platform, result), pages in zip(cited, matches):
+            result["cited_pages"] = [{"page": page, "score": score} for page, score in pages]
+            pages_by_answer[(keyword, platform)] = result["cited_pages"]
+        for _, platform, result in answers:
+            if "attributed_from" in result and (result["attributed_from"], platform) in pages_by_answer:
+                result["cited_pages"] = pages_by_answer[(result["attributed_from"], platform)]
+        print(f"Attributed {len(cited)} answers to {len(index.pages)} site pages "
+              f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+    
+    def citation_share(self, keyword_results: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Share of brand-mentioning answers whose closest page is each site page
+        
+        Each answer counts once, not once per keyword of its cluster.
+        """
+        return citation_share([[(page["page"], page["score"]) for page in result["cited_pages"]]
+                               for keyword_result in keyword_results
+                               for result in keyword_result["platforms"].values()
+                               if "cited_pages" in result and "attributed_from" not in result])
+    
+    def analyze_platform_performance(self, keyword_results: List[Dict[str, Any]],
+                                     matrix: VisibilityMatrix = None) -> Dict[str, Any]:
         """Analyze performance across different AI platforms"""
-        platform_stats = {}
-        
-        for platform, name in self.ai_platforms.items():
-            mentions = 0
-            positive = 0
-            total_confidence = 0
-            count = 0
-            
-            for result in keyword_results:
-                platform_data = result["platforms"].get(platform, {})
-                if platform_data.get("mentioned", False):
-                    mentions += 1
-                    if platform_data.get("sentiment") == "positive":
-                        positive += 1
-                total_confidence += platform_data.get("confidence", 0)
-                count += 1
-            
-            platform_stats[platform] = {
-                "name": name,
-                "mentions": mentions,
-                "positive_mentions": positive,
-                "average_confidence": round(total_confidence / count, 2) if count > 0 else 0,
-                "performance_score": round((mentions / len(keyword_results)) * 10, 1)
-            }
-        
-        return platform_stats
+        matrix = matrix or self.build_matrix(keyword_results)
+        breakdown = matrix.platform_breakdown()
+        return {platform: {"name": name, **breakdown[platform]} for platform, name in self.ai_platforms.items()}
     
     def save_results(self, data: Any, filename: str = None) -> None:
         """Save monitoring results to file"""
@@ -325,6 +676,46 @@ class EnhancedAIVisibilityMonitor:
         
         print(f"Results saved to {filename}")
     
+    def record_history(self, full_results: Dict[str, Any]) -> None:
+        """Append the session to the history store and refresh the dashboard time series"""
+        history = VisibilityHistory(self.history_db)
+        try:
+            history.record_session(full_results, mode=self.mode)
+            history.export_timeseries(self.timeseries_file)
+        finally:
+            history.close()
+    
+    def write_change_delta(self, full_results: Dict[str, Any]) -> None:
+        """Write only the keyword/platform results and metrics that changed since the last run"""
+        records = {"session": {"metrics": full_results["monitoring_session"]["metrics"],
+                               "platform_performance": full_results["monitoring_session"]["platform_performance"]}}
+        for keyword_result in full_results["keyword_results"]:
+            for platform, result in keyword_result["platforms"].items():
+                records[f"{keyword_result['query']}|{platform}"] = result
+        
+        snapshot = ChangeSnapshot(self.snapshot_file, ignore_fields=["timestamp", "latency_ms", "first_chunk_ms", "cached",
+                                                                       "mention_rate_ci"])
+        snapshot.write_delta(snapshot.delta(records), self.delta_file)
+    
+    def export_metrics(self, full_results: Dict[str, Any], duration: float) -> None:
+        """Write visibility scores and mention counts as OpenMetrics text"""
+        session = full_results["monitoring_session"]
+        metrics = MetricsRegistry()
+        metrics.gauge("ai_visibility_session_seconds", duration, "Duration of the monitoring session", "seconds")
+        metrics.gauge("ai_visibility_score", session["metrics"]["visibility_score"], "Overall AI visibility score (0-10)")
+        for sentiment in ("positive", "negative", "neutral"):
+            metrics.gauge("ai_visibility_brand_mentions", session["metrics"][f"{sentiment}_mentions"],
+                          "Brand mentions by sentiment", sentiment=sentiment)
+        for platform, stats in session["platform_performance"].items():
+            metrics.gauge("ai_visibility_platform_score", stats["performance_score"],
+                          "Per-platform performance score (0-10)", platform=platform)
+            metrics.gauge("ai_visibility_platform_mentions", stats["mentions"],
+                          "Brand mentions per platform", platform=platform)
+        for keyword_result in full_results["keyword_results"]:
+            metrics.gauge("ai_visibility_keyword_mentions", keyword_result["summary"]["mentions_found"],
+                          "Platforms mentioning the brand per keyword", keyword=keyword_result["query"])
+        metrics.write(self.metrics_file)
+    
     def generate_markdown_report(self, data: Dict[str, Any]) -> str:
         """Generate markdown report for GitHub"""
         report = f"""# AI Visibility Report - {datetime.now().strftime('%Y-%m-%d')}
@@ -347,7 +738,14 @@ class EnhancedAIVisibilityMonitor:
 | Negative Mentions | {data['monitoring_session']['metrics']['negative_mentions']} |
 | Neutral Mentions | {data['monitoring_session']['metrics']['neutral_mentions']} |
 | Platforms Monitored | {data['monitoring_session']['metrics']['platforms_monitored']} |
-
+"""
+        
+        sampling = data['monitoring_session']['metrics'].get('sampling')
+        if sampling:
+            report += f"| Extra Samples | {sampling['extra_queries']} |\n"
+            report += f"| Mean Mention-Rate Interval | {sampling['mean_interval_width']} |\n"
+        
+        report += f"""
 ## Top Performing Keywords
 
 """
@@ -366,6 +764,12 @@ class EnhancedAIVisibilityMonitor:
             report += f"- **Performance Score**: {stats['performance_score']}/10\n"
             report += f"- **Average Confidence**: {stats['average_confidence']}\n\n"
         
+        if data['monitoring_session'].get('citation_share'):
+            report += "## Pages Feeding AI Answers\n\n"
+            report += "| Page | Citation Share |\n|------|----------------|\n"
+            for page, share in list(data['monitoring_session']['citation_share'].items())[:10]:
+                report += f"| {page} | {share:.1%} |\n"
+        
         report += f"""
 ## Recommendations
 
@@ -398,8 +802,17 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         print(f"Starting AI visibility monitoring for {self.brand_name}")
         print(f"Monitoring {len(keywords or self.target_keywords)} keywords across {len(self.ai_platforms)} platforms")
         
+        started = time.perf_counter()
+        
         # Monitor keyword visibility
         keyword_results = self.monitor_keyword_visibility(keywords)
+        self.finish_session(keyword_results, time.perf_counter() - started)
+        self.complete_journal()
+    
+    def finish_session(self, keyword_results: List[Dict[str, Any]], duration: float) -> None:
+        """Report, save and export a session's keyword results"""
+        if self.citation_config["enabled"]:
+            self.attribute_citations(keyword_results)
         
         # Generate comprehensive report
         report = self.generate_comprehensive_report(keyword_results)
@@ -413,6 +826,11 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         
         # Save results
         self.save_results(full_results)
+        if self.history_db:
+            self.record_history(full_results)
+        self.write_change_delta(full_results)
+        if self.metrics_file:
+            self.export_metrics(full_results, duration)
         
         # Generate markdown report
         markdown_report = self.generate_markdown_report(full_results)
@@ -429,9 +847,28 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 def main():
     """Main function to run AI visibility monitoring"""
     parser = argparse.ArgumentParser(description='AI Visibility Monitor for TidiFul')
+    parser.add_argument('command', nargs='?', choices=['run', 'merge'], default='run',
+                        help='run a session (default), or merge partial results from --shard runs')
+    parser.add_argument('partials', nargs='*', help='Partial result files to merge')
     parser.add_argument('--config', help='Configuration file path')
     parser.add_argument('--keywords', nargs='+', help='Specific keywords to monitor')
     parser.add_argument('--output', help='Output file for results')
+    parser.add_argument('--metrics-file', help='Also write results as an OpenMetrics text file')
+    parser.add_argument('--seed', type=int, help='Seed simulated and mock results for reproducible runs')
+    parser.add_argument('--mock-server', action='store_true',
+                        help='Query every platform through a local mock server (see mock_server in the config)')
+    parser.add_argument('--stream', action='store_true', help='Request streamed answers from HTTP platforms')
+    parser.add_argument('--mode', default='full',
+                        help='Monitoring mode: full, keywords, or a keyword set under "modes" in the config')
+    parser.add_argument('--no-cache', action='store_true', help='Query every platform even if a cached answer is fresh')
+    parser.add_argument('--no-planner', action='store_true',
+                        help='Query every keyword instead of one representative per near-duplicate cluster')
+    parser.add_argument('--no-sampling', action='store_true',
+                        help='Keep one answer per keyword and platform instead of re-asking the noisiest ones')
+    parser.add_argument('--shard', type=parse_shard,
+                        help='Only query shard i of n (e.g. 0/4) and write a partial result file for merge')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted session, skipping queries it already completed')
     
     args = parser.parse_args()
     
@@ -439,8 +876,53 @@ def main():
     
     if args.output:
         monitor.results_file = args.output
+    monitor.metrics_file = args.metrics_file
+    monitor.seed = args.seed
+    monitor.mode = args.mode
+    monitor.resume = args.resume
+    if args.no_planner:
+        monitor.planner_config["enabled"] = False
+    if args.no_sampling:
+        monitor.sampling_config["enabled"] = False
+    # Mock answers must not end up in the cache or history real runs read from
+    monitor.use_cache = not (args.no_cache or args.mock_server)
+    if args.mock_server:
+        monitor.history_db = None
+        monitor.journal_file = ".build_cache/ai_visibility_journal_mock.jsonl"
+    try:
+        keywords = args.keywords or monitor.keywords_for_mode(args.mode)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.partials and args.command != 'merge':
+        parser.error("partial result files are only accepted by merge")
+    
+    def run():
+        if args.command == 'merge':
+            # Merging samples the noisiest cells again, so it queries the same platforms as the shards
+            try:
+                monitor.merge_partials(args.partials)
+            except (ValueError, KeyError, OSError) as e:
+                parser.error(f"cannot merge: {e}")
+        elif args.shard:
+            index, count = args.shard
+            monitor.run_shard(keywords, args.shard, args.output or f"ai_visibility_partial_{index}of{count}.json")
+        else:
+            monitor.run_monitoring_session(keywords=keywords)
     
-    monitor.run_monitoring_session(keywords=args.keywords)
+    if args.mock_server:
+        mock_config = {**monitor.mock_server_config, "brand": monitor.brand_name}
+        if args.seed is not None:
+            mock_config["seed"] = args.seed
+        with serve_mock(mock_config) as base_url:
+            monitor.client_config = {"default": {"type": "http", "base_url": base_url, "stream": args.stream,
+                                                 **monitor.client_config.get("mock", {})}}
+            run()
+    else:
+        if args.stream:
+            for options in monitor.client_config.values():
+                options["stream"] = True
+        run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
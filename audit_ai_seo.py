@@ -7,12 +7,21 @@ Identifies missing schema markup, FAQs, and optimization opportunities
 import os
 import re
 import json
+import time
+import argparse
 from pathlib import Path
 from typing import Dict, List
 
+from audit_history import AuditHistory
+from openmetrics import MetricsRegistry
+
+STATUS_LISTS = {'passed': 'passed', 'warning': 'warnings', 'issue': 'issues'}
+
 class AISEOAuditor:
-    def __init__(self):
+    def __init__(self, history_db: str = ".build_cache/audit_history.db", metrics_file: str = None):
         self.posts_dir = Path("blog/posts")
+        self.history_db = history_db
+        self.metrics_file = metrics_file
         self.results = []
         
     def audit_all_posts(self):
@@ -24,12 +33,22 @@ class AISEOAuditor:
         html_files = list(self.posts_dir.glob("*.html"))
         print(f"Found {len(html_files)} blog posts to audit\n")
         
+        started = time.perf_counter()
         for html_file in html_files:
             result = self.audit_post(html_file)
             self.results.append(result)
+        duration = time.perf_counter() - started
         
         self.print_summary()
         self.save_report()
+        self.record_history()
+        if self.metrics_file:
+            self.export_metrics(duration)
+    
+    def add_check(self, result: Dict, rule: str, status: str, message: str) -> None:
+        """Record a check outcome under its rule id and in the matching message list"""
+        result[STATUS_LISTS[status]].append(message)
+        result['rules'][rule] = status
     
     def audit_post(self, html_file: Path) -> Dict:
         """Audit a single blog post"""
@@ -41,68 +60,69 @@ class AISEOAuditor:
             'issues': [],
             'warnings': [],
             'passed': [],
+            'rules': {},
             'score': 0
         }
         
         # Check for FAQPage schema
         if '"@type":\s*"FAQPage"' in content or '"@type":"FAQPage"' in content:
-            result['passed'].append('FAQPage schema found')
+            self.add_check(result, 'faq_schema', 'passed', 'FAQPage schema found')
         else:
-            result['issues'].append('Missing FAQPage schema')
+            self.add_check(result, 'faq_schema', 'issue', 'Missing FAQPage schema')
         
         # Check for HowTo schema
         if '"@type":\s*"HowTo"' in content or '"@type":"HowTo"' in content:
-            result['passed'].append('HowTo schema found')
+            self.add_check(result, 'howto_schema', 'passed', 'HowTo schema found')
         else:
             # Check if it's a tutorial/guide post
             if any(word in content.lower() for word in ['how to', 'step', 'guide', 'tutorial']):
-                result['warnings'].append('Missing HowTo schema (recommended for guides)')
+                self.add_check(result, 'howto_schema', 'warning', 'Missing HowTo schema (recommended for guides)')
         
         # Check for FAQ section in content
         faq_indicators = ['FAQ', 'frequently asked', 'common questions', 'Q&A']
         has_faq_content = any(re.search(indicator, content, re.IGNORECASE) for indicator in faq_indicators)
         if has_faq_content:
-            result['passed'].append('FAQ content found')
+            self.add_check(result, 'faq_content', 'passed', 'FAQ content found')
         else:
-            result['warnings'].append('No FAQ section in content')
+            self.add_check(result, 'faq_content', 'warning', 'No FAQ section in content')
         
         # Check for question-based headings
         question_headings = re.findall(r'<h[2-4][^>]*>.*\?.*</h[2-4]>', content, re.IGNORECASE)
         if len(question_headings) >= 3:
-            result['passed'].append(f'Found {len(question_headings)} question-based headings')
+            self.add_check(result, 'question_headings', 'passed', f'Found {len(question_headings)} question-based headings')
         elif len(question_headings) > 0:
-            result['warnings'].append(f'Only {len(question_headings)} question-based headings (recommended: 3+)')
+            self.add_check(result, 'question_headings', 'warning', f'Only {len(question_headings)} question-based headings (recommended: 3+)')
         else:
-            result['warnings'].append('No question-based headings found')
+            self.add_check(result, 'question_headings', 'warning', 'No question-based headings found')
         
         # Check for BlogPosting schema
         if '"@type":\s*"BlogPosting"' in content or '"@type":"BlogPosting"' in content:
-            result['passed'].append('BlogPosting schema found')
+            self.add_check(result, 'blogposting_schema', 'passed', 'BlogPosting schema found')
         else:
-            result['issues'].append('Missing BlogPosting schema')
+            self.add_check(result, 'blogposting_schema', 'issue', 'Missing BlogPosting schema')
         
         # Check for Organization schema
         if '"@type":\s*"Organization"' in content or '"@type":"Organization"' in content:
-            result['passed'].append('Organization schema found')
+            self.add_check(result, 'organization_schema', 'passed', 'Organization schema found')
         else:
-            result['warnings'].append('Missing Organization schema')
+            self.add_check(result, 'organization_schema', 'warning', 'Missing Organization schema')
         
         # Check meta description length
         desc_match = re.search(r'<meta\s+name=["\']description["\']\s+content=["\']([^"\']+)["\']', content, re.IGNORECASE)
         if desc_match:
             desc_length = len(desc_match.group(1))
             if 150 <= desc_length <= 160:
-                result['passed'].append(f'Meta description length optimal ({desc_length} chars)')
+                self.add_check(result, 'meta_description_length', 'passed', f'Meta description length optimal ({desc_length} chars)')
             else:
-                result['warnings'].append(f'Meta description length: {desc_length} chars (recommended: 150-160)')
+                self.add_check(result, 'meta_description_length', 'warning', f'Meta description length: {desc_length} chars (recommended: 150-160)')
         
         # Check for conversational keywords
         conversational_keywords = ['how to', 'what is', 'why', 'when', 'where', 'can i', 'should i']
         conversational_count = sum(1 for keyword in conversational_keywords if re.search(keyword, content, re.IGNORECASE))
         if conversational_count >= 3:
-            result['passed'].append('Conversational language found')
+            self.add_check(result, 'conversational_keywords', 'passed', 'Conversational language found')
         else:
-            result['warnings'].append('Limited conversational keywords')
+            self.add_check(result, 'conversational_keywords', 'warning', 'Limited conversational keywords')
         
         # Calculate score
         total_checks = len(result['passed']) + len(result['warnings']) + len(result['issues'])
@@ -193,9 +213,46 @@ class AISEOAuditor:
             }, f, indent=2)
         
         print(f"\nDetailed report saved to: {report_file}")
+    
+    def record_history(self):
+        """Append this audit's per-post scores and rule outcomes to the history store"""
+        history = AuditHistory(self.history_db)
+        history.record_run('ai_seo_audit', [
+            {'subject': r['filename'], 'score': r['score'], 'rules': r['rules']}
+            for r in self.results
+        ])
+        drops = history.score_drops('ai_seo_audit')
+        history.close()
+        
+        if drops:
+            print(f"[WARNING] {len(drops)} posts scored lower than a week ago:")
+            for drop in drops:
+                print(f"  - {drop['subject']}: {drop['before']:g} -> {drop['after']:g}")
+
+    def export_metrics(self, duration: float):
+        """Write per-post scores and rule outcomes as OpenMetrics text"""
+        metrics = MetricsRegistry()
+        metrics.gauge("ai_seo_audit_seconds", duration, "Time spent auditing posts", "seconds")
+        metrics.gauge("ai_seo_posts_audited", len(self.results), "Posts audited")
+        if self.results:
+            metrics.gauge("ai_seo_average_score", sum(r['score'] for r in self.results) / len(self.results),
+                          "Average AI-SEO score (0-100)")
+        
+        rule_counts = {}
+        for r in self.results:
+            metrics.gauge("ai_seo_post_score", r['score'], "AI-SEO score per post (0-100)", post=r['filename'])
+            for rule, status in r['rules'].items():
+                rule_counts[(rule, status)] = rule_counts.get((rule, status), 0) + 1
+        for (rule, status), count in rule_counts.items():
+            metrics.gauge("ai_seo_rule_posts", count, "Posts per rule outcome", rule=rule, status=status)
+        metrics.write(self.metrics_file)
 
 def main():
-    auditor = AISEOAuditor()
+    parser = argparse.ArgumentParser(description='Audit blog posts for AI-SEO readiness')
+    parser.add_argument('--metrics-file', help='Also write results as an OpenMetrics text file')
+    args = parser.parse_args()
+    
+    auditor = AISEOAuditor(metrics_file=args.metrics_file)
     auditor.audit_all_posts()
 
 if __name__ == "__main__":
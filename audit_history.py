@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Append-only history of audit results
+Stores per-run, per-subject scores, per-rule outcomes and numeric metrics from
+AISEOAuditor and SEOMonitor in SQLite, so trend and regression queries run
+against indexed columns instead of reloading old JSON snapshots.
+"""
+
+import argparse
+import math
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    run_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_source_time ON runs (source, run_at);
+
+CREATE TABLE IF NOT EXISTS scores (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    source TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    run_at TEXT NOT NULL,
+    score REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_subject_time ON scores (source, subject, run_at);
+
+CREATE TABLE IF NOT EXISTS rule_results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    source TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rules_run ON rule_results (run_id, subject, rule);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    source TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_run ON metrics (source, metric, run_id);
+"""
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+class AuditHistory:
+    def __init__(self, db_file: str = ".build_cache/audit_history.db"):
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record_run(self, source: str, results: List[Dict], run_at: str = None) -> int:
+        """Append one run; each result is {subject, score, rules: {rule: status}, metrics: {name: value}}"""
+        run_at = run_at or datetime.now().isoformat(timespec='seconds')
+
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (source, run_at) VALUES (?, ?)", (source, run_at)
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO scores (run_id, source, subject, run_at, score) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, source, r['subject'], run_at, r['score']) for r in results]
+            )
+            self.conn.executemany(
+                "INSERT INTO rule_results (run_id, source, subject, rule, status) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, source, r['subject'], rule, status)
+                 for r in results for rule, status in r.get('rules', {}).items()]
+            )
+            self.conn.executemany(
+                "INSERT INTO metrics (run_id, source, subject, metric, value) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, source, r['subject'], metric, value)
+                 for r in results for metric, value in r.get('metrics', {}).items() if value is not None]
+            )
+        return run_id
+
+    def latest_runs(self, source: str, limit: int = 2) -> List[sqlite3.Row]:
+        """Most recent runs for a source, newest first"""
+        return self.conn.execute(
+            "SELECT id, run_at FROM runs WHERE source = ? ORDER BY run_at DESC, id DESC LIMIT ?",
+            (source, limit)
+        ).fetchall()
+
+    def score_history(self, source: str, subject: str) -> List[sqlite3.Row]:
+        """Score of one subject across all runs, oldest first"""
+        return self.conn.execute(
+            "SELECT run_at, score FROM scores WHERE source = ? AND subject = ? ORDER BY run_at",
+            (source, subject)
+        ).fetchall()
+
+    def score_drops(self, source: str, days: int = 7) -> List[Dict]:
+        """Subjects whose latest score is lower than their last score from before the cutoff"""
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+        rows = self.conn.execute("""
+            WITH latest AS (
+                SELECT subject, score, MAX(run_at) AS run_at
+                FROM scores WHERE source = ? GROUP BY subject
+            ),
+            baseline AS (
+                SELECT subject, score, MAX(run_at) AS run_at
+                FROM scores WHERE source = ? AND run_at <= ? GROUP BY subject
+            )
+            SELECT latest.subject, baseline.score AS before, latest.score AS after,
+                   baseline.run_at AS before_at, latest.run_at AS after_at
+            FROM latest JOIN baseline ON latest.subject = baseline.subject
+            WHERE latest.score < baseline.score
+            ORDER BY latest.score - baseline.score
+        """, (source, source, cutoff)).fetchall()
+        return [dict(row) for row in rows]
+
+    def metric_percentiles(self, source: str, metric: str, runs: int = 10,
+                           percentiles=(50, 95)) -> Dict[str, float]:
+        """Percentiles of a metric across all subjects of the latest runs"""
+        run_ids = [row['id'] for row in self.latest_runs(source, limit=runs)]
+        if not run_ids:
+            return {}
+
+        placeholders = ','.join('?' * len(run_ids))
+        values = [row['value'] for row in self.conn.execute(
+            f"SELECT value FROM metrics WHERE source = ? AND metric = ? AND run_id IN ({placeholders})",
+            (source, metric, *run_ids)
+        )]
+        if not values:
+            return {}
+        return {f"p{pct}": percentile(values, pct) for pct in percentiles}
+
+    def rule_regressions(self, source: str) -> List[Dict]:
+        """Rules that passed in the previous run but not in the latest one"""
+        runs = self.latest_runs(source, limit=2)
+        if len(runs) < 2:
+            return []
+
+        latest_id, previous_id = runs[0]['id'], runs[1]['id']
+        rows = self.conn.execute("""
+            SELECT cur.subject, cur.rule, prev.status AS before, cur.status AS after
+            FROM rule_results AS cur
+            JOIN rule_results AS prev
+              ON prev.run_id = ? AND prev.subject = cur.subject AND prev.rule = cur.rule
+            WHERE cur.run_id = ? AND prev.status = 'passed' AND cur.status != 'passed'
+            ORDER BY cur.subject, cur.rule
+        """, (previous_id, latest_id)).fetchall()
+        return [dict(row) for row in rows]
+
+def main():
+    parser = argparse.ArgumentParser(description='Query audit score history')
+    parser.add_argument('query', choices=['drops', 'regressions', 'history'], help='Query to run')
+    parser.add_argument('--source', default='ai_seo_audit',
+                        help='Audit source (ai_seo_audit or seo_monitor)')
+    parser.add_argument('--days', type=int, default=7, help='Look-back window for drops')
+    parser.add_argument('--subject', help='Post or page for the history query')
+    parser.add_argument('--db', default='.build_cache/audit_history.db', help='History database file')
+    args = parser.parse_args()
+
+    history = AuditHistory(args.db)
+
+    if args.query == 'drops':
+        drops = history.score_drops(args.source, args.days)
+        print(f"Score drops in the last {args.days} days: {len(drops)}")
+        for drop in drops:
+            print(f"  - {drop['subject']}: {drop['before']:g} -> {drop['after']:g}")
+    elif args.query == 'regressions':
+        regressions = history.rule_regressions(args.source)
+        print(f"Rule regressions since previous run: {len(regressions)}")
+        for reg in regressions:
+            print(f"  - {reg['subject']}: {reg['rule']} ({reg['before']} -> {reg['after']})")
+    elif args.query == 'history':
+        if not args.subject:
+            parser.error("history requires --subject")
+        for row in history.score_history(args.source, args.subject):
+            print(f"  {row['run_at']}  {row['score']:g}")
+
+    history.close()
+
+if __name__ == "__main__":
+    main()
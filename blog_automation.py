@@ -11,6 +11,10 @@ from datetime import datetime
 from pathlib import Path
 import argparse
 
+from content_metrics import extract_content_metrics
+from duplicate_content import DuplicateContentDetector
+from openmetrics import MetricsRegistry
+
 class BlogAutomation:
     def __init__(self):
         self.posts_dir = Path("blog/posts")
@@ -18,7 +22,14 @@ class BlogAutomation:
         self.manifest_file = self.posts_dir / "manifest.json"
         self.blogs_html = Path("blog/blogs.html")
         self.sitemap_file = Path("sitemap.xml")
+        # Stage durations and counts, written out with --metrics-file
+        self.metrics = MetricsRegistry()
         
+    def run_stage(self, stage, func, *args):
+        """Run one build stage, recording its duration"""
+        with self.metrics.timer("blog_stage", "Duration of each blog build stage", stage=stage):
+            return func(*args)
+    
     def discover_blog_posts(self):
         """Automatically discover all blog posts in the posts directory"""
         if not self.posts_dir.exists():
@@ -71,7 +82,8 @@ class BlogAutomation:
                 'title': title,
                 'date': date,
                 'excerpt': excerpt,
-                'url': url.replace('https://tidiful.com/', '')
+                'url': url.replace('https://tidiful.com/', ''),
+                'metrics': extract_content_metrics(content)
             }
         except Exception as e:
             print(f"[ERROR] Could not extract metadata from {html_file.name}: {e}")
@@ -381,32 +393,44 @@ class BlogAutomation:
             print(f"[ERROR] Could not update sitemap: {e}")
             return False
     
+    def check_duplicate_content(self):
+        """Warn about near-duplicate posts (templated descriptions, copied bodies)"""
+        detector = DuplicateContentDetector(posts_dir=str(self.posts_dir))
+        duplicates = detector.find_duplicates()
+        detector.print_report(duplicates)
+        return duplicates
+    
     def run_full_automation(self):
         """Run the complete blog automation process"""
         print("Starting automated blog post management...")
         
         # Step 1: Discover posts
-        posts = self.discover_blog_posts()
+        posts = self.run_stage("discover", self.discover_blog_posts)
+        self.metrics.gauge("blog_posts_processed", len(posts), "Blog posts discovered and processed")
         if not posts:
             print("[WARNING] No blog posts found")
             return False
         
         print(f"[INFO] Discovered {len(posts)} blog posts")
         
+        # Near-duplicate content is reported but does not block the build
+        duplicates = self.run_stage("duplicates", self.check_duplicate_content)
+        self.metrics.gauge("blog_duplicate_pairs", len(duplicates), "Near-duplicate post pairs found")
+        
         # Step 2: Generate manifest
-        if not self.generate_manifest(posts):
+        if not self.run_stage("manifest", self.generate_manifest, posts):
             return False
         
         # Step 3: Generate static posts
-        if not self.generate_static_posts(posts):
+        if not self.run_stage("static", self.generate_static_posts, posts):
             return False
         
         # Step 4: Update blogs.html
-        if not self.update_blogs_html(posts):
+        if not self.run_stage("blogs_html", self.update_blogs_html, posts):
             return False
         
         # Step 5: Update sitemap
-        if not self.update_sitemap(posts):
+        if not self.run_stage("sitemap", self.update_sitemap, posts):
             return False
         
         print("[SUCCESS] Blog automation completed successfully!")
@@ -414,8 +438,9 @@ class BlogAutomation:
 
 def main():
     parser = argparse.ArgumentParser(description='Automated Blog Post Management')
-    parser.add_argument('--action', choices=['full', 'manifest', 'static', 'update', 'discover'], 
+    parser.add_argument('--action', choices=['full', 'manifest', 'static', 'update', 'discover', 'duplicates'], 
                        default='full', help='Action to perform')
+    parser.add_argument('--metrics-file', help='Also write stage durations and counts as an OpenMetrics text file')
     
     args = parser.parse_args()
     
@@ -438,6 +463,13 @@ def main():
     elif args.action == 'update':
         posts = automation.discover_blog_posts()
         success = automation.update_blogs_html(posts) and automation.update_sitemap(posts)
+    elif args.action == 'duplicates':
+        success = not automation.check_duplicate_content()
+    
+    if args.metrics_file:
+        automation.metrics.gauge("blog_build_success", 1 if success else 0, "Whether the last build action succeeded",
+                                 action=args.action)
+        automation.metrics.write(args.metrics_file)
     
     exit(0 if success else 1)
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Run-over-run change snapshots for the monitors
+Keeps a compact snapshot of per-subject, per-field hashes from the previous
+run, so each run can emit a delta report with only the fields that changed
+instead of a human diffing full JSON reports.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+def fingerprint(value: Any) -> str:
+    """Short stable hash of a JSON-serializable value"""
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+def flatten_fields(record: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested dicts into dotted field names; lists are hashed as one field"""
+    fields = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            fields.update(flatten_fields(value, f"{prefix}{key}."))
+        else:
+            fields[f"{prefix}{key}"] = value
+    return fields
+
+class ChangeSnapshot:
+    def __init__(self, snapshot_file: str, ignore_fields: Iterable[str] = ()):
+        self.snapshot_file = Path(snapshot_file)
+        # Volatile fields (timings, timestamps) would otherwise show up as changed every run.
+        # Dotted names match that field only; bare names match the field at any depth.
+        self.ignore_fields = set(ignore_fields)
+        self.previous = self.load()
+
+    def load(self) -> Dict:
+        if not self.snapshot_file.exists():
+            return {}
+
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[WARNING] Ignoring unreadable snapshot {self.snapshot_file}: {e}")
+            return {}
+
+    def ignored(self, field: str) -> bool:
+        return field in self.ignore_fields or field.rsplit('.', 1)[-1] in self.ignore_fields
+
+    def save(self, snapshot: Dict) -> None:
+        self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.snapshot_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+
+    def take(self, records: Dict[str, Dict[str, Any]]) -> Dict:
+        """Hash every tracked field of every subject"""
+        return {
+            "taken_at": datetime.now().isoformat(timespec='seconds'),
+            "subjects": {
+                subject: {field: fingerprint(value) for field, value in flatten_fields(record).items()
+                          if not self.ignored(field)}
+                for subject, record in records.items()
+            }
+        }
+
+    def delta(self, records: Dict[str, Dict[str, Any]]) -> Dict:
+        """Compare records with the previous snapshot and save the new one
+
+        Only fields whose hash changed carry their new value; removed fields
+        are listed by name.
+        """
+        snapshot = self.take(records)
+        previous = self.previous.get("subjects")
+        delta = {
+            "generated_at": snapshot["taken_at"],
+            "previous_at": self.previous.get("taken_at"),
+            "subjects": len(records)
+        }
+
+        if previous is None:
+            # First run: the full report is the baseline
+            delta["baseline"] = True
+        else:
+            current = snapshot["subjects"]
+            delta["added"] = sorted(set(current) - set(previous))
+            delta["removed"] = sorted(set(previous) - set(current))
+            delta["changed"] = {}
+            for subject in sorted(set(current) & set(previous)):
+                old, new = previous[subject], current[subject]
+                if old == new:
+                    continue
+                fields = flatten_fields(records[subject])
+                changes = {field: fields[field] for field, digest in new.items() if old.get(field) != digest}
+                gone = sorted(set(old) - set(new))
+                if gone:
+                    changes["_removed_fields"] = gone
+                delta["changed"][subject] = changes
+
+        self.save(snapshot)
+        self.previous = snapshot
+        return delta
+
+    def write_delta(self, delta: Dict, delta_file: str) -> None:
+        with open(delta_file, 'w', encoding='utf-8') as f:
+            json.dump(delta, f, indent=2, ensure_ascii=False)
+
+        if delta.get("baseline"):
+            print(f"Change snapshot baseline recorded ({delta['subjects']} subjects), delta saved to {delta_file}")
+        else:
+            print(f"Changes since {delta['previous_at']}: {len(delta['changed'])} changed, "
+                  f"{len(delta['added'])} added, {len(delta['removed'])} removed (saved to {delta_file})")
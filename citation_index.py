@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Citation attribution index for AI visibility
+A BM25 index over the site's pages, built from the same article text
+extraction the blog manifest and duplicate detection use, and stored in
+the build cache as NumPy arrays. The monitor scores every answer that
+mentions the brand against all pages with one matrix product, so it can
+tell which pages AI answers draw on and report each page's citation share.
+"""
+
+import argparse
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from change_snapshot import fingerprint
+from content_metrics import extract_article_text
+from keyword_planner import stem
+
+DEFAULT_PAGES = ("*.html", "blog/posts/*.html")
+# Pages with no content an answer could draw on
+DEFAULT_EXCLUDE = ("login.html", "test-mobile-menu.html", "ai_visibility_dashboard.html")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from", "has", "have", "how", "in", "into",
+    "is", "it", "its", "of", "on", "or", "that", "the", "their", "this", "to", "was", "what", "when", "which",
+    "will", "with", "you", "your", "our", "we", "more", "all", "also"
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed content words"""
+    return [stem(word) for word in re.findall(r'[^\W\d_]{2,}', text.casefold()) if word not in STOPWORDS]
+
+def collect_pages(root: str = ".", patterns: Sequence[str] = DEFAULT_PAGES,
+                  exclude: Sequence[str] = DEFAULT_EXCLUDE) -> List[Path]:
+    """Site pages to index, relative to root"""
+    root_path = Path(root)
+    pages = {path.relative_to(root_path) for pattern in patterns for path in root_path.glob(pattern)}
+    return sorted(page for page in pages if page.as_posix() not in exclude)
+
+def page_text(content: str) -> str:
+    """Title, meta description and article text of a page, without the shared navigation and footer"""
+    content = re.sub(r'<(nav|header|footer)\b[^>]*>.*?</\1>', ' ', content, flags=re.DOTALL | re.IGNORECASE)
+    title = re.search(r'<title[^>]*>(.*?)</title>', content, re.DOTALL | re.IGNORECASE)
+    description = re.search(r'<meta\s+name=["\']description["\']\s+content=["\']([^"\']*)["\']', content,
+                            re.IGNORECASE)
+    return ' '.join([title.group(1) if title else '', description.group(1) if description else '',
+                     extract_article_text(content)])
+
+def pages_signature(root: str, pages: List[Path]) -> str:
+    """Changes whenever a page is added, removed or edited"""
+    stats = [(page.as_posix(), (Path(root) / page).stat().st_mtime_ns, (Path(root) / page).stat().st_size)
+             for page in pages]
+    return fingerprint(stats)
+
+class CitationIndex:
+    def __init__(self, pages: List[str], terms: List[str], weights: np.ndarray, signature: str = ""):
+        self.pages = pages
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        # pages x terms BM25 weights; an answer's score for a page is the sum over its terms
+        self.weights = weights
+        self.signature = signature
+
+    @classmethod
+    def build(cls, root: str = ".", patterns: Sequence[str] = DEFAULT_PAGES,
+              exclude: Sequence[str] = DEFAULT_EXCLUDE, k1: float = 1.2, b: float = 0.75) -> "CitationIndex":
+        pages = collect_pages(root, patterns, exclude)
+        counts = []
+        for page in pages:
+            with open(Path(root) / page, 'r', encoding='utf-8', errors='replace') as f:
+                counts.append(Counter(tokenize(page_text(f.read()))))
+
+        terms = sorted({term for page_counts in counts for term in page_counts})
+        vocabulary = {term: i for i, term in enumerate(terms)}
+        tf = np.zeros((len(pages), len(terms)))
+        for row, page_counts in enumerate(counts):
+            tf[row, [vocabulary[t] for t in page_counts]] = list(page_counts.values())
+
+        if len(pages):
+            df = (tf > 0).sum(axis=0)
+            idf = np.log(1 + (len(pages) - df + 0.5) / (df + 0.5))
+            lengths = tf.sum(axis=1, keepdims=True)
+            norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1))
+            weights = idf * tf * (k1 + 1) / (tf + norm)
+        else:
+            weights = tf
+        return cls([page.as_posix() for page in pages], terms, weights.astype(np.float32),
+                   pages_signature(root, pages))
+
+    def save(self, index_file: str) -> None:
+        path = Path(index_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, pages=np.array(self.pages, dtype=str),
+                                terms=np.array(list(self.vocabulary), dtype=str),
+                                weights=self.weights, signature=np.array(self.signature))
+
+    @classmethod
+    def load(cls, index_file: str) -> "CitationIndex":
+        with np.load(index_file) as data:
+            return cls(data["pages"].tolist(), data["terms"].tolist(), data["weights"], str(data["signature"]))
+
+    @classmethod
+    def open(cls, index_file: str, root: str = ".", patterns: Sequence[str] = DEFAULT_PAGES,
+             exclude: Sequence[str] = DEFAULT_EXCLUDE) -> "CitationIndex":
+        """The saved index, rebuilt first if any page changed since it was built"""
+        signature = pages_signature(root, collect_pages(root, patterns, exclude))
+        if Path(index_file).exists():
+            try:
+                index = cls.load(index_file)
+                if index.signature == signature:
+                    return index
+            except (OSError, ValueError, KeyError):
+                pass
+        index = cls.build(root, patterns, exclude)
+        index.save(index_file)
+        print(f"Citation index rebuilt: {len(index.pages)} pages, {len(index.vocabulary)} terms -> {index_file}")
+        return index
+
+    def search(self, texts: List[str], top_k: int = 3) -> List[List[Tuple[str, float]]]:
+        """The top_k most similar pages, with BM25 scores, for each text; all texts in one batch"""
+        if not texts or not self.pages:
+            return [[] for _ in texts]
+
+        queries = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term, count in Counter(tokenize(text)).items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    queries[row, column] = count
+
+        scores = queries @ self.weights.T
+        top = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+        return [[(self.pages[p], round(float(scores[row, p]), 3)) for p in top[row] if scores[row, p] > 0]
+                for row in range(len(texts))]
+
+def citation_share(cited: List[List[Tuple[str, float]]]) -> Dict[str, float]:
+    """Share of answers whose best-matching page is each page, largest first"""
+    best = Counter(matches[0][0] for matches in cited if matches)
+    total = sum(best.values())
+    return {page: round(count / total, 3) for page, count in best.most_common()} if total else {}
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the site citation index')
+    parser.add_argument('command', choices=['build', 'query'], help='build the index, or find pages for a text')
+    parser.add_argument('text', nargs='?', help='Answer text to attribute (query)')
+    parser.add_argument('--index', default='.build_cache/citation_index.npz', help='Index file')
+    parser.add_argument('--root', default='.', help='Site root')
+    parser.add_argument('--top', type=int, default=3, help='Pages to show per query')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = CitationIndex.build(args.root)
+        index.save(args.index)
+        print(f"Indexed {len(index.pages)} pages, {len(index.vocabulary)} terms -> {args.index}")
+        return
+
+    if not args.text:
+        parser.error("query needs a text")
+    index = CitationIndex.open(args.index, args.root)
+    for page, score in index.search([args.text], args.top)[0]:
+        print(f"  {score:8.3f}  {page}")
+
+if __name__ == "__main__":
+    main()
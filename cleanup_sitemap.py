@@ -3,6 +3,8 @@
 
 from pathlib import Path
 
+from sitemap_stream import SitemapReader
+
 def cleanup_sitemap():
     sitemap_file = Path("sitemap.xml")
     
@@ -25,6 +27,16 @@ def cleanup_sitemap():
         f.writelines(cleaned_lines)
     
     print(f"[OK] Cleaned up sitemap.xml (removed excessive empty lines)")
+    
+    # Make sure the cleanup left a sitemap crawlers will accept
+    reader = SitemapReader()
+    for _ in reader.entries(sitemap_file):
+        pass
+    for problem in reader.errors + reader.warnings:
+        print(f"[WARNING] {problem}")
+    if reader.valid:
+        print(f"[OK] sitemap.xml is valid with {reader.url_count} URLs")
+    return reader.valid
 
 if __name__ == "__main__":
     cleanup_sitemap()
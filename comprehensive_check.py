@@ -5,6 +5,8 @@ import json
 import re
 from pathlib import Path
 
+from sitemap_stream import SitemapReader, files_under
+
 print("=" * 70)
 print("COMPREHENSIVE BLOG SYSTEM CHECK")
 print("=" * 70)
@@ -26,11 +28,11 @@ actual_static_files = {f.name for f in static_dir.glob("*.html")}
 
 # 4. Check sitemap
 sitemap_path = Path("sitemap.xml")
-with open(sitemap_path, 'r', encoding='utf-8') as f:
-    sitemap_content = f.read()
+sitemap = SitemapReader()
+sitemap_files = files_under(sitemap.entries(sitemap_path), "/blog/posts/", "/blog/static/")
 
-sitemap_post_urls = set(re.findall(r'<loc>https://tidiful\.com/blog/posts/([^<]+)</loc>', sitemap_content))
-sitemap_static_urls = set(re.findall(r'<loc>https://tidiful\.com/blog/static/([^<]+)</loc>', sitemap_content))
+sitemap_post_urls = set(sitemap_files["/blog/posts/"])
+sitemap_static_urls = set(sitemap_files["/blog/static/"])
 
 print("\n[FILE INTEGRITY CHECK]")
 print(f"   Manifest posts: {len(manifest_filenames)}")
@@ -63,6 +65,12 @@ if orphaned_static:
     for static in orphaned_static:
         print(f"   [WARNING] Static file not in sitemap: {static}")
 
+# Sitemap structure, URLs, lastmod dates and duplicates
+if sitemap.errors:
+    issues.append("INVALID SITEMAP")
+    for error in sitemap.errors:
+        print(f"   [ERROR] {error}")
+
 # Posts in manifest but not in sitemap
 missing_in_sitemap = manifest_filenames - sitemap_post_urls
 if missing_in_sitemap:
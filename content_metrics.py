@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Content metrics for blog posts
+Computed once per post during manifest extraction and stored in the manifest,
+so validators, JSON-LD wordCount injection and listing cards reuse them
+instead of re-parsing the HTML. Metrics are computed from the page without
+its <head>, which the SEO fixes rewrite but which holds nothing the metrics
+count. Stored metrics carry a hash of that source and are recomputed when the
+post has been edited since.
+"""
+
+import hashlib
+import json
+import math
+import re
+from html import unescape
+from pathlib import Path
+from typing import Dict, List
+
+WORDS_PER_MINUTE = 200
+# Deeper headings are only counted, keeping the manifest small for the listing page
+OUTLINE_MAX_LEVEL = 2
+INTERNAL_LINK_PATTERN = r'<a[^>]+href=["\'](?:\.\./|\./|/|https?://tidiful\.com)[^"\']+["\']'
+EXTERNAL_LINK_PATTERN = r'<a[^>]+href=["\']https?://(?!tidiful\.com)[^"\']+["\']'
+HEAD_PATTERN = re.compile(r'<head\b.*?</head>', re.DOTALL | re.IGNORECASE)
+
+def extract_article_html(content: str) -> str:
+    """Return the post's article markup, without shared navigation and footer"""
+    articles = re.findall(r'<article[^>]*>(.*?)</article>', content, re.DOTALL | re.IGNORECASE)
+    if articles:
+        return ' '.join(articles)
+
+    main_match = re.search(r'<main[^>]*>(.*?)</main>', content, re.DOTALL | re.IGNORECASE)
+    return main_match.group(1) if main_match else content
+
+def html_to_text(html: str) -> str:
+    """Strip scripts, styles and tags from HTML"""
+    html = re.sub(r'<(script|style)[^>]*>.*?</\1>', ' ', html, flags=re.DOTALL | re.IGNORECASE)
+    return unescape(re.sub(r'<[^>]+>', ' ', html))
+
+def extract_article_text(content: str) -> str:
+    """Return the visible text of the post's article"""
+    return html_to_text(extract_article_html(content))
+
+def extract_headings(content: str) -> List[Dict]:
+    """Return every heading in document order as {level, text}"""
+    headings = re.findall(r'<h([1-6])[^>]*>(.*?)</h\1>', content, re.IGNORECASE | re.DOTALL)
+    return [{'level': int(level), 'text': ' '.join(html_to_text(text).split())}
+            for level, text in headings]
+
+def metrics_source(content: str) -> str:
+    """The page without its <head>: everything the metrics read, and none of the metadata fixes touch"""
+    return HEAD_PATTERN.sub('', content, count=1)
+
+def source_hash(content: str) -> str:
+    """Short hash of the markup the metrics are computed from"""
+    return hashlib.sha256(metrics_source(content).encode('utf-8')).hexdigest()[:16]
+
+def extract_content_metrics(content: str) -> Dict:
+    """Compute word count, reading time, heading outline, image and link counts"""
+    content = metrics_source(content)
+    word_count = len(re.findall(r'\w+', extract_article_text(content)))
+    headings = extract_headings(content)
+
+    return {
+        'sourceHash': source_hash(content),
+        'wordCount': word_count,
+        'readingTime': max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+        'headingCounts': {f'h{level}': sum(1 for h in headings if h['level'] == level)
+                          for level in range(1, 7)},
+        'outline': [h for h in headings if h['level'] <= OUTLINE_MAX_LEVEL],
+        'imageCount': len(re.findall(r'<img[^>]+>', content, re.IGNORECASE)),
+        'imagesWithAlt': len(re.findall(r'<img[^>]+alt=["\'][^"\']+["\']', content, re.IGNORECASE)),
+        'internalLinks': len(re.findall(INTERNAL_LINK_PATTERN, content, re.IGNORECASE)),
+        'externalLinks': len(re.findall(EXTERNAL_LINK_PATTERN, content, re.IGNORECASE))
+    }
+
+def current_metrics(content: str, metrics: Dict = None) -> Dict:
+    """The precomputed metrics if they still match the post's markup, else freshly computed ones"""
+    if metrics and metrics.get('sourceHash') == source_hash(content):
+        return metrics
+    return extract_content_metrics(content)
+
+def load_manifest_metrics(manifest_file: str = "blog/posts/manifest.json") -> Dict[str, Dict]:
+    """Load precomputed metrics per post filename from the manifest"""
+    manifest_path = Path(manifest_file)
+    if not manifest_path.exists():
+        return {}
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+    return {post['filename']: post['metrics'] for post in manifest.get('posts', []) if 'metrics' in post}
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Concurrent crawl engine for the SEO monitors
+- Shared keep-alive connection pool (one requests.Session)
+- Bounded concurrency with an asyncio semaphore
+- Per-host rate limit on request starts
+- Per-request timing, so a crawl takes roughly as long as its slowest pages
+- Queue-fed crawls, where each result can queue more URLs (e.g. a page's links)
+  while the other fetches keep going
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import HTTPCache
+
+class AsyncCrawler:
+    def __init__(self, concurrency: int = 8, per_host_rate: float = 10.0, timeout: float = 10,
+                 cache: HTTPCache = None):
+        self.concurrency = concurrency
+        # Cached URLs are revalidated with conditional GETs
+        self.cache = cache
+        # Minimum spacing between request starts against the same host
+        self.min_interval = 1.0 / per_host_rate if per_host_rate else 0.0
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = "TidiFul-SEOMonitor/1.0"
+
+        self._host_locks = {}
+        self._host_next_slot = {}
+
+    def close(self) -> None:
+        self.session.close()
+
+    async def _wait_for_host_slot(self, host: str) -> None:
+        """Block until the host's rate limit allows another request to start"""
+        if not self.min_interval:
+            return
+
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            next_slot = self._host_next_slot.get(host, now)
+            if next_slot > now:
+                await asyncio.sleep(next_slot - now)
+            self._host_next_slot[host] = max(now, next_slot) + self.min_interval
+
+    def _get(self, url: str, headers: Dict = None) -> Dict:
+        """Blocking GET on the shared session, with timing"""
+        if self.cache:
+            headers = {**(headers or {}), **self.cache.conditional_headers(url)}
+        
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+            body = response.content
+            return {
+                "url": url,
+                "status": response.status_code,
+                "headers": dict(response.headers),
+                "content": body,
+                "text": response.text,
+                "bytes": len(body),
+                # Bytes on the wire, before Content-Encoding is undone
+                "transfer_bytes": response.raw.tell() or len(body),
+                "ttfb": response.elapsed.total_seconds(),
+                "total_time": time.perf_counter() - started
+            }
+        except requests.RequestException as e:
+            return {"url": url, "error": str(e), "total_time": time.perf_counter() - started}
+
+    async def fetch(self, url: str, semaphore: asyncio.Semaphore, executor: Executor,
+                    headers: Dict = None) -> Dict:
+        """Fetch one URL within the concurrency bound and host rate limit"""
+        async with semaphore:
+            await self._wait_for_host_slot(urlparse(url).netloc)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(self._get, url, headers))
+
+    async def crawl_async(self, urls: List[str], headers: Dict = None) -> Dict[str, Dict]:
+        """Fetch all URLs concurrently, returning results keyed by URL"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # asyncio locks are bound to the running loop, so each crawl gets fresh ones
+        self._host_locks = {}
+        # Blocking session calls run on a pool sized to the concurrency bound
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = await asyncio.gather(*(self.fetch(url, semaphore, executor, headers) for url in urls))
+        return {result["url"]: result for result in results}
+
+    def crawl(self, urls: List[str], headers: Dict = None) -> Dict[str, Dict]:
+        """Synchronous entry point for crawl_async"""
+        return asyncio.run(self.crawl_async(urls, headers))
+
+    async def crawl_queue_async(self, next_url: Callable[[], Optional[str]], on_result: Callable[[Dict], None],
+                                headers: Dict = None) -> Dict[str, Dict]:
+        """Fetch URLs handed out by next_url() until it runs dry with no fetch in flight
+
+        A pool of workers pulls from next_url() as soon as each finishes a fetch.
+        on_result runs on the event loop as each fetch completes and may queue
+        more URLs, so a slow page only holds up its own worker rather than a
+        whole batch. Returns all results keyed by URL, like crawl_async.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self._host_locks = {}
+        # Idle workers wait here for a running fetch to queue more URLs
+        wake = asyncio.Condition()
+        in_flight = 0
+        results = {}
+
+        async def worker(executor: Executor) -> None:
+            nonlocal in_flight
+            while True:
+                async with wake:
+                    url = next_url()
+                    while url is None and in_flight:
+                        await wake.wait()
+                        url = next_url()
+                    if url is None:
+                        wake.notify_all()
+                        return
+                    in_flight += 1
+                try:
+                    result = await self.fetch(url, semaphore, executor, headers)
+                    results[url] = result
+                    on_result(result)
+                finally:
+                    async with wake:
+                        in_flight -= 1
+                        wake.notify_all()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            await asyncio.gather(*(worker(executor) for _ in range(self.concurrency)))
+        return results
+
+    def crawl_queue(self, next_url: Callable[[], Optional[str]], on_result: Callable[[Dict], None],
+                    headers: Dict = None) -> Dict[str, Dict]:
+        """Synchronous entry point for crawl_queue_async"""
+        return asyncio.run(self.crawl_queue_async(next_url, on_result, headers))
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the production host
+
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def serve_directory(root: str = ".", port: int = 0):
+    """Serve a directory over local HTTP for crawl testing; yields the base URL"""
+    handler = functools.partial(_QuietHandler, directory=root)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Crawl frontier for the SEO monitors
+- Seeded from sitemap.xml, parsed as a stream so large sitemaps stay cheap
+- Grows with internal links discovered on crawled pages
+- URLs normalized to site paths; seen-set keeps 64-bit hashes, not strings
+- Depth and page budgets; recently modified pages are crawled first
+"""
+
+import hashlib
+import heapq
+import posixpath
+import re
+from datetime import datetime
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from sitemap_stream import SitemapReader
+
+# Only pages are monitored; assets linked from pages are skipped
+PAGE_EXTENSIONS = ('', '.html', '.htm')
+
+def iter_sitemap(source: BinaryIO) -> Iterator[Tuple[str, Optional[str]]]:
+    """Yield (loc, lastmod) per <url> entry without building the whole tree (gzip and indexes included)"""
+    for entry in SitemapReader().entries(source):
+        yield entry.loc, entry.lastmod
+
+def lastmod_timestamp(lastmod: Optional[str]) -> float:
+    """Parse a W3C datetime lastmod; unknown dates sort after dated ones"""
+    if not lastmod:
+        return 0.0
+    try:
+        return datetime.fromisoformat(lastmod.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return 0.0
+
+class CrawlFrontier:
+    def __init__(self, base_url: str = "https://tidiful.com", max_pages: int = 200, max_depth: int = 2,
+                 site_hosts: Tuple[str, ...] = ("tidiful.com", "www.tidiful.com")):
+        self.base_url = base_url.rstrip('/')
+        # Sitemap and page links use the production host even when crawling a local copy
+        self.hosts = {urlparse(self.base_url).netloc.lower(), *site_hosts}
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+
+        self._heap = []
+        self._seen = set()
+        self._counter = 0
+        self.popped = 0
+        self.over_budget = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def normalize(self, url: str, referrer: str = None) -> Optional[str]:
+        """Reduce a URL to a canonical site path, or None if it is not an internal page"""
+        parsed = urlparse(urljoin(referrer or f"{self.base_url}/", url.strip()))
+        if parsed.scheme not in ('http', 'https') or parsed.netloc.lower() not in self.hosts:
+            return None
+
+        path = posixpath.normpath(re.sub(r'/{2,}', '/', parsed.path or '/'))
+        if parsed.path.endswith('/') and path != '/':
+            path += '/'
+        if path.endswith('/index.html'):
+            path = path[:-len('index.html')]
+        if posixpath.splitext(path)[1].lower() not in PAGE_EXTENSIONS:
+            return None
+        # Query strings (?lang=) and fragments address variants of the same page
+        return path
+
+    def fingerprint(self, path: str) -> int:
+        """64-bit hash of a normalized path for the seen-set"""
+        return int.from_bytes(hashlib.blake2b(path.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def add(self, url: str, depth: int = 0, lastmod: str = None, referrer: str = None) -> bool:
+        """Queue a URL unless it is external, already seen or too deep"""
+        if depth > self.max_depth:
+            return False
+        path = self.normalize(url, referrer)
+        if path is None:
+            return False
+
+        key = self.fingerprint(path)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+
+        self._counter += 1
+        heapq.heappush(self._heap, (-lastmod_timestamp(lastmod), depth, self._counter, path))
+        return True
+
+    def seed_from_sitemap(self, source: BinaryIO) -> int:
+        """Queue every page listed in a sitemap stream; returns how many were new"""
+        return sum(1 for loc, lastmod in iter_sitemap(source) if self.add(loc, 0, lastmod))
+
+    def add_links(self, links: List[str], referrer: str, depth: int) -> int:
+        """Queue links found on a page crawled at depth; returns how many were new"""
+        return sum(1 for link in links if self.add(link, depth + 1, referrer=referrer))
+
+    def pop_batch(self, size: int) -> List[Tuple[str, int]]:
+        """Take up to size (path, depth) pairs, newest lastmod first, within the page budget"""
+        batch = []
+        while self._heap and len(batch) < size:
+            if self.popped >= self.max_pages:
+                self.over_budget += len(self._heap)
+                self._heap.clear()
+                break
+            _, depth, _, path = heapq.heappop(self._heap)
+            batch.append((path, depth))
+            self.popped += 1
+        return batch
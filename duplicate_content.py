@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate content detection for blog posts
+- MinHash signatures of post bodies and meta descriptions
+- LSH banding to find candidate pairs without comparing every pair
+- Signatures cached in the build cache so only new or changed posts are re-hashed
+"""
+
+import hashlib
+import json
+import random
+import re
+import zlib
+from html import unescape
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List
+
+from content_metrics import extract_article_text
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+class DuplicateContentDetector:
+    def __init__(self, posts_dir: str = "blog/posts", cache_dir: str = ".build_cache",
+                 num_perm: int = 128, threshold: float = 0.8, description_threshold: float = 0.5):
+        self.posts_dir = Path(posts_dir)
+        self.cache_file = Path(cache_dir) / "content_signatures.json"
+        self.num_perm = num_perm
+        # Shingle size per field: bodies use word 5-grams, short descriptions word 3-grams
+        self.fields = {"body": 5, "description": 3}
+        # Templated descriptions differ only by the title, so they get a lower threshold
+        self.thresholds = {"body": threshold, "description": description_threshold}
+
+        # Fixed seed keeps signatures stable across runs so the cache stays valid
+        rng = random.Random(1)
+        self.permutations = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+        self.cache = self.load_cache()
+
+    def cache_key(self) -> str:
+        """Identify the signature parameters the cache was built with"""
+        return f"minhash-v1:{self.num_perm}:{','.join(f'{k}={v}' for k, v in self.fields.items())}"
+
+    def load_cache(self) -> Dict:
+        """Load cached signatures, discarding them if built with other parameters"""
+        if not self.cache_file.exists():
+            return {}
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('key') == self.cache_key():
+                return cache.get('posts', {})
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[WARNING] Ignoring unreadable signature cache {self.cache_file}: {e}")
+        return {}
+
+    def save_cache(self) -> None:
+        """Persist signatures to the build cache"""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'key': self.cache_key(), 'posts': self.cache}, f)
+
+    def extract_fields(self, content: str) -> Dict[str, str]:
+        """Extract the post body text and meta description"""
+        desc_match = re.search(r'<meta name="description" content="(.*?)"', content)
+        description = unescape(desc_match.group(1)) if desc_match else ""
+
+        # Article text only, so shared navigation and footer markup don't count
+        return {"body": extract_article_text(content), "description": description}
+
+    def shingles(self, text: str, size: int) -> set:
+        """Hash word n-grams of normalized text to 32-bit integers"""
+        words = re.findall(r'\w+', text.lower())
+        if 0 < len(words) < size:
+            return {zlib.crc32(' '.join(words).encode('utf-8'))}
+        return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+                for i in range(len(words) - size + 1)}
+
+    def minhash(self, shingle_hashes: set) -> List[int]:
+        """Compute the MinHash signature of a shingle set"""
+        if not shingle_hashes:
+            return [MAX_HASH] * self.num_perm
+
+        return [min((a * h + b) % MERSENNE_PRIME for h in shingle_hashes) & MAX_HASH
+                for a, b in self.permutations]
+
+    def signatures(self, html_file: Path) -> Dict[str, List[int]]:
+        """Return signatures for a post, re-hashing only if its content changed"""
+        raw = html_file.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        cached = self.cache.get(html_file.name)
+        if cached and cached.get('sha256') == digest:
+            return cached['signatures']
+
+        fields = self.extract_fields(raw.decode('utf-8'))
+        signatures = {field: self.minhash(self.shingles(fields[field], size))
+                      for field, size in self.fields.items()}
+        self.cache[html_file.name] = {'sha256': digest, 'signatures': signatures}
+        return signatures
+
+    def similarity(self, sig_a: List[int], sig_b: List[int]) -> float:
+        """Estimate Jaccard similarity from two signatures"""
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / self.num_perm
+
+    def lsh_bands(self, threshold: float) -> int:
+        """Pick the band count whose LSH threshold (1/b)^(1/r) sits just below threshold"""
+        options = [b for b in range(1, self.num_perm + 1) if self.num_perm % b == 0]
+        below = [b for b in options if (1 / b) ** (b / self.num_perm) <= threshold]
+        return min(below) if below else self.num_perm
+
+    def candidate_pairs(self, signatures: Dict[str, List[int]], bands: int) -> set:
+        """Find candidate pairs that share at least one LSH band"""
+        rows = self.num_perm // bands
+        buckets = {}
+        for name, signature in signatures.items():
+            for band in range(bands):
+                start = band * rows
+                key = (band, tuple(signature[start:start + rows]))
+                buckets.setdefault(key, []).append(name)
+
+        pairs = set()
+        for names in buckets.values():
+            if len(names) > 1:
+                pairs.update(combinations(sorted(names), 2))
+        return pairs
+
+    def find_duplicates(self) -> List[Dict]:
+        """Find near-duplicate post pairs by body and by description"""
+        if not self.posts_dir.exists():
+            print(f"[ERROR] Posts directory not found: {self.posts_dir}")
+            return []
+
+        post_files = sorted(self.posts_dir.glob("*.html"))
+        post_signatures = {f.name: self.signatures(f) for f in post_files}
+
+        # Drop cache entries for deleted posts
+        self.cache = {name: entry for name, entry in self.cache.items() if name in post_signatures}
+        self.save_cache()
+
+        duplicates = []
+        for field in self.fields:
+            threshold = self.thresholds[field]
+            field_signatures = {name: sigs[field] for name, sigs in post_signatures.items()
+                                if sigs[field][0] != MAX_HASH}
+            candidates = self.candidate_pairs(field_signatures, self.lsh_bands(threshold))
+            for post_a, post_b in sorted(candidates):
+                score = self.similarity(field_signatures[post_a], field_signatures[post_b])
+                if score >= threshold:
+                    duplicates.append({
+                        'field': field,
+                        'posts': [post_a, post_b],
+                        'similarity': round(score, 2)
+                    })
+
+        duplicates.sort(key=lambda d: d['similarity'], reverse=True)
+        return duplicates
+
+    def print_report(self, duplicates: List[Dict]) -> None:
+        """Print near-duplicate pairs"""
+        if not duplicates:
+            print("[OK] No near-duplicate posts found")
+            return
+
+        print(f"[WARNING] Found {len(duplicates)} near-duplicate pairs:")
+        for dup in duplicates:
+            post_a, post_b = dup['posts']
+            print(f"   - {dup['field']} {dup['similarity']:.0%}: {post_a} <-> {post_b}")
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Detect near-duplicate blog posts')
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help='Minimum estimated body similarity to report (default: 0.8)')
+    parser.add_argument('--description-threshold', type=float, default=0.5,
+                        help='Minimum estimated description similarity to report (default: 0.5)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    detector = DuplicateContentDetector(threshold=args.threshold,
+                                        description_threshold=args.description_threshold)
+    duplicates = detector.find_duplicates()
+
+    if args.json:
+        print(json.dumps(duplicates, indent=2))
+    else:
+        detector.print_report(duplicates)
+
+    exit(1 if duplicates else 0)
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,76 @@ Script to add missing SEO elements to blog posts:
 - Hreflang tags
 - Advanced schema properties (inLanguage, wordCount, timeRequired)
 - article:modified_time
+- JSON-LD wordCount/timeRequired kept in sync with the post's content metrics
+
+Each fix plans its insertions as (offset, text) splices against the original
+file contents, all splices are applied in a single pass and the file is written
+once. Processed posts carry a fix fingerprint comment near the top of the file
+so later runs skip posts whose fixes and content metrics are unchanged.
 """
 
+import argparse
+import difflib
+import hashlib
 import os
 import re
 from pathlib import Path
 from datetime import datetime
 
+from content_metrics import current_metrics, extract_content_metrics, load_manifest_metrics
+
+# Bump when a fix is added or its output changes so fingerprinted posts are
+# processed again on the next run.
+FIX_PIPELINE_VERSION = 2
+FIX_NAMES = ['hreflang', 'breadcrumb', 'advanced_schema', 'modified_time', 'word_count']
+FINGERPRINT_PROBE_BYTES = 512
+FINGERPRINT_PATTERN = re.compile(r'<!-- tidiful-seo-fixes: (\w+) -->')
+
+def fix_fingerprint(metrics):
+    """Fingerprint identifying the current set of fixes and the post's metrics"""
+    signature = f"{FIX_PIPELINE_VERSION}:{','.join(FIX_NAMES)}:{metrics['wordCount']}:{metrics['readingTime']}"
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()[:16]
+
+def read_fingerprint(content):
+    """Read the fix fingerprint from the head of a post"""
+    match = FINGERPRINT_PATTERN.search(content[:FINGERPRINT_PROBE_BYTES])
+    return match.group(1) if match else None
+
+def plan_fingerprint(content, fingerprint):
+    """Plan insertion (or refresh) of the fingerprint comment after the doctype"""
+    marker = f'<!-- tidiful-seo-fixes: {fingerprint} -->\n'
+    existing = FINGERPRINT_PATTERN.search(content[:FINGERPRINT_PROBE_BYTES])
+    if existing:
+        if existing.group(1) == fingerprint:
+            return []
+        return [(existing.start(), existing.end(), marker.rstrip('\n'))]
+    
+    doctype_match = re.match(r'\s*<!DOCTYPE[^>]*>\s*\n', content, re.IGNORECASE)
+    offset = doctype_match.end() if doctype_match else 0
+    return [(offset, offset, marker)]
+
+def apply_splices(content, splices):
+    """Apply (start, end, text) splices planned against the original content"""
+    if not splices:
+        return content
+    
+    # Stable sort keeps same-offset insertions in planning order
+    ordered = sorted(splices, key=lambda splice: (splice[0], splice[1]))
+    parts = []
+    cursor = 0
+    for start, end, text in ordered:
+        if start < cursor:
+            raise ValueError(f"Overlapping splice at offset {start}")
+        parts.append(content[cursor:start])
+        parts.append(text)
+        cursor = end
+    parts.append(content[cursor:])
+    return ''.join(parts)
+
+def insert_after_matches(pattern, content, text):
+    """Plan an insertion of text after every match of pattern"""
+    return [(m.end(), m.end(), text) for m in re.finditer(pattern, content)]
+
 def extract_title_from_html(content):
     """Extract title from HTML"""
     title_match = re.search(r'<title>(.*?)</title>', content)
@@ -43,13 +106,13 @@ def extract_date_from_html(content):
         return date_str[:10]
     return datetime.now().strftime("%Y-%m-%d")
 
-def add_hreflang_tags(content, canonical_url):
-    """Add hreflang tags if missing"""
+def plan_hreflang_tags(content, canonical_url):
+    """Plan hreflang tags if missing"""
     if 'hreflang' in content:
-        return content  # Already has hreflang
+        return []  # Already has hreflang
     
     if not canonical_url:
-        return content
+        return []
     
     hreflang_block = f'''    <!-- Hreflang Tags -->
     <link rel="alternate" hreflang="en" href="{canonical_url}?lang=en-US">
@@ -62,19 +125,15 @@ def add_hreflang_tags(content, canonical_url):
 '''
     
     # Insert after canonical link
-    canonical_pattern = r'(<link rel="canonical" href="[^"]*">\s*\n)'
-    if re.search(canonical_pattern, content):
-        content = re.sub(canonical_pattern, r'\1' + hreflang_block, content)
-    
-    return content
+    return insert_after_matches(r'<link rel="canonical" href="[^"]*">\s*\n', content, hreflang_block)
 
-def add_breadcrumb_schema(content, title, canonical_url):
-    """Add BreadcrumbList schema if missing"""
+def plan_breadcrumb_schema(content, title, canonical_url):
+    """Plan BreadcrumbList schema if missing"""
     if 'BreadcrumbList' in content:
-        return content  # Already has BreadcrumbList
+        return []  # Already has BreadcrumbList
     
     if not canonical_url or not title:
-        return content
+        return []
     
     # Escape quotes in title for JSON
     title_escaped = title.replace('"', '\\"')
@@ -110,83 +169,132 @@ def add_breadcrumb_schema(content, title, canonical_url):
 '''
     
     # Insert before favicon link (most reliable location)
-    favicon_pattern = r'(<link rel="icon" type="image/png")'
-    if re.search(favicon_pattern, content):
-        content = re.sub(favicon_pattern, breadcrumb_schema + r'\1', content)
-    
-    return content
+    return [(m.start(), m.start(), breadcrumb_schema)
+            for m in re.finditer(r'<link rel="icon" type="image/png"', content)]
 
-def add_advanced_schema_properties(content, date_str):
-    """Add inLanguage, wordCount, timeRequired to Article schema"""
+def plan_advanced_schema_properties(content, date_str, metrics):
+    """Plan inLanguage, wordCount, timeRequired for Article schema"""
     if '"inLanguage"' in content:
-        return content  # Already has advanced properties
+        return []  # Already has advanced properties
     
     # Add inLanguage after dateModified
-    date_modified_pattern = r'("dateModified":\s*"[^"]*",\s*\n)'
-    if re.search(date_modified_pattern, content):
-        content = re.sub(date_modified_pattern, r'\1        "inLanguage": "en-US",\n        ', content)
+    splices = insert_after_matches(r'"dateModified":\s*"[^"]*",\s*\n', content,
+                                   '        "inLanguage": "en-US",\n        ')
     
     # Add wordCount and timeRequired before mainEntityOfPage or keywords or closing brace
+    extra_properties = (f'        "wordCount": "{metrics["wordCount"]}",\n'
+                        f'        "timeRequired": "PT{metrics["readingTime"]}M",\n        ')
     if '"mainEntityOfPage"' in content:
-        main_entity_pattern = r'("mainEntityOfPage":\s*\{[^}]*\},\s*\n)'
-        if re.search(main_entity_pattern, content):
-            content = re.sub(main_entity_pattern, r'\1        "wordCount": "2500",\n        "timeRequired": "PT10M",\n        ', content)
+        splices += insert_after_matches(r'"mainEntityOfPage":\s*\{[^}]*\},\s*\n', content, extra_properties)
     elif '"keywords"' in content:
-        keywords_pattern = r'("keywords":\s*"[^"]*"\s*\n)'
-        if re.search(keywords_pattern, content):
-            content = re.sub(keywords_pattern, r'\1        "wordCount": "2500",\n        "timeRequired": "PT10M",\n        ', content)
+        splices += insert_after_matches(r'"keywords":\s*"[^"]*"\s*\n', content, extra_properties)
     elif '"articleSection"' in content:
-        article_section_pattern = r'("articleSection":\s*"[^"]*",\s*\n)'
-        if re.search(article_section_pattern, content):
-            content = re.sub(article_section_pattern, r'\1        "wordCount": "2500",\n        "timeRequired": "PT10M",\n        ', content)
+        splices += insert_after_matches(r'"articleSection":\s*"[^"]*",\s*\n', content, extra_properties)
     
-    return content
+    return splices
 
-def add_article_modified_time(content, date_str):
-    """Add article:modified_time if missing"""
+def plan_word_count(content, metrics):
+    """Plan updates of existing wordCount/timeRequired values that disagree with the metrics"""
+    word_count = str(metrics['wordCount'])
+    time_required = f"PT{metrics['readingTime']}M"
+    
+    splices = []
+    # timeRequired is only touched next to wordCount; HowTo steps have their own
+    for match in re.finditer(r'"wordCount":\s*"(\d+)"(?:,\s*"timeRequired":\s*"(PT\d+M)")?', content):
+        if match.group(1) != word_count:
+            splices.append((match.start(1), match.end(1), word_count))
+        if match.group(2) and match.group(2) != time_required:
+            splices.append((match.start(2), match.end(2), time_required))
+    return splices
+
+def plan_article_modified_time(content, date_str):
+    """Plan article:modified_time if missing"""
     if 'article:modified_time' in content:
-        return content  # Already has it
+        return []  # Already has it
     
     # Add after article:published_time
-    published_pattern = r'(<meta property="article:published_time" content="[^"]*">\s*\n)'
     modified_time = f'    <meta property="article:modified_time" content="{date_str}T00:00:00Z">\n'
+    return insert_after_matches(r'<meta property="article:published_time" content="[^"]*">\s*\n', content, modified_time)
+
+def add_hreflang_tags(content, canonical_url):
+    """Add hreflang tags if missing"""
+    return apply_splices(content, plan_hreflang_tags(content, canonical_url))
+
+def add_breadcrumb_schema(content, title, canonical_url):
+    """Add BreadcrumbList schema if missing"""
+    return apply_splices(content, plan_breadcrumb_schema(content, title, canonical_url))
+
+def add_advanced_schema_properties(content, date_str, metrics=None):
+    """Add inLanguage, wordCount, timeRequired to Article schema"""
+    metrics = metrics or extract_content_metrics(content)
+    return apply_splices(content, plan_advanced_schema_properties(content, date_str, metrics))
+
+def add_article_modified_time(content, date_str):
+    """Add article:modified_time if missing"""
+    return apply_splices(content, plan_article_modified_time(content, date_str))
+
+def plan_fixes(content, metrics=None):
+    """Extract metadata once and plan every fix against the original content"""
+    metrics = metrics or extract_content_metrics(content)
+    title = extract_title_from_html(content)
+    canonical_url = extract_canonical_url(content)
+    date_str = extract_date_from_html(content)
     
-    if re.search(published_pattern, content):
-        content = re.sub(published_pattern, r'\1' + modified_time, content)
-    
-    return content
+    splices = []
+    splices += plan_hreflang_tags(content, canonical_url)
+    splices += plan_breadcrumb_schema(content, title, canonical_url)
+    splices += plan_advanced_schema_properties(content, date_str, metrics)
+    splices += plan_word_count(content, metrics)
+    splices += plan_article_modified_time(content, date_str)
+    splices += plan_fingerprint(content, fix_fingerprint(metrics))
+    return splices
 
-def fix_blog_post(filepath):
-    """Fix a single blog post"""
+def fix_blog_post(filepath, dry_run=False, force=False, metrics=None):
+    """Fix a single blog post
+    
+    metrics are the post's precomputed content metrics from the manifest; they
+    are recomputed if the post was edited after the manifest was generated.
+    An up-to-date post is skipped without planning any fixes.
+    """
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        original_content = content
-        
-        # Extract metadata
-        title = extract_title_from_html(content)
-        canonical_url = extract_canonical_url(content)
-        date_str = extract_date_from_html(content)
+        metrics = current_metrics(content, metrics)
+        if not force and read_fingerprint(content) == fix_fingerprint(metrics):
+            return False
         
-        # Add missing elements
-        content = add_hreflang_tags(content, canonical_url)
-        content = add_breadcrumb_schema(content, title, canonical_url)
-        content = add_advanced_schema_properties(content, date_str)
-        content = add_article_modified_time(content, date_str)
+        fixed_content = apply_splices(content, plan_fixes(content, metrics))
         
         # Only write if changes were made
-        if content != original_content:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+        if fixed_content == content:
+            return False
+        
+        if dry_run:
+            diff = difflib.unified_diff(
+                content.splitlines(keepends=True),
+                fixed_content.splitlines(keepends=True),
+                fromfile=f"a/{filepath}",
+                tofile=f"b/{filepath}"
+            )
+            print(''.join(diff), end='')
             return True
         
-        return False
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(fixed_content)
+        return True
     except Exception as e:
         print(f"Error processing {filepath}: {e}")
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description='Add missing SEO elements to blog posts')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print a unified diff of the fixes instead of writing files')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-process posts even if their fix fingerprint is current')
+    args = parser.parse_args()
+    
     posts_dir = Path("blog/posts")
     if not posts_dir.exists():
         print(f"Posts directory not found: {posts_dir}")
@@ -197,16 +305,20 @@ def main():
     
     print(f"Processing {len(posts)} blog posts...")
     
+    manifest_metrics = load_manifest_metrics(posts_dir / "manifest.json")
+    
     fixed_count = 0
     for post_file in posts:
-        if fix_blog_post(post_file):
-            print(f"[OK] Fixed: {post_file.name}")
+        metrics = manifest_metrics.get(post_file.name)
+        if fix_blog_post(post_file, dry_run=args.dry_run, force=args.force, metrics=metrics):
+            if not args.dry_run:
+                print(f"[OK] Fixed: {post_file.name}")
             fixed_count += 1
-        else:
+        elif not args.dry_run:
             print(f"[SKIP] Already complete: {post_file.name}")
     
-    print(f"\n[SUCCESS] Fixed {fixed_count} out of {len(posts)} posts")
+    action = "Would fix" if args.dry_run else "Fixed"
+    print(f"\n[SUCCESS] {action} {fixed_count} out of {len(posts)} posts")
 
 if __name__ == "__main__":
     main()
-
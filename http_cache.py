@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Persistent conditional-GET cache for the monitors
+Stores ETag/Last-Modified, a body hash and the parsed result per URL, so
+unchanged pages are revalidated with If-None-Match/If-Modified-Since and a
+304 response reuses the cached parse instead of downloading the page again.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+class HTTPCache:
+    def __init__(self, cache_file: str, version: int = 1):
+        self.cache_file = Path(cache_file)
+        # Parsed results from an older parser version are discarded with their validators
+        self.version = version
+        self.entries = self.load()
+
+    def load(self) -> Dict[str, Dict]:
+        """Load cache entries, discarding them if written by another parser version"""
+        if not self.cache_file.exists():
+            return {}
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.version:
+                return data.get('entries', {})
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"[WARNING] Ignoring unreadable HTTP cache {self.cache_file}: {e}")
+        return {}
+
+    def save(self) -> None:
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Revalidation headers for a cached URL"""
+        entry = self.entries.get(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def not_modified(self, url: str, response_headers: Dict[str, str]) -> Optional[Any]:
+        """Handle a 304: refresh validators and return the cached parsed result"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+
+        self._update_validators(entry, response_headers)
+        entry['checked_at'] = datetime.now().isoformat(timespec='seconds')
+        return entry['parsed']
+
+    def unchanged_body(self, url: str, body: bytes) -> Optional[Any]:
+        """Return the cached parse if a full response has the same body as last time"""
+        entry = self.entries.get(url)
+        if entry and entry.get('sha256') == hashlib.sha256(body).hexdigest():
+            return entry['parsed']
+        return None
+
+    def store(self, url: str, response_headers: Dict[str, str], body: bytes, parsed: Any) -> None:
+        """Record validators, body hash and parsed result for a full response"""
+        entry = {
+            'sha256': hashlib.sha256(body).hexdigest(),
+            'parsed': parsed,
+            'checked_at': datetime.now().isoformat(timespec='seconds')
+        }
+        self._update_validators(entry, response_headers)
+        self.entries[url] = entry
+
+    def _update_validators(self, entry: Dict, response_headers: Dict[str, str]) -> None:
+        headers = {k.lower(): v for k, v in response_headers.items()}
+        if 'etag' in headers:
+            entry['etag'] = headers['etag']
+        if 'last-modified' in headers:
+            entry['last_modified'] = headers['last-modified']
@@ -6,17 +6,21 @@ Comprehensive site indexing tool
 - Provides instructions for submitting to search engines
 """
 
+import io
 import os
 import re
-import xml.etree.ElementTree as ET
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse
 
+from http_cache import HTTPCache
+from sitemap_stream import SitemapReader
+
 class SiteIndexer:
-    def __init__(self):
+    def __init__(self, http_cache_file=".build_cache/sitemap_http.json"):
         self.base_url = "https://tidiful.com"
         self.sitemap_file = Path("sitemap.xml")
+        self.http_cache = HTTPCache(http_cache_file) if http_cache_file else None
         self.public_pages = [
             ("/", "Homepage", 1.0, "weekly"),
             ("/features.html", "Features Page", 0.9, "monthly"),
@@ -36,36 +40,31 @@ class SiteIndexer:
             print(f"[ERROR] {self.sitemap_file} not found")
             return False
         
-        try:
-            tree = ET.parse(self.sitemap_file)
-            root = tree.getroot()
-            
-            # Check namespace
-            if root.tag != '{http://www.sitemaps.org/schemas/sitemap/0.9}urlset':
-                print("[ERROR] Invalid sitemap namespace")
-                return False
-            
-            # Count URLs
-            urls = root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url')
-            print(f"[OK] Sitemap is valid with {len(urls)} URLs")
-            return True
-            
-        except ET.ParseError as e:
-            print(f"[ERROR] Sitemap XML is invalid: {e}")
+        reader = SitemapReader(self.base_url)
+        for _ in reader.entries(self.sitemap_file):
+            pass
+        for warning in reader.warnings:
+            print(f"[WARNING] {warning}")
+        for error in reader.errors[:20]:
+            print(f"[ERROR] {error}")
+        if len(reader.errors) > 20:
+            print(f"[ERROR] ... and {len(reader.errors) - 20} more")
+        if not reader.valid:
             return False
+        
+        print(f"[OK] Sitemap is valid with {reader.url_count} URLs")
+        return True
     
     def count_indexed_pages(self):
         """Count how many pages are in the sitemap"""
         if not self.sitemap_file.exists():
             return 0
         
-        try:
-            tree = ET.parse(self.sitemap_file)
-            root = tree.getroot()
-            urls = root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url')
-            return len(urls)
-        except:
-            return 0
+        return sum(1 for _ in SitemapReader(self.base_url).entries(self.sitemap_file))
+    
+    def count_sitemap_urls(self, body):
+        """Count <url> entries in sitemap XML bytes"""
+        return sum(1 for _ in SitemapReader(self.base_url, follow_index=False).entries(io.BytesIO(body)))
     
     def generate_indexing_report(self):
         """Generate a report of indexing status"""
@@ -133,12 +132,34 @@ class SiteIndexer:
         print("\n")
     
     def check_sitemap_accessibility(self):
-        """Check if sitemap is accessible"""
+        """Check if sitemap is accessible, revalidating a cached copy when possible"""
+        import urllib.error
         import urllib.request
         try:
             sitemap_url = f"{self.base_url}/sitemap.xml"
-            response = urllib.request.urlopen(sitemap_url, timeout=10)
+            headers = self.http_cache.conditional_headers(sitemap_url) if self.http_cache else {}
+            request = urllib.request.Request(sitemap_url, headers=headers)
+            try:
+                response = urllib.request.urlopen(request, timeout=10)
+            except urllib.error.HTTPError as e:
+                # urllib reports 304 Not Modified as an error
+                if e.code == 304 and self.http_cache:
+                    parsed = self.http_cache.not_modified(sitemap_url, dict(e.headers))
+                    if parsed is not None:
+                        self.http_cache.save()
+                        print(f"[OK] Sitemap is accessible at {sitemap_url} "
+                              f"(unchanged, {parsed['url_count']} URLs)")
+                        return True
+                raise
+            
             if response.status == 200:
+                body = response.read()
+                if self.http_cache:
+                    parsed = self.http_cache.unchanged_body(sitemap_url, body)
+                    if parsed is None:
+                        parsed = {"url_count": self.count_sitemap_urls(body)}
+                    self.http_cache.store(sitemap_url, dict(response.headers), body, parsed)
+                    self.http_cache.save()
                 print(f"[OK] Sitemap is accessible at {sitemap_url}")
                 return True
             else:
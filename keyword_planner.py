@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Keyword planning for the AI visibility monitor
+Near-duplicate keywords ("PDF to CSV", "convert PDF to CSV", "PDF CSV
+conversion") get the same answers from AI platforms, so paying for each on
+every platform adds cost without coverage. The planner normalizes and stems
+keywords, clusters them by character n-gram similarity, queries a
+representative set per cluster within a query budget, and attributes the
+representatives' results back to every member.
+"""
+
+import argparse
+import json
+import re
+from typing import Dict, List, Optional
+
+STOPWORDS = {"a", "an", "and", "the", "to", "from", "for", "of", "in", "into", "with", "on", "by", "vs"}
+# Words that change phrasing but not what an AI platform recommends
+GENERIC_WORDS = {"convert", "converter", "converters", "conversion", "software", "platform", "tool", "tools",
+                 "app", "online", "free", "best"}
+SUFFIXES = ("ions", "ion", "ings", "ing", "ers", "er", "ed", "s")
+
+def stem(word: str) -> str:
+    """Light suffix stripping, enough to equate extraction/extract and automated/automation"""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4 and not word.endswith("ss"):
+            return word[:-len(suffix)]
+    return word
+
+def keyword_terms(keyword: str) -> List[str]:
+    """Normalized, stemmed content terms of a keyword"""
+    words = [w for w in re.findall(r'\w+', keyword.casefold()) if w not in STOPWORDS]
+    content = [w for w in words if w not in GENERIC_WORDS] or words
+    return sorted({stem(w) for w in content})
+
+def char_ngrams(terms: List[str], size: int = 3) -> set:
+    """Character n-grams per term, padded so term order does not matter"""
+    grams = set()
+    for term in terms:
+        padded = f" {term} "
+        grams.update(padded[i:i + size] for i in range(max(1, len(padded) - size + 1)))
+    return grams
+
+def similarity(a: set, b: set) -> float:
+    """Jaccard similarity of two n-gram sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class KeywordPlanner:
+    def __init__(self, threshold: float = 0.6, max_queries: Optional[int] = None, protected: List[str] = ()):
+        self.threshold = threshold
+        # Keywords queried per platform per session; None means one representative per cluster
+        self.max_queries = max_queries
+        # Brand keywords are always queried on their own
+        self.protected = {k.casefold() for k in protected}
+
+    def cluster(self, keywords: List[str]) -> List[List[str]]:
+        """Leader clustering in priority order: the first keyword of each cluster is its leader"""
+        grams = {keyword: char_ngrams(keyword_terms(keyword)) for keyword in keywords}
+        clusters: List[List[str]] = []
+        for keyword in dict.fromkeys(keywords):
+            if keyword.casefold() not in self.protected:
+                best, best_score = None, self.threshold
+                for members in clusters:
+                    if members[0].casefold() in self.protected:
+                        continue
+                    score = similarity(grams[keyword], grams[members[0]])
+                    if score >= best_score:
+                        best, best_score = members, score
+                if best is not None:
+                    best.append(keyword)
+                    continue
+            clusters.append([keyword])
+        return clusters
+
+    def plan(self, keywords: List[str]) -> Dict:
+        """Choose which keywords to query and which representative answers each keyword
+
+        Under a tight budget, brand keywords come first and then the largest
+        clusters, so each query covers as many keywords as possible. Every
+        covered cluster gets its leader first; leftover budget goes to the
+        members least similar to their cluster's current representatives, so
+        broader clusters are sampled more densely.
+        """
+        clusters = sorted(self.cluster(keywords),
+                          key=lambda members: (members[0].casefold() not in self.protected, -len(members)))
+        budget = len(clusters) if self.max_queries is None else self.max_queries
+        grams = {keyword: char_ngrams(keyword_terms(keyword)) for keyword in keywords}
+
+        representatives = [[members[0]] for members in clusters[:budget]]
+        remaining = budget - len(representatives)
+        while remaining > 0:
+            candidates = [
+                (max(similarity(grams[m], grams[r]) for r in reps), i, m)
+                for i, (members, reps) in enumerate(zip(clusters, representatives))
+                for m in members if m not in reps
+            ]
+            if not candidates:
+                break
+            _, i, member = min(candidates)
+            representatives[i].append(member)
+            remaining -= 1
+
+        attribution = {}
+        for members, reps in zip(clusters, representatives):
+            for member in members:
+                attribution[member] = member if member in reps else \
+                    max(reps, key=lambda r: similarity(grams[member], grams[r]))
+
+        return {
+            "queries": [r for reps in representatives for r in reps],
+            "attribution": attribution,
+            "clusters": clusters,
+            # Clusters past the budget have no representative and are left out of the session
+            "uncovered": [k for members in clusters[len(representatives):] for k in members]
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Show how monitoring keywords cluster and which are queried')
+    parser.add_argument('--config', default='ai_monitoring_config.json', help='Monitoring configuration file')
+    parser.add_argument('--threshold', type=float, help='Similarity needed to join a cluster (0-1)')
+    parser.add_argument('--max-queries', type=int, help='Keywords to query per platform')
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    settings = config.get('planner', {})
+    planner = KeywordPlanner(
+        threshold=args.threshold if args.threshold is not None else settings.get('threshold', 0.6),
+        max_queries=args.max_queries if args.max_queries is not None else settings.get('max_queries'),
+        protected=list(config.get('mentions', {}).get('brand', {}))
+    )
+    keywords = config.get('keywords', [])
+    plan = planner.plan(keywords)
+
+    print(f"{len(keywords)} keywords -> {len(plan['clusters'])} clusters, "
+          f"{len(plan['queries'])} queried per platform")
+    for members in plan['clusters']:
+        print(f"  - {' | '.join(f'*{m}*' if m in plan['queries'] else m for m in members)}")
+    if plan['uncovered']:
+        print(f"Over budget, not covered: {', '.join(plan['uncovered'])}")
+
+if __name__ == "__main__":
+    main()
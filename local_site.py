@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Offline site source for the SEO monitors
+Serves crawl requests straight from the working tree, so the site can be
+audited before deploy at local disk speed. URLs map to files under the repo
+root and pages are rendered by applying the assets/i18n bundle for their
+?lang= (en-US by default) the way assets/js/i18n.js does in the browser.
+"""
+
+import json
+import re
+import time
+from html import escape
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_LANGUAGE = "en-US"
+# Same list and order as I18n.getSupportedLanguages()
+SUPPORTED_LANGUAGES = ["en-US", "fr-FR", "de-DE", "es-ES", "el-GR"]
+
+class LocalSiteFetcher:
+    def __init__(self, root: str = ".", base_url: str = "https://tidiful.com"):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip('/')
+        self._bundles = {}
+
+    def close(self) -> None:
+        pass
+
+    def resolve_path(self, url: str) -> Optional[Path]:
+        """Map a site URL to a file under the root, as the static host does"""
+        path = urlparse(url).path or "/"
+        relative = path.lstrip('/')
+        candidates = [relative + "index.html"] if path.endswith('/') else [relative, relative + ".html",
+                                                                           relative + "/index.html"]
+
+        for candidate in candidates:
+            file_path = (self.root / candidate).resolve()
+            # Never serve anything outside the tree, e.g. via ../ segments
+            if file_path.is_file() and file_path.is_relative_to(self.root):
+                return file_path
+        return None
+
+    def load_bundle(self, bundle_path: Path) -> Optional[Dict]:
+        """Load an i18n bundle, caching it for the rest of the crawl"""
+        if bundle_path not in self._bundles:
+            try:
+                with open(bundle_path, 'r', encoding='utf-8') as f:
+                    self._bundles[bundle_path] = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                self._bundles[bundle_path] = None
+        return self._bundles[bundle_path]
+
+    def page_bundle(self, file_path: Path, lang: str) -> Optional[Dict]:
+        """Find the bundle a page would load for a language, with the en-US fallback"""
+        # i18n.js fetches assets/i18n/<lang>.json relative to the page, so pages
+        # outside the root directory only get translations if that path exists
+        bundle_dir = file_path.parent / "assets" / "i18n"
+        for bundle_lang in (lang, DEFAULT_LANGUAGE):
+            bundle = self.load_bundle(bundle_dir / f"{bundle_lang}.json")
+            if bundle is not None:
+                return bundle
+        return None
+
+    def translation(self, bundle: Dict, key: str) -> str:
+        """Look up a dotted key; missing keys render as the key itself, like getTranslation()"""
+        value = bundle
+        for part in key.split('.'):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                return key
+        return value if isinstance(value, str) else key
+
+    def translate(self, content: str, url: str, lang: str, bundle: Dict) -> str:
+        """Apply a bundle to page HTML the way I18n.applyTranslations() does"""
+        content = re.sub(r'(<html[^>]*\slang=")[^"]*(")', rf'\g<1>{lang}\g<2>', content, count=1)
+
+        def replace_element(match, as_html):
+            text = self.translation(bundle, match.group(3))
+            return match.group(1) + (text if as_html else escape(text, quote=False)) + match.group(4)
+
+        # data-i18n sets textContent (escaped); data-i18n-html sets innerHTML
+        for attr, as_html in (("data-i18n", False), ("data-i18n-html", True)):
+            pattern = rf'(<(\w+)[^>]*\s{attr}="([^"]+)"[^>]*>).*?(</\2>)'
+            content = re.sub(pattern, lambda m, h=as_html: replace_element(m, h), content,
+                             flags=re.DOTALL | re.IGNORECASE)
+
+        content = re.sub(r'(<[^>]*\sdata-i18n-placeholder="([^"]+)"[^>]*?\splaceholder=")[^"]*(")',
+                         lambda m: m.group(1) + escape(self.translation(bundle, m.group(2))) + m.group(3),
+                         content)
+
+        title = escape(self.translation(bundle, 'meta.title'))
+        description = escape(self.translation(bundle, 'meta.description'))
+        keywords = escape(self.translation(bundle, 'meta.keywords'))
+        content = re.sub(r'<title>.*?</title>', lambda m: f'<title>{title}</title>', content,
+                         count=1, flags=re.IGNORECASE | re.DOTALL)
+        meta_updates = [
+            ('property="og:title"', title), ('name="twitter:title"', title),
+            ('name="description"', description), ('property="og:description"', description),
+            ('name="twitter:description"', description), ('name="keywords"', keywords)
+        ]
+        for selector, value in meta_updates:
+            content = re.sub(rf'(<meta[^>]*{selector}[^>]*\scontent=")[^"]*(")',
+                             lambda m, v=value: m.group(1) + v + m.group(2), content, count=1)
+
+        # updateHreflangTags() replaces the page's alternates with ?lang= links plus x-default
+        page_url = url.split('?')[0]
+        content = re.sub(r'\s*<link[^>]*hreflang=[^>]*>', '', content, flags=re.IGNORECASE)
+        alternates = ''.join(f'<link rel="alternate" hreflang="{code}" href="{page_url}?lang={code}">'
+                             for code in SUPPORTED_LANGUAGES)
+        alternates += f'<link rel="alternate" hreflang="x-default" href="{page_url}">'
+        return re.sub(r'</head>', lambda m: alternates + m.group(0), content, count=1, flags=re.IGNORECASE)
+
+    def render(self, url: str, file_path: Path) -> bytes:
+        """Return the page as a browser would see it for the URL's ?lang= parameter (default en-US)"""
+        body = file_path.read_bytes()
+        lang = parse_qs(urlparse(url).query).get('lang', [None])[0]
+        # Without a valid ?lang= (and nothing in localStorage) a crawler with an English
+        # navigator.language gets en-US, and i18n.js applies that bundle like any other
+        if lang not in SUPPORTED_LANGUAGES:
+            lang = DEFAULT_LANGUAGE
+
+        content = body.decode('utf-8')
+        # Only pages that load the i18n script are translated client-side
+        if 'i18n.js' not in content:
+            return body
+        bundle = self.page_bundle(file_path, lang)
+        if bundle is None:
+            return body
+        return self.translate(content, url, lang, bundle).encode('utf-8')
+
+    def _get(self, url: str) -> Dict:
+        """Read one URL from the tree, shaped like AsyncCrawler's fetch results"""
+        started = time.perf_counter()
+        file_path = self.resolve_path(url)
+        if file_path is None:
+            return {"url": url, "status": 404, "headers": {}, "content": b"", "text": "", "bytes": 0,
+                    "ttfb": 0.0, "total_time": time.perf_counter() - started}
+
+        try:
+            body = self.render(url, file_path)
+        except (OSError, UnicodeDecodeError) as e:
+            return {"url": url, "error": str(e), "total_time": time.perf_counter() - started}
+
+        elapsed = time.perf_counter() - started
+        return {
+            "url": url,
+            "status": 200,
+            "headers": {"Content-Type": "text/html; charset=utf-8", "Content-Length": str(len(body))},
+            "content": body,
+            "text": body.decode('utf-8', errors='replace'),
+            "bytes": len(body),
+            "transfer_bytes": len(body),
+            "ttfb": elapsed,
+            "total_time": elapsed
+        }
+
+    def crawl(self, urls: List[str], headers: Dict = None) -> Dict[str, Dict]:
+        """Fetch all URLs from disk, returning results keyed by URL like AsyncCrawler.crawl"""
+        return {url: self._get(url) for url in urls}
+
+    def crawl_queue(self, next_url: Callable[[], Optional[str]], on_result: Callable[[Dict], None],
+                    headers: Dict = None) -> Dict[str, Dict]:
+        """Fetch URLs from next_url() until it runs dry, like AsyncCrawler.crawl_queue"""
+        results = {}
+        url = next_url()
+        while url is not None:
+            results[url] = self._get(url)
+            on_result(results[url])
+            url = next_url()
+        return results
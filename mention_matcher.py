@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Brand and competitor mention matching for AI platform answers
+An Aho-Corasick automaton over every configured name and alias finds all
+mentions in a single pass per answer, whatever the number of patterns.
+Matching is case- and diacritic-insensitive, respects word boundaries and
+reports positions and context windows in the original text.
+"""
+
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+def fold_char(char: str) -> str:
+    """Case- and accent-folded form of one character (may be empty or several characters)"""
+    decomposed = unicodedata.normalize('NFKD', char)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def fold_text(text: str) -> Tuple[str, List[int]]:
+    """Fold a text and map each folded character back to its index in the original"""
+    if text.isascii():
+        return text.lower(), list(range(len(text)))
+
+    folded, origin, cache = [], [], {}
+    for i, char in enumerate(text):
+        if char not in cache:
+            cache[char] = fold_char(char)
+        for c in cache[char]:
+            folded.append(c)
+            origin.append(i)
+    return ''.join(folded), origin
+
+class MentionMatcher:
+    def __init__(self, entities: Dict[str, Dict[str, Iterable[str]]]):
+        """entities maps a kind ("brand", "competitor") to {canonical name: aliases}"""
+        # Trie transitions, failure links and pattern ids ending at each state
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+        # pattern id -> (kind, entity, folded length)
+        self.patterns: List[Tuple[str, str, int]] = []
+
+        seen = set()
+        for kind, group in entities.items():
+            for entity, aliases in group.items():
+                for alias in (entity, *aliases):
+                    folded = fold_text(alias)[0].strip()
+                    if folded and folded not in seen:
+                        seen.add(folded)
+                        self._add(folded, kind, entity)
+        self._link()
+
+    def _add(self, folded: str, kind: str, entity: str) -> None:
+        state = 0
+        for char in folded:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append(len(self.patterns))
+        self.patterns.append((kind, entity, len(folded)))
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each state also reports the patterns of its suffix states"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def scan(self, folded: str) -> List[Tuple[int, int, int]]:
+        """All (start, end, pattern id) matches in folded text, in one pass"""
+        matches = []
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for i, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                length = self.patterns[pattern_id][2]
+                matches.append((i + 1 - length, i + 1, pattern_id))
+        return matches
+
+    def find(self, text: str, window: int = 80) -> List[Dict]:
+        """Whole-word mentions, leftmost-longest and non-overlapping, with context windows"""
+        folded, origin = fold_text(text)
+        candidates = sorted(self.scan(folded), key=lambda m: (m[0], m[0] - m[1]))
+
+        mentions, covered_until = [], 0
+        for start, end, pattern_id in candidates:
+            if start < covered_until:
+                continue
+            # "Tidi" inside "Tidiness" is not a mention
+            if (start > 0 and folded[start - 1].isalnum() and folded[start].isalnum()) or \
+               (end < len(folded) and folded[end].isalnum() and folded[end - 1].isalnum()):
+                continue
+
+            kind, entity, _ = self.patterns[pattern_id]
+            first, last = origin[start], origin[end - 1] + 1
+            mentions.append({
+                "kind": kind,
+                "entity": entity,
+                "match": text[first:last],
+                "start": first,
+                "end": last,
+                "context": text[max(0, first - window):last + window].strip()
+            })
+            covered_until = end
+        return mentions
+
+def freeze(entities: Dict[str, Dict[str, Iterable[str]]]) -> Tuple:
+    return tuple((kind, tuple((entity, tuple(aliases)) for entity, aliases in group.items()))
+                 for kind, group in entities.items())
+
+@lru_cache(maxsize=8)
+def _cached_matcher(frozen: Tuple) -> MentionMatcher:
+    return MentionMatcher({kind: dict(group) for kind, group in frozen})
+
+def get_matcher(entities: Dict[str, Dict[str, Iterable[str]]]) -> MentionMatcher:
+    """Build the automaton once per distinct entity configuration"""
+    return _cached_matcher(freeze(entities))
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Local mock of the AI platform endpoints for the visibility monitor
+Serves POST /v1/<platform>/query (plain or NDJSON-streamed) and
+/v1/<platform>/batch with configurable latency, rate limits (429 with
+Retry-After) and injected failures. With a seed, answers, latencies and
+injected failures are reproducible, so benchmark runs can be compared.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+DEFAULT_PLATFORM_CONFIG = {
+    "latency_ms": 200,     # mean response time
+    "jitter_ms": 50,       # uniform +/- spread around the mean
+    "rate": 0,             # sustained requests per second before answering 429 (0 = unlimited)
+    "burst": None,         # requests allowed at once; defaults to one second's worth
+    "failure_rate": 0.0,   # share of requests answered with HTTP 500
+    "mention_rate": 0.6    # share of queries whose answer mentions the brand
+}
+
+ANSWER_TEMPLATES = {
+    "positive": "{brand} is a recommended and reliable option for {query}, with fast and accurate results.",
+    "neutral": "{brand} is one of several tools people use for {query}.",
+    "negative": "Some users find {brand} limited and slow for {query}."
+}
+OTHER_ANSWER = "Popular options for {query} include Docparser, Nanonets and desktop OCR suites such as ABBYY FineReader."
+
+class MockPlatformState:
+    def __init__(self, config: Dict):
+        self.config = config
+        self.seed = config.get("seed")
+        self.brand = config.get("brand", "TidiFul")
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.attempts = {}
+        self.answered = {}
+
+    def platform_config(self, platform: str) -> Dict:
+        return {**DEFAULT_PLATFORM_CONFIG, **self.config.get("default", {}), **self.config.get(platform, {})}
+
+    def rng(self, *parts) -> random.Random:
+        """Deterministic generator per request identity when seeded"""
+        if self.seed is None:
+            return random.Random()
+        digest = hashlib.sha256(':'.join(str(p) for p in (self.seed, *parts)).encode('utf-8')).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def admit(self, platform: str, rate: float, burst: float = None) -> float:
+        """Token bucket per platform: 0 if the request may proceed, else seconds until a token frees up"""
+        if not rate:
+            return 0.0
+        capacity = max(1.0, burst or rate)
+        with self.lock:
+            now = time.monotonic()
+            tokens, updated = self.buckets.get(platform, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self.buckets[platform] = (tokens, now)
+                return (1 - tokens) / rate
+            self.buckets[platform] = (tokens - 1, now)
+            return 0.0
+
+    def attempt(self, platform: str, query: str) -> int:
+        """Count attempts per query so seeded failures differ between retries"""
+        with self.lock:
+            key = (platform, query)
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+            return self.attempts[key]
+
+    def skip(self, platform: str, query: str, answered: int) -> None:
+        """Continue from answer number answered, e.g. when another server gave the earlier ones"""
+        with self.lock:
+            key = (platform, query)
+            self.answered[key] = max(self.answered.get(key, 0), answered)
+
+    def answer(self, platform: str, query: str) -> str:
+        """Answer a query; asking again gets a new (seeded) answer, like a real platform"""
+        with self.lock:
+            key = (platform, query)
+            sample = self.answered.get(key, 0)
+            self.answered[key] = sample + 1
+        rng = self.rng(platform, query, "answer", *((sample,) if sample else ()))
+        if rng.random() >= self.platform_config(platform)["mention_rate"]:
+            return OTHER_ANSWER.format(query=query)
+        sentiment = rng.choice(["positive", "positive", "neutral", "neutral", "negative"])
+        return ANSWER_TEMPLATES[sentiment].format(brand=self.brand, query=query)
+
+    def latency(self, platform: str, query: str, attempt: int) -> float:
+        config = self.platform_config(platform)
+        jitter = self.rng(platform, query, attempt, "latency").uniform(-config["jitter_ms"], config["jitter_ms"])
+        return max(0.0, config["latency_ms"] + jitter) / 1000
+
+    def fails(self, platform: str, query: str, attempt: int) -> bool:
+        return self.rng(platform, query, attempt, "failure").random() < self.platform_config(platform)["failure_rate"]
+
+class MockAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: MockPlatformState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, payload: Dict, headers: Dict = None) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        parts = self.path.strip('/').split('/')
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_json(400, {"error": "invalid JSON"})
+            return
+        if len(parts) != 3 or parts[0] != "v1" or parts[2] not in ("query", "batch"):
+            self.send_json(404, {"error": "unknown endpoint"})
+            return
+
+        platform, action = parts[1], parts[2]
+        config = self.state.platform_config(platform)
+        wait = self.state.admit(platform, config["rate"], config["burst"])
+        if wait:
+            self.send_json(429, {"error": "rate limited"}, {"Retry-After": f"{wait:.3f}"})
+            return
+
+        queries = payload.get("queries", []) if action == "batch" else [payload.get("query", "")]
+        attempts = [self.state.attempt(platform, q) for q in queries]
+        if any(self.state.fails(platform, q, a) for q, a in zip(queries, attempts)):
+            time.sleep(self.state.latency(platform, queries[0], attempts[0]) / 2)
+            self.send_json(500, {"error": "injected failure"})
+            return
+
+        # A batch costs the slowest of its queries, not their sum
+        latency = max(self.state.latency(platform, q, a) for q, a in zip(queries, attempts))
+        answered = payload.get("answered")
+        if answered is not None:
+            hints = answered if action == "batch" else {queries[0]: answered}
+            for query, count in hints.items():
+                self.state.skip(platform, query, int(count))
+        answers = [self.state.answer(platform, q) for q in queries]
+
+        if action == "query" and payload.get("stream"):
+            self.stream_answer(answers[0], latency)
+            return
+
+        time.sleep(latency)
+        if action == "batch":
+            self.send_json(200, {"answers": [{"query": q, "text": a} for q, a in zip(queries, answers)]})
+        else:
+            self.send_json(200, {"text": answers[0]})
+
+    def stream_answer(self, text: str, latency: float) -> None:
+        """Send the answer as chunked NDJSON word deltas spread over the latency"""
+        words = text.split(' ')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        # Roughly a third of the time passes before the first token
+        time.sleep(latency / 3)
+        for i, word in enumerate(words):
+            chunk = (json.dumps({"delta": word if i == 0 else ' ' + word}) + '\n').encode('utf-8')
+            self.wfile.write(f"{len(chunk):X}\r\n".encode('ascii') + chunk + b"\r\n")
+            time.sleep(latency * 2 / 3 / len(words))
+        self.wfile.write(b"0\r\n\r\n")
+
+class MockAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing idle keep-alive connections is normal, not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+@contextmanager
+def serve_mock(config: Dict = None, port: int = 0):
+    """Run the mock in a background thread; yields its base URL"""
+    handler = type("BoundMockAIHandler", (MockAIHandler,), {"state": MockPlatformState(config or {})})
+    server = MockAIServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock AI platform server for the visibility monitor')
+    parser.add_argument('--port', type=int, default=8900, help='Port to listen on')
+    parser.add_argument('--config', help='JSON file with "default" and per-platform settings')
+    parser.add_argument('--seed', type=int, help='Make answers, latencies and failures reproducible')
+    args = parser.parse_args()
+
+    config = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        # Accept the monitor's own config file as well as a bare mock config
+        config = config.get("mock_server", config)
+    if args.seed is not None:
+        config["seed"] = args.seed
+
+    with serve_mock(config, args.port) as base_url:
+        print(f"Mock AI platforms listening on {base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
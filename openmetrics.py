@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+OpenMetrics text export for the monitors and build stages
+Each tool can write its results as a Prometheus/OpenMetrics text file that
+node-exporter's textfile collector scrapes, so regressions can be alerted on
+without parsing the tools' own JSON and Markdown reports.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Tuple
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = "tidiful"):
+        self.namespace = namespace
+        # name -> (type, help, unit), and name -> {label tuple: value}
+        self.families: Dict[str, Tuple[str, str, str]] = {}
+        self.samples: Dict[str, Dict[Tuple, float]] = {}
+
+    def _family(self, name: str, metric_type: str, help_text: str, unit: str) -> str:
+        full_name = f"{self.namespace}_{name}"
+        if full_name not in self.families:
+            self.families[full_name] = (metric_type, help_text, unit)
+            self.samples[full_name] = {}
+        return full_name
+
+    def gauge(self, name: str, value: float, help_text: str = "", unit: str = "", **labels) -> None:
+        """Set a gauge sample; unit-suffixed names (e.g. _seconds) should pass the unit"""
+        full_name = self._family(name, "gauge", help_text, unit)
+        self.samples[full_name][tuple(sorted(labels.items()))] = float(value)
+
+    @contextmanager
+    def timer(self, name: str, help_text: str = "", **labels):
+        """Record the duration of a block as a <name>_seconds gauge"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.gauge(f"{name}_seconds", time.perf_counter() - started, help_text, "seconds", **labels)
+
+    def escape_label(self, value) -> str:
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+    def render(self) -> str:
+        """Render all families in the OpenMetrics text format"""
+        lines = []
+        for name, (metric_type, help_text, unit) in sorted(self.families.items()):
+            lines.append(f"# TYPE {name} {metric_type}")
+            if unit:
+                lines.append(f"# UNIT {name} {unit}")
+            if help_text:
+                lines.append(f"# HELP {name} {self.escape_label(help_text)}")
+            for labels, value in sorted(self.samples[name].items()):
+                label_text = ','.join(f'{key}="{self.escape_label(val)}"' for key, val in labels)
+                value_text = str(int(value)) if value.is_integer() else repr(value)
+                lines.append(f"{name}{{{label_text}}} {value_text}" if label_text else f"{name} {value_text}")
+        lines.append("# EOF")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, metrics_file: str) -> None:
+        """Write atomically, so the collector never scrapes a half-written file"""
+        path = Path(metrics_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+        print(f"Metrics written to {path}")
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Platform clients for the AI visibility monitor
+Each entry in ai_platforms maps to a client adapter. The simulated client
+keeps the monitor runnable without credentials; the HTTP client talks to a
+chat-style endpoint (or the local mock server) with timeouts, batching and
+streamed responses.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from mention_matcher import MentionMatcher, get_matcher
+from response_classifier import ResponseClassifier, get_classifier
+
+class RateLimited(Exception):
+    """The platform refused the request; retry_after is in seconds when the platform says"""
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class PlatformError(Exception):
+    """The platform returned an error or an unusable response"""
+
+def analyze_response(text: str, brand: str, matcher: MentionMatcher = None) -> Dict[str, Any]:
+    """Find brand and competitor mentions in a platform's answer text
+
+    Sentiment is left to classify_results, which scores a whole session's
+    answers in one batch.
+    """
+    matcher = matcher or get_matcher({"brand": {brand: []}})
+    mentions = matcher.find(text, window=150)
+    brand_mentions = [m for m in mentions if m["kind"] == "brand"]
+    mentioned = bool(brand_mentions)
+    context = brand_mentions[0]["context"] if mentioned else text.strip()
+
+    return {
+        "mentioned": mentioned,
+        "mention_count": len(brand_mentions),
+        "competitors": sorted({m["entity"] for m in mentions if m["kind"] == "competitor"}),
+        "context": context[:300]
+    }
+
+def classify_results(results: List[Dict[str, Any]], classifier: ResponseClassifier = None) -> None:
+    """Add sentiment, confidence and context type to answers, in one batch
+
+    Only the context around the brand is classified, so praise for a
+    competitor does not count for the brand. Answers that already carry a
+    sentiment (the simulated client's) keep it and only gain a context type.
+    """
+    pending = [result for result in results if "context_type" not in result]
+    if not pending:
+        return
+    labels = (classifier or get_classifier()).classify([result["context"] for result in pending])
+    for result, sentiment, evidence, context_type in zip(pending, labels["sentiment"], labels["evidence"],
+                                                          labels["context_type"]):
+        result["context_type"] = context_type
+        if "sentiment" in result:
+            continue
+        result["sentiment"] = sentiment if result["mentioned"] else "neutral"
+        # More sentiment evidence means a more confident reading
+        confidence = 0.5 + min(0.45, 0.1 * evidence) if result["mentioned"] else 0.4
+        result["confidence"] = round(float(confidence), 2)
+
+class PlatformClient:
+    """Base adapter: subclasses implement query(); batching falls back to one query per keyword"""
+    batch_size = 1
+
+    def __init__(self, platform: str, brand: str, timeout: float = 10, matcher: MentionMatcher = None, **options):
+        self.platform = platform
+        self.brand = brand
+        self.timeout = timeout
+        self.matcher = matcher
+        self.options = options
+
+    @property
+    def source(self) -> str:
+        """Where answers come from; cached answers are only reused for the same source"""
+        return type(self).__name__
+
+    def query(self, query: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def query_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        return [self.query(q) for q in queries]
+
+    def answered(self, query: str, count: int) -> None:
+        """count answers to query were already collected elsewhere (cache, other shards)"""
+
+    def close(self) -> None:
+        pass
+
+class SimulatedClient(PlatformClient):
+    """Randomized stand-in for platforms without an API; seeded runs are reproducible"""
+    # Likelihood of a brand mention per platform
+    PLATFORM_WEIGHTS = {
+        "chatgpt": 0.8,
+        "claude": 0.7,
+        "perplexity": 0.6,
+        "bard": 0.5,
+        "bing_chat": 0.4,
+        "voice_search": 0.3
+    }
+
+    def __init__(self, platform: str, brand: str, timeout: float = 10, seed: int = None, **options):
+        super().__init__(platform, brand, timeout, **options)
+        self.seed = seed
+        # Asking the same query again gets a new answer, like a real platform
+        self.asked = {}
+        self.lock = threading.Lock()
+
+    @property
+    def source(self) -> str:
+        return f"simulated:{self.seed}"
+
+    def answered(self, query: str, count: int) -> None:
+        # Asking again continues with the next sample, as it would in the process that asked first
+        with self.lock:
+            self.asked[query] = max(self.asked.get(query, 0), count)
+
+    def rng(self, query: str, sample: int = 0) -> random.Random:
+        """Per-query generator, so seeded results don't depend on scheduling order"""
+        if self.seed is None:
+            return random.Random()
+        identity = f"{self.seed}:{self.platform}:{query}" + (f":{sample}" if sample else "")
+        digest = hashlib.sha256(identity.encode('utf-8')).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def query(self, query: str) -> Dict[str, Any]:
+        with self.lock:
+            sample = self.asked.get(query, 0)
+            self.asked[query] = sample + 1
+        rng = self.rng(query, sample)
+        mentioned = rng.random() < self.PLATFORM_WEIGHTS.get(self.platform, 0.5)
+
+        if mentioned:
+            sentiment = rng.choice(["positive", "neutral", "positive", "positive", "neutral"])
+            confidence = rng.uniform(0.7, 0.95)
+            context = rng.choice([
+                f"{self.brand} is mentioned as a recommended solution for {query.lower()}",
+                f"Users are asking about {self.brand} for {query.lower()}",
+                f"{self.brand} appears in search results for {query.lower()}",
+                f"{self.brand} is suggested as a tool for {query.lower()}"
+            ])
+        else:
+            sentiment = "neutral"
+            confidence = rng.uniform(0.3, 0.6)
+            context = f"No mention of {self.brand} found for {query.lower()}"
+
+        return {
+            "mentioned": mentioned,
+            "sentiment": sentiment,
+            "confidence": round(confidence, 2),
+            "context": context,
+            "timestamp": datetime.now().isoformat()
+        }
+
+class HTTPPlatformClient(PlatformClient):
+    """Chat-style HTTP endpoint: POST {base_url}/v1/<platform>/query, optionally streamed as NDJSON"""
+
+    def __init__(self, platform: str, brand: str, timeout: float = 10, base_url: str = "http://127.0.0.1:8900",
+                 stream: bool = False, batch_size: int = 1, api_key: str = None, connect_timeout: float = 3,
+                 **options):
+        super().__init__(platform, brand, timeout, **options)
+        self.base_url = base_url.rstrip('/')
+        self.stream = stream
+        self.batch_size = batch_size
+        # (connect, read) so a dead host fails fast while slow answers still get the full timeout
+        self.timeouts = (connect_timeout, timeout)
+        self.session = requests.Session()
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+        # Answers per query collected elsewhere; sent along so a seeded endpoint continues from there
+        self.collected = {}
+
+    @property
+    def source(self) -> str:
+        return f"http:{self.base_url}"
+
+    def answered(self, query: str, count: int) -> None:
+        self.collected[query] = max(self.collected.get(query, 0), count)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _post(self, path: str, payload: Dict, stream: bool = False) -> requests.Response:
+        try:
+            response = self.session.post(f"{self.base_url}/v1/{self.platform}/{path}", json=payload,
+                                         timeout=self.timeouts, stream=stream)
+        except requests.RequestException as e:
+            raise PlatformError(f"{self.platform}: {e}") from e
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            response.close()
+            raise RateLimited(f"{self.platform}: rate limited",
+                              float(retry_after) if retry_after else None)
+        if response.status_code != 200:
+            response.close()
+            raise PlatformError(f"{self.platform}: HTTP {response.status_code}")
+        return response
+
+    def _result(self, text: str, started: float, first_chunk: Optional[float] = None) -> Dict[str, Any]:
+        result = analyze_response(text, self.brand, self.matcher)
+        result["timestamp"] = datetime.now().isoformat()
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if first_chunk is not None:
+            result["first_chunk_ms"] = round((first_chunk - started) * 1000, 1)
+        return result
+
+    def query(self, query: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        payload = {"query": query, "stream": self.stream}
+        if query in self.collected:
+            payload["answered"] = self.collected[query]
+        response = self._post("query", payload, stream=self.stream)
+
+        if not self.stream:
+            try:
+                return self._result(response.json()["text"], started)
+            except (ValueError, KeyError) as e:
+                raise PlatformError(f"{self.platform}: malformed response: {e}") from e
+
+        # Streamed answers arrive as NDJSON chunks of {"delta": "..."}
+        parts, first_chunk = [], None
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                parts.append(json.loads(line).get("delta", ""))
+        except (ValueError, requests.RequestException) as e:
+            raise PlatformError(f"{self.platform}: broken stream: {e}") from e
+        finally:
+            response.close()
+        return self._result(''.join(parts), started, first_chunk)
+
+    def query_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        if len(queries) == 1:
+            return [self.query(queries[0])]
+
+        started = time.perf_counter()
+        payload = {"queries": queries}
+        collected = {query: self.collected[query] for query in queries if query in self.collected}
+        if collected:
+            payload["answered"] = collected
+        response = self._post("batch", payload)
+        try:
+            answers = response.json()["answers"]
+        except (ValueError, KeyError) as e:
+            raise PlatformError(f"{self.platform}: malformed batch response: {e}") from e
+        if len(answers) != len(queries):
+            raise PlatformError(f"{self.platform}: batch returned {len(answers)} answers for {len(queries)} queries")
+        return [self._result(answer["text"], started) for answer in answers]
+
+CLIENT_TYPES = {
+    "simulated": SimulatedClient,
+    "http": HTTPPlatformClient
+}
+
+def build_clients(platforms: Dict[str, str], brand: str, client_config: Dict[str, Dict] = None,
+                  seed: int = None, mentions: Dict[str, Dict] = None) -> Dict[str, PlatformClient]:
+    """Create one client per platform from config; "default" applies to unlisted platforms
+
+    mentions maps "brand"/"competitor" to {name: aliases} for answer matching;
+    the automaton is built once and shared by every client.
+    """
+    client_config = client_config or {}
+    matcher = get_matcher(mentions or {"brand": {brand: []}})
+    clients = {}
+    for platform in platforms:
+        options = {**client_config.get("default", {}), **client_config.get(platform, {})}
+        client_type = options.pop("type", "simulated")
+        if client_type not in CLIENT_TYPES:
+            raise ValueError(f"Unknown client type '{client_type}' for platform {platform}")
+        if client_type == "simulated":
+            options.setdefault("seed", seed)
+        clients[platform] = CLIENT_TYPES[client_type](platform, brand, matcher=matcher, **options)
+    return clients
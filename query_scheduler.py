@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Rate-limited query scheduler for the AI visibility monitor
+- One token bucket per platform (sustained rate plus burst)
+- Per-platform and global concurrency bounds
+- Retries with exponential backoff and full jitter
+Independent (keyword, platform) queries run concurrently, so a session takes
+as long as the slowest platform's rate limit allows rather than the sum of
+all queries.
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_LIMITS = {"rate": 10.0, "burst": 10, "concurrency": 4}
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class QueryScheduler:
+    def __init__(self, limits: Dict[str, Dict] = None, max_concurrency: int = 16,
+                 max_retries: int = 3, backoff: float = 0.5, seed: int = None):
+        # limits maps platform -> {rate, burst, concurrency}; "default" applies to unlisted platforms
+        self.limits = limits or {}
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rng = random.Random(seed)
+        self.stats = {"queries": 0, "retries": 0, "failures": 0}
+
+    def platform_limits(self, platform: str) -> Dict:
+        return {**DEFAULT_LIMITS, **self.limits.get("default", {}), **self.limits.get(platform, {})}
+
+    async def _run_one(self, platform: str, call: Callable[[], Any], bucket: TokenBucket,
+                       platform_slots: asyncio.Semaphore, global_slots: asyncio.Semaphore,
+                       executor: ThreadPoolExecutor) -> Any:
+        """Run one query within its platform's limits, retrying failures with jittered backoff"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            # Waiting on a platform's own limits must not hold one of the global slots
+            async with platform_slots:
+                await bucket.acquire()
+                async with global_slots:
+                    self.stats["queries"] += 1
+                    try:
+                        return await loop.run_in_executor(executor, call)
+                    except Exception as e:
+                        error = e
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                # Full jitter keeps retries from many queries from arriving in lockstep;
+                # a platform's Retry-After is honored as the minimum wait
+                delay = self.rng.uniform(0, self.backoff * 2 ** attempt)
+                await asyncio.sleep(max(delay, getattr(error, "retry_after", None) or 0))
+
+        self.stats["failures"] += 1
+        raise error
+
+    async def run_async(self, jobs: List[Tuple[Hashable, str, Callable[[], Any]]],
+                        on_result: Optional[Callable[[Hashable, Any], None]] = None) -> Dict[Hashable, Any]:
+        """Run (key, platform, call) jobs; results are keyed by job key, exceptions returned as values
+
+        on_result(key, result) is called on the event loop as each job finishes,
+        so callers can checkpoint progress without waiting for the whole run.
+        """
+        # asyncio primitives are bound to the running loop, so each run builds its own
+        platforms = {platform for _, platform, _ in jobs}
+        buckets, slots = {}, {}
+        for platform in platforms:
+            limits = self.platform_limits(platform)
+            buckets[platform] = TokenBucket(limits["rate"], limits["burst"])
+            slots[platform] = asyncio.Semaphore(limits["concurrency"])
+        global_slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_job(key: Hashable, platform: str, call: Callable[[], Any]) -> Any:
+            try:
+                result = await self._run_one(platform, call, buckets[platform], slots[platform],
+                                             global_slots, executor)
+            except Exception as e:
+                result = e
+            if on_result:
+                on_result(key, result)
+            return result
+
+        # Blocking platform calls run on a pool sized to the global bound
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = await asyncio.gather(*(run_job(key, platform, call) for key, platform, call in jobs))
+        return {key: result for (key, _, _), result in zip(jobs, results)}
+
+    def run(self, jobs: List[Tuple[Hashable, str, Callable[[], Any]]],
+            on_result: Optional[Callable[[Hashable, Any], None]] = None) -> Dict[Hashable, Any]:
+        """Synchronous entry point for run_async"""
+        return asyncio.run(self.run_async(jobs, on_result))
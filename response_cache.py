@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Persistent response cache for the AI visibility monitor
+Keeps platform answers keyed by normalized query, platform, answer source
+(client type, endpoint or seed) and prompt version, so sessions run minutes apart (or overlapping modes such as
+quick_check and full) only query what is missing or expired. Entries live
+for a TTL and the least recently used are evicted beyond max_entries.
+"""
+
+import json
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query"""
+    return re.sub(r'\s+', ' ', query.strip().lower())
+
+class ResponseCache:
+    def __init__(self, cache_file: str, ttl: float = 6 * 3600, max_entries: int = 5000,
+                 prompt_version: str = "1"):
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Changing the prompt makes earlier answers incomparable, so it is part of the key
+        self.prompt_version = str(prompt_version)
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+        # key -> {"stored_at", "result"}, least recently used first
+        self.entries: "OrderedDict[str, Dict]" = self.load()
+
+    def load(self) -> "OrderedDict[str, Dict]":
+        if not self.cache_file.exists():
+            return OrderedDict()
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return OrderedDict(json.load(f).get('entries', []))
+        except (json.JSONDecodeError, OSError, TypeError, ValueError) as e:
+            print(f"[WARNING] Ignoring unreadable response cache {self.cache_file}: {e}")
+            return OrderedDict()
+
+    def save(self) -> None:
+        """Drop expired entries and write the rest in LRU order"""
+        now = time.time()
+        for key in [k for k, entry in self.entries.items() if now - entry['stored_at'] > self.ttl]:
+            del self.entries[key]
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'entries': list(self.entries.items())}, f, separators=(',', ':'))
+
+    def key(self, query: str, platform: str, source: str = "") -> str:
+        # Simulated answers must never be served to a run against a real endpoint, or
+        # unseeded answers to a seeded run, so the answering client is part of the key
+        return f"{platform}|{source}|{self.prompt_version}|{normalize_query(query)}"
+
+    def get(self, query: str, platform: str, source: str = "") -> Optional[Dict[str, Any]]:
+        """Cached result for a query on a platform from the same source, if still fresh"""
+        key = self.key(query, platform, source)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        if time.time() - entry['stored_at'] > self.ttl:
+            del self.entries[key]
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry['result']
+
+    def put(self, query: str, platform: str, result: Dict[str, Any], source: str = "") -> None:
+        key = self.key(query, platform, source)
+        self.entries[key] = {'stored_at': time.time(), 'result': result}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evicted"] += 1
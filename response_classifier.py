@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Local sentiment and context classifier for AI platform answers
+A small weighted lexicon is compiled into a NumPy weight matrix, and every
+answer of a session is classified in one batch: answers become rows of a
+binary bag-of-words matrix and a single matrix product scores them all.
+Besides positive/neutral/negative sentiment, each answer gets a context
+type: whether the brand is recommended, compared with alternatives, or just
+listed among other tools.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+
+SENTIMENTS = ("positive", "negative")
+CONTEXT_TYPES = ("recommendation", "comparison", "listing")
+# Reported when an answer carries no context evidence at all
+DEFAULT_CONTEXT = "mention"
+
+# word -> weight per column; a word may count towards sentiment and a context type
+LEXICON = {
+    "positive": {
+        "recommended": 1, "recommend": 1, "best": 1, "excellent": 1, "reliable": 1, "accurate": 1, "fast": 1,
+        "easy": 1, "popular": 1, "leading": 1, "great": 1, "powerful": 1, "intuitive": 1, "efficient": 1,
+        "trusted": 1, "robust": 1, "affordable": 1, "top": 1, "favorite": 1, "praised": 1
+    },
+    "negative": {
+        "avoid": 1, "poor": 1, "unreliable": 1, "slow": 1, "expensive": 1, "inaccurate": 1, "outdated": 1,
+        "limited": 1, "buggy": 1, "clunky": 1, "confusing": 1, "overpriced": 1, "lacks": 1, "lacking": 1,
+        "difficult": 1, "errors": 1, "complaints": 1, "worse": 1
+    },
+    "recommendation": {
+        "recommended": 1, "recommend": 1, "recommends": 1, "suggest": 1, "suggested": 1, "try": 1, "best": 1,
+        "ideal": 1, "choose": 1, "top": 1, "consider": 0.5, "should": 0.5, "great": 0.5
+    },
+    "comparison": {
+        "vs": 1, "versus": 1, "compared": 1, "comparison": 1, "compare": 1, "than": 1, "alternative": 1,
+        "alternatives": 1, "unlike": 1, "whereas": 1, "better": 0.5, "cheaper": 0.5, "faster": 0.5
+    },
+    "listing": {
+        "include": 1, "includes": 1, "including": 1, "options": 1, "such": 0.5, "several": 1, "tools": 0.5,
+        "among": 1, "popular": 0.5, "list": 1, "various": 1, "other": 0.5
+    }
+}
+# Words that flip sentiment and cancel a recommendation for the next few words
+NEGATORS = {"not", "no", "never", "hardly", "isn", "aren", "doesn", "don", "wasn", "won", "cannot", "without"}
+NEGATION_SCOPE = 2
+
+TOKEN_PATTERN = re.compile(r"\w+")
+LIST_ITEM_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s", re.MULTILINE)
+
+class ResponseClassifier:
+    def __init__(self, lexicon: Dict[str, Dict[str, float]] = None):
+        lexicon = lexicon or LEXICON
+        self.columns = SENTIMENTS + CONTEXT_TYPES
+        words = sorted({word for column in self.columns for word in lexicon.get(column, {})})
+        self.vocabulary = {word: i for i, word in enumerate(words)}
+
+        # Rows 0..V-1 are plain words; rows V..2V-1 the same words under negation
+        size = len(words)
+        self.weights = np.zeros((2 * size, len(self.columns)))
+        for c, column in enumerate(self.columns):
+            for word, weight in lexicon.get(column, {}).items():
+                self.weights[self.vocabulary[word], c] = weight
+        positive, negative, recommendation = (self.columns.index(c) for c in ("positive", "negative",
+                                                                                "recommendation"))
+        negated = self.weights[size:]
+        negated[:] = self.weights[:size]
+        negated[:, [positive, negative]] = self.weights[:size, [negative, positive]]
+        negated[:, recommendation] = 0
+        # A word counts once per answer, however often it repeats
+        self.evidence = (self.weights[:, :len(SENTIMENTS)] != 0).astype(float)
+
+    def features(self, texts: List[str]) -> np.ndarray:
+        """Binary document x (word, negated word) matrix for a batch of answers"""
+        size = len(self.vocabulary)
+        rows, cols = [], []
+        vocabulary = self.vocabulary
+        for row, text in enumerate(texts):
+            negated_until = -1
+            for position, token in enumerate(TOKEN_PATTERN.findall(text.lower())):
+                if token in NEGATORS:
+                    negated_until = position + NEGATION_SCOPE
+                    continue
+                index = vocabulary.get(token)
+                if index is not None:
+                    rows.append(row)
+                    cols.append(index + size if position <= negated_until else index)
+
+        matrix = np.zeros((len(texts), 2 * size), dtype=bool)
+        matrix[rows, cols] = True
+        return matrix
+
+    def classify(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Sentiment, sentiment evidence and context type for every answer in one pass
+
+        Returns arrays aligned with texts: "sentiment" and "context_type"
+        labels, and "evidence", the number of sentiment words found.
+        """
+        if not texts:
+            empty = np.array([], dtype=object)
+            return {"sentiment": empty, "evidence": np.zeros(0), "context_type": empty}
+
+        features = self.features(texts)
+        scores = features @ self.weights
+        evidence = (features @ self.evidence).sum(axis=1)
+
+        positive, negative = scores[:, 0], scores[:, 1]
+        sentiment = np.where(positive > negative, "positive", np.where(negative > positive, "negative", "neutral"))
+
+        # Structure counts too: two or more list items or commas point to a listing
+        context_scores = scores[:, len(SENTIMENTS):].copy()
+        structure = np.array([len(LIST_ITEM_PATTERN.findall(text)) + text.count(',') for text in texts])
+        context_scores[:, CONTEXT_TYPES.index("listing")] += np.where(structure >= 2, 1.0, 0.0)
+        labels = np.array(CONTEXT_TYPES + (DEFAULT_CONTEXT,), dtype=object)
+        best = np.where(context_scores.max(axis=1) > 0, context_scores.argmax(axis=1), len(CONTEXT_TYPES))
+
+        return {"sentiment": sentiment.astype(object), "evidence": evidence, "context_type": labels[best]}
+
+@lru_cache(maxsize=1)
+def get_classifier() -> ResponseClassifier:
+    """The default lexicon's classifier, compiled once per process"""
+    return ResponseClassifier()
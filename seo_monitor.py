@@ -5,53 +5,235 @@ Checks basic SEO elements and generates reports
 """
 
 import os
+import re
 import json
+import hashlib
+import time
+import argparse
 import requests
+from collections import deque
 from datetime import datetime
-from urllib.parse import urljoin
+from pathlib import Path
+from urllib.parse import parse_qs, urljoin, urlparse
+
+from audit_history import AuditHistory, percentile
+from change_snapshot import ChangeSnapshot
+from crawl_engine import AsyncCrawler, serve_directory
+from crawl_frontier import CrawlFrontier
+from http_cache import HTTPCache
+from local_site import LocalSiteFetcher
+from openmetrics import MetricsRegistry
+
+# Bump when analyze_content output changes so cached parses are discarded
+ANALYSIS_VERSION = 4
+
+# Fields whose presence is tracked as a pass/fail rule in the audit history
+REQUIRED_FIELDS = ["title", "meta_description", "h1_tags", "hreflang_tags"]
+
+# Per-page performance budgets by path prefix; the longest matching prefix applies
+PERFORMANCE_BUDGETS = {
+    "/": {
+        "ttfb": 0.8, "total_time": 2.0, "transfer_bytes": 150_000, "html_bytes": 150_000,
+        "inline_script_bytes": 50_000, "inline_style_bytes": 20_000, "render_blocking": 8, "dom_nodes": 1500
+    }
+}
+
+# Timings vary every run, so they are left out of change snapshots; so are the bytes
+# transferred (0 on a 304) and budget violations, which carry the measured values
+VOLATILE_FIELDS = ["load_time", "total_time", "performance.ttfb", "performance.total_time",
+                   "performance.transfer_bytes", "budget_violations"]
+
+# Metrics summarized as p50/p95 across pages and recorded in the audit history
+PERFORMANCE_METRICS = ["ttfb", "total_time", "transfer_bytes", "html_bytes", "inline_script_bytes",
+                       "inline_style_bytes", "render_blocking", "dom_nodes"]
+
+# OpenMetrics family name and unit per performance metric
+PERFORMANCE_EXPORTS = {
+    "ttfb": ("page_ttfb_seconds", "seconds"),
+    "total_time": ("page_fetch_seconds", "seconds"),
+    "transfer_bytes": ("page_transfer_bytes", "bytes"),
+    "html_bytes": ("page_html_bytes", "bytes"),
+    "inline_script_bytes": ("page_inline_script_bytes", "bytes"),
+    "inline_style_bytes": ("page_inline_style_bytes", "bytes"),
+    "render_blocking": ("page_render_blocking_resources", ""),
+    "dom_nodes": ("page_dom_nodes", "")
+}
 
 class SEOMonitor:
-    def __init__(self, base_url="https://tidiful.com"):
+    def __init__(self, base_url="https://tidiful.com", history_db=".build_cache/audit_history.db",
+                 concurrency=8, per_host_rate=10.0, http_cache_file=".build_cache/seo_monitor_http.json",
+                 local_root=None, max_pages=200, max_depth=2, budgets=None,
+                 snapshot_file=".build_cache/snapshots/seo_report.json"):
         self.base_url = base_url
-        self.pages = [
-            "/",
-            "/pricing.html", 
-            "/blog/blogs.html",
-            "/blog/posts/image-to-excel-complete-guide.html",
-            "/blog/posts/invoice-to-excel-complete-guide.html",
-            "/blog/posts/pdf-to-csv-complete-guide.html",
-            "/blog/posts/what-is-pdf-to-csv-conversion.html",
-            "/blog/posts/how-to-scan-pdf-documents-like-a-pro-a-complete-guide-for-business-professionals.html"
-        ]
+        # When set, pages are read from this working tree instead of fetched over HTTP
+        self.local_root = local_root
+        self.history_db = history_db
+        self.concurrency = concurrency
+        self.per_host_rate = per_host_rate
+        self.http_cache = HTTPCache(http_cache_file, version=ANALYSIS_VERSION) if http_cache_file else None
+        # Pages come from sitemap.xml plus discovered links, within these budgets
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.budgets = budgets or PERFORMANCE_BUDGETS
+        self.snapshot_file = snapshot_file
         self.languages = ["en-US", "fr-FR", "de-DE", "es-ES", "el-GR"]
         
-    def check_page_seo(self, page_path, lang="en-US"):
-        """Check SEO elements for a specific page"""
+    def page_url(self, page_path, lang="en-US"):
+        """Build the URL for a page in a given language"""
         url = f"{self.base_url}{page_path}"
         if lang != "en-US":
             url += f"?lang={lang}"
-            
+        return url
+    
+    def analyze_content(self, content):
+        """Extract the essential SEO elements from page HTML"""
+        return {
+            "title": self.extract_title(content),
+            "meta_description": self.extract_meta_description(content),
+            "h1_tags": self.extract_h1_tags(content),
+            "hreflang_tags": self.extract_hreflang_tags(content),
+            "canonical_url": self.extract_canonical(content),
+            "structured_data": self.extract_structured_data(content),
+            "internal_links": self.extract_internal_links(content),
+            "images_with_alt": self.check_image_alt_tags(content),
+            "page_size": len(content),
+            "performance": self.extract_page_weight(content),
+            # Link targets and translation keys feed later stages and are not part of the report
+            "outlinks": list(dict.fromkeys(re.findall(r'<a[^>]*href="([^"#][^"]*)"', content, re.IGNORECASE))),
+            "i18n_keys": sorted(set(re.findall(r'\sdata-i18n(?:-html|-placeholder)?="([^"]+)"', content)))
+        }
+    
+    def analyze_fetch(self, fetch, shared_parses=None):
+        """Turn a crawler fetch result into the per-page report entry
+        
+        shared_parses maps body hashes to parse results, so byte-identical
+        responses (e.g. ?lang= variants of a static page) are parsed once.
+        """
+        if "error" in fetch:
+            return {"error": fetch["error"]}
+        
+        url = fetch["url"]
+        if fetch["status"] == 304 and self.http_cache:
+            # Not modified: reuse the parse from the run that downloaded the page
+            seo_checks = self.http_cache.not_modified(url, fetch["headers"])
+            if seo_checks is None:
+                return {"error": "HTTP 304 without a cached copy"}
+            seo_checks = dict(seo_checks)
+        elif fetch["status"] != 200:
+            return {"error": f"HTTP {fetch['status']}"}
+        else:
+            digest = hashlib.sha256(fetch["content"]).hexdigest()
+            seo_checks = shared_parses.get(digest) if shared_parses is not None else None
+            if seo_checks is None and self.http_cache:
+                seo_checks = self.http_cache.unchanged_body(url, fetch["content"])
+            if seo_checks is None:
+                seo_checks = self.analyze_content(fetch["text"])
+            if shared_parses is not None:
+                shared_parses[digest] = seo_checks
+            if self.http_cache:
+                self.http_cache.store(url, fetch["headers"], fetch["content"], seo_checks)
+            seo_checks = dict(seo_checks)
+        
+        seo_checks["load_time"] = fetch["ttfb"]
+        seo_checks["total_time"] = round(fetch["total_time"], 4)
+        headers = {k.lower(): v for k, v in fetch["headers"].items()}
+        seo_checks["performance"] = {
+            "ttfb": round(fetch["ttfb"], 4),
+            "total_time": round(fetch["total_time"], 4),
+            "transfer_bytes": fetch.get("transfer_bytes", fetch["bytes"]),
+            "encoding": headers.get("content-encoding", "identity"),
+            **seo_checks.get("performance", {})
+        }
+        return seo_checks
+    
+    def analyze_variant(self, page_path, lang, seo_checks, bundle_keys):
+        """Add the checks that differ per language variant to a (possibly shared) parse"""
+        used_keys = seo_checks.pop("i18n_keys", [])
+        if "error" in seo_checks:
+            return seo_checks
+        
+        if bundle_keys.get(lang) is not None:
+            seo_checks["i18n_missing_keys"] = [key for key in used_keys if key not in bundle_keys[lang]]
+        
+        # The variant should list itself among the page's hreflang alternates
+        seo_checks["hreflang_self_reference"] = False
+        for _, href in seo_checks.get("hreflang_tags", []):
+            parsed = urlparse(href)
+            href_lang = parse_qs(parsed.query).get("lang", ["en-US"])[0]
+            if re.sub(r'/index\.html$', '/', parsed.path or "/") == page_path and href_lang == lang:
+                seo_checks["hreflang_self_reference"] = True
+                break
+        return seo_checks
+    
+    def load_bundle_keys(self):
+        """Load the dotted keys of each language's i18n bundle from the tree or the site"""
+        def flatten(node, prefix=""):
+            keys = set()
+            for key, value in node.items():
+                if isinstance(value, dict):
+                    keys |= flatten(value, f"{prefix}{key}.")
+                else:
+                    keys.add(f"{prefix}{key}")
+            return keys
+        
+        bundle_keys = {}
+        for lang in self.languages:
+            try:
+                if self.local_root:
+                    with open(Path(self.local_root) / "assets" / "i18n" / f"{lang}.json", 'r', encoding='utf-8') as f:
+                        bundle = json.load(f)
+                else:
+                    response = requests.get(f"{self.base_url}/assets/i18n/{lang}.json", timeout=10)
+                    response.raise_for_status()
+                    bundle = response.json()
+                bundle_keys[lang] = flatten(bundle)
+            except (OSError, ValueError, requests.RequestException) as e:
+                print(f"[WARNING] Could not load {lang} i18n bundle: {e}")
+                bundle_keys[lang] = None
+        return bundle_keys
+    
+    def extract_page_weight(self, content):
+        """Measure HTML size, inline code, render-blocking resources and DOM size"""
+        head_match = re.search(r'<head[^>]*>(.*?)</head>', content, re.IGNORECASE | re.DOTALL)
+        head = head_match.group(1) if head_match else ""
+        
+        inline_scripts = re.findall(r'<script(?![^>]*\bsrc=)[^>]*>(.*?)</script>', content, re.IGNORECASE | re.DOTALL)
+        inline_styles = re.findall(r'<style[^>]*>(.*?)</style>', content, re.IGNORECASE | re.DOTALL)
+        # Stylesheets and synchronous scripts in <head> block the first render
+        blocking_styles = [tag for tag in re.findall(r'<link[^>]*>', head, re.IGNORECASE)
+                           if re.search(r'rel=["\']stylesheet["\']', tag, re.IGNORECASE)
+                           and not re.search(r'media=["\']print["\']', tag, re.IGNORECASE)]
+        blocking_scripts = [tag for tag in re.findall(r'<script[^>]*\bsrc=[^>]*>', head, re.IGNORECASE)
+                            if not re.search(r'\b(async|defer)\b|type=["\']module["\']', tag, re.IGNORECASE)]
+        
+        return {
+            "html_bytes": len(content.encode('utf-8')),
+            "inline_script_bytes": sum(len(script.encode('utf-8')) for script in inline_scripts),
+            "inline_style_bytes": sum(len(style.encode('utf-8')) for style in inline_styles),
+            "render_blocking": len(blocking_styles) + len(blocking_scripts),
+            "dom_nodes": len(re.findall(r'<[a-zA-Z][^>]*>', content))
+        }
+    
+    def page_budget(self, page_path):
+        """Budget for a page from the longest matching path prefix"""
+        prefix = max((p for p in self.budgets if page_path.startswith(p)), key=len, default=None)
+        return self.budgets.get(prefix, {})
+    
+    def check_budgets(self, page_path, performance):
+        """List the budgeted metrics a page exceeds"""
+        return [{"metric": metric, "value": performance[metric], "budget": limit}
+                for metric, limit in self.page_budget(page_path).items()
+                if performance.get(metric) is not None and performance[metric] > limit]
+    
+    def check_page_seo(self, page_path, lang="en-US"):
+        """Check SEO elements for a specific page"""
         try:
-            response = requests.get(url, timeout=10)
+            response = requests.get(self.page_url(page_path, lang), timeout=10)
             if response.status_code != 200:
                 return {"error": f"HTTP {response.status_code}"}
-                
-            content = response.text
-            
-            # Check for essential SEO elements
-            seo_checks = {
-                "title": self.extract_title(content),
-                "meta_description": self.extract_meta_description(content),
-                "h1_tags": self.extract_h1_tags(content),
-                "hreflang_tags": self.extract_hreflang_tags(content),
-                "canonical_url": self.extract_canonical(content),
-                "structured_data": self.extract_structured_data(content),
-                "internal_links": self.extract_internal_links(content),
-                "images_with_alt": self.check_image_alt_tags(content),
-                "page_size": len(content),
-                "load_time": response.elapsed.total_seconds()
-            }
             
+            seo_checks = self.analyze_content(response.text)
+            seo_checks["load_time"] = response.elapsed.total_seconds()
             return seo_checks
             
         except Exception as e:
@@ -107,31 +289,197 @@ class SEOMonitor:
         images_with_alt = [img for img in img_tags if 'alt=' in img]
         return len(images_with_alt)
     
+    def open_sitemap(self):
+        """Open sitemap.xml as a byte stream from the working tree or the site"""
+        if self.local_root:
+            return open(Path(self.local_root) / "sitemap.xml", "rb")
+        
+        response = requests.get(f"{self.base_url}/sitemap.xml", timeout=10, stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return response.raw
+    
+    def build_frontier(self):
+        """Seed a crawl frontier from the sitemap, falling back to the homepage"""
+        frontier = CrawlFrontier(self.base_url, max_pages=self.max_pages, max_depth=self.max_depth)
+        try:
+            with self.open_sitemap() as sitemap:
+                seeded = frontier.seed_from_sitemap(sitemap)
+            print(f"Seeded {seeded} pages from sitemap.xml")
+        except Exception as e:
+            print(f"[WARNING] Could not read sitemap.xml ({e}), starting from the homepage")
+        frontier.add("/")
+        return frontier
+    
     def generate_report(self):
         """Generate comprehensive SEO report"""
         report = {
             "timestamp": datetime.now().isoformat(),
             "base_url": self.base_url,
-            "pages_checked": len(self.pages),
+            "pages_checked": 0,
             "languages_checked": len(self.languages),
             "results": {}
         }
         
-        for page in self.pages:
-            report["results"][page] = {}
-            for lang in self.languages:
-                print(f"Checking {page} ({lang})...")
-                seo_data = self.check_page_seo(page, lang)
-                report["results"][page][lang] = seo_data
+        frontier = self.build_frontier()
+        
+        if self.local_root:
+            print(f"Reading pages from {self.local_root} (budget {self.max_pages} pages)...")
+            crawler = LocalSiteFetcher(self.local_root, self.base_url)
+        else:
+            print(f"Crawling up to {self.max_pages} pages (concurrency {self.concurrency})...")
+            # Pages and language variants are fetched concurrently over one connection pool
+            crawler = AsyncCrawler(concurrency=self.concurrency, per_host_rate=self.per_host_rate,
+                                   cache=self.http_cache)
+        
+        bundle_keys = self.load_bundle_keys()
+        shared_parses = {}
+        # Language variants of popped pages waiting for a free worker, as (page, lang, url)
+        queued = deque()
+        targets = {}
+        depths = {}
+        results = {}
+        
+        def next_url():
+            """Next variant to fetch; pages come off the frontier newest lastmod first"""
+            if not queued:
+                batch = frontier.pop_batch(1)
+                if not batch:
+                    return None
+                page, depths[page] = batch[0]
+                queued.extend((page, lang, self.page_url(page, lang)) for lang in self.languages)
+            page, lang, url = queued.popleft()
+            targets[url] = (page, lang)
+            return url
+        
+        def on_result(fetch):
+            """Analyze a variant as soon as it arrives; en-US links extend the frontier"""
+            page, lang = targets[fetch["url"]]
+            seo_checks = self.analyze_variant(page, lang, self.analyze_fetch(fetch, shared_parses), bundle_keys)
+            outlinks = seo_checks.pop("outlinks", [])
+            if "performance" in seo_checks:
+                seo_checks["budget_violations"] = self.check_budgets(page, seo_checks["performance"])
+            if lang == "en-US":
+                frontier.add_links(outlinks, fetch["url"], depths[page])
+            results.setdefault(page, {})[lang] = seo_checks
+        
+        started = time.perf_counter()
+        try:
+            # One crawl for the whole frontier: workers never wait for a batch's slowest page
+            fetches = crawler.crawl_queue(next_url, on_result)
+        finally:
+            crawler.close()
+        crawl_time = time.perf_counter() - started
+        # Fetches finish in any order; report pages in crawl order and languages in the usual order
+        for page in depths:
+            report["results"][page] = {lang: results[page][lang] for lang in self.languages
+                                       if lang in results.get(page, {})}
+        if self.http_cache:
+            self.http_cache.save()
+        
+        report["pages_checked"] = len(report["results"])
+        report["performance"] = {"budgets": self.budgets, "current": self.performance_percentiles(report)}
+        fetch_times = [f["total_time"] for f in fetches.values()]
+        report["crawl"] = {
+            "urls": len(fetches),
+            "wall_time": round(crawl_time, 4),
+            "sum_of_fetch_times": round(sum(fetch_times), 4),
+            "slowest_fetch": round(max(fetch_times, default=0), 4),
+            "not_modified": sum(1 for f in fetches.values() if f.get("status") == 304),
+            "bytes_transferred": sum(f.get("bytes", 0) for f in fetches.values()),
+            # Distinct response bodies, i.e. full parses shared across identical variants
+            "unique_bodies": len(shared_parses),
+            "pages_over_budget": frontier.over_budget
+        }
+        print(f"Crawled {len(fetches)} URLs in {crawl_time:.2f}s "
+              f"(slowest page {report['crawl']['slowest_fetch']:.2f}s, "
+              f"{report['crawl']['not_modified']} not modified, "
+              f"{report['crawl']['bytes_transferred']} bytes)")
         
         return report
     
+    def performance_percentiles(self, report):
+        """p50/p95 of each performance metric across the pages of a report"""
+        entries = [data["performance"] for langs in report["results"].values()
+                   for data in langs.values() if "performance" in data]
+        summary = {}
+        for metric in PERFORMANCE_METRICS:
+            values = [entry[metric] for entry in entries if entry.get(metric) is not None]
+            if values:
+                summary[metric] = {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+        return summary
+    
     def save_report(self, report, filename="seo_report.json"):
         """Save report to JSON file"""
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
         print(f"Report saved to {filename}")
     
+    def record_history(self, report):
+        """Append per-page, per-rule results of a report to the history store"""
+        results = []
+        for page, langs in report["results"].items():
+            for lang, data in langs.items():
+                if "error" in data:
+                    rules = {"fetch": "issue"}
+                else:
+                    rules = {"fetch": "passed"}
+                    rules.update({field: "passed" if data.get(field) else "issue" for field in REQUIRED_FIELDS})
+                    # Budget checks are rules too, so a page going over budget shows up as a regression
+                    over_budget = {v["metric"] for v in data.get("budget_violations", [])}
+                    rules.update({f"budget:{metric}": "issue" if metric in over_budget else "passed"
+                                  for metric in self.page_budget(page)})
+                passed = sum(1 for status in rules.values() if status == "passed")
+                performance = data.get("performance", {})
+                results.append({
+                    "subject": f"{page}?lang={lang}",
+                    "score": round(passed * 100 / len(rules)),
+                    "rules": rules,
+                    "metrics": {metric: performance.get(metric) for metric in PERFORMANCE_METRICS}
+                })
+        
+        history = AuditHistory(self.history_db)
+        history.record_run("seo_monitor", results, run_at=report["timestamp"][:19])
+        regressions = history.rule_regressions("seo_monitor")
+        # p50/p95 over the last runs, including this one
+        report.setdefault("performance", {})["history"] = {
+            metric: history.metric_percentiles("seo_monitor", metric) for metric in PERFORMANCE_METRICS
+        }
+        history.close()
+        
+        if regressions:
+            print(f"Regressions since previous run: {len(regressions)}")
+            for reg in regressions[:10]:
+                print(f"  - {reg['subject']}: {reg['rule']} {reg['before']} -> {reg['after']}")
+    
+    def write_change_delta(self, report, delta_file="seo_report_delta.json"):
+        """Write the fields that changed since the previous run's snapshot"""
+        records = {f"{page}?lang={lang}": data
+                   for page, langs in report["results"].items() for lang, data in langs.items()}
+        snapshot = ChangeSnapshot(self.snapshot_file, ignore_fields=VOLATILE_FIELDS)
+        snapshot.write_delta(snapshot.delta(records), delta_file)
+    
+    def export_metrics(self, report, metrics_file):
+        """Write fetch latencies, page weight and budget results as OpenMetrics text"""
+        metrics = MetricsRegistry()
+        for page, langs in report["results"].items():
+            for lang, data in langs.items():
+                metrics.gauge("seo_page_up", 0 if "error" in data else 1,
+                              "Whether the page variant was fetched successfully", page=page, lang=lang)
+                if "error" in data:
+                    continue
+                for metric, (name, unit) in PERFORMANCE_EXPORTS.items():
+                    metrics.gauge(f"seo_{name}", data["performance"][metric], unit=unit, page=page, lang=lang)
+                metrics.gauge("seo_page_budget_violations", len(data.get("budget_violations", [])),
+                              "Performance budgets exceeded by the page variant", page=page, lang=lang)
+        
+        crawl = report["crawl"]
+        metrics.gauge("seo_crawl_wall_seconds", crawl["wall_time"], "Wall time of the crawl", "seconds")
+        metrics.gauge("seo_crawl_urls", crawl["urls"], "URLs fetched")
+        metrics.gauge("seo_crawl_not_modified", crawl["not_modified"], "URLs revalidated with a 304")
+        metrics.gauge("seo_crawl_transferred_bytes", crawl["bytes_transferred"], "Response bytes", "bytes")
+        metrics.write(metrics_file)
+    
     def print_summary(self, report):
         """Print summary of SEO findings"""
         print("\n" + "="*60)
@@ -145,6 +493,14 @@ class SEOMonitor:
         print(f"Total checks: {total_checks}")
         print(f"Languages: {', '.join(self.languages)}")
         
+        performance = report.get("performance", {})
+        if performance.get("current"):
+            print("\nPerformance (p50 / p95 this run, p95 across recent runs):")
+            for metric, stats in performance["current"].items():
+                recent = performance.get("history", {}).get(metric, {}).get("p95")
+                recent_text = f"{recent:g}" if recent is not None else "n/a"
+                print(f"  {metric}: {stats['p50']:g} / {stats['p95']:g} (recent p95 {recent_text})")
+        
         # Check for common issues
         issues = []
         for page, langs in report["results"].items():
@@ -160,6 +516,12 @@ class SEOMonitor:
                         issues.append(f"{page} ({lang}): Missing H1 tags")
                     if not data.get("hreflang_tags"):
                         issues.append(f"{page} ({lang}): Missing hreflang tags")
+                    if data.get("i18n_missing_keys"):
+                        issues.append(f"{page} ({lang}): {len(data['i18n_missing_keys'])} i18n keys "
+                                      f"missing from the {lang} bundle")
+                    for violation in data.get("budget_violations", []):
+                        issues.append(f"{page} ({lang}): {violation['metric']} {violation['value']:g} "
+                                      f"over budget {violation['budget']:g}")
         
         if issues:
             print(f"\nIssues found: {len(issues)}")
@@ -172,15 +534,17 @@ class SEOMonitor:
         
         print("\n" + "="*60)
 
-def main():
-    """Main function to run SEO monitoring"""
-    monitor = SEOMonitor()
-    
+def run_monitoring(monitor, metrics_file=None):
+    """Run a monitoring pass and write the reports"""
     print("Starting TidiFul SEO monitoring...")
     report = monitor.generate_report()
     
-    # Save detailed report
+    # Record history first so the saved report includes percentiles across runs
+    monitor.record_history(report)
     monitor.save_report(report)
+    monitor.write_change_delta(report)
+    if metrics_file:
+        monitor.export_metrics(report, metrics_file)
     
     # Print summary
     monitor.print_summary(report)
@@ -193,5 +557,47 @@ def main():
         f.write(f"Languages: {', '.join(monitor.languages)}\n")
         f.write("\nFor detailed results, see seo_report.json\n")
 
+def main():
+    """Main function to run SEO monitoring"""
+    parser = argparse.ArgumentParser(description='SEO Monitor for TidiFul')
+    parser.add_argument('--base-url', default='https://tidiful.com', help='Site to monitor')
+    parser.add_argument('--serve', metavar='DIR',
+                        help='Serve DIR over local HTTP and monitor it instead of --base-url')
+    parser.add_argument('--local', metavar='DIR',
+                        help='Audit the working tree in DIR offline, rendering ?lang= variants from assets/i18n')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='Port for --serve (fixed so cached URLs stay valid across runs)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Maximum parallel requests')
+    parser.add_argument('--rate', type=float, default=10.0, help='Maximum requests per second per host')
+    parser.add_argument('--no-cache', action='store_true', help='Download every page in full')
+    parser.add_argument('--max-pages', type=int, default=200, help='Maximum pages to monitor')
+    parser.add_argument('--max-depth', type=int, default=2,
+                        help='Maximum link depth followed from sitemap pages')
+    parser.add_argument('--budgets', metavar='FILE',
+                        help='JSON performance budgets by path prefix (default: PERFORMANCE_BUDGETS)')
+    parser.add_argument('--metrics-file', help='Also write results as an OpenMetrics text file')
+    args = parser.parse_args()
+    
+    options = {"concurrency": args.concurrency, "per_host_rate": args.rate,
+               "max_pages": args.max_pages, "max_depth": args.max_depth}
+    if args.budgets:
+        with open(args.budgets, 'r', encoding='utf-8') as f:
+            options["budgets"] = json.load(f)
+    if args.no_cache:
+        options["http_cache_file"] = None
+    elif args.local:
+        # Local parses must not be revalidated against the live site's validators
+        options["http_cache_file"] = ".build_cache/seo_monitor_local.json"
+    
+    if args.local:
+        # Local renders differ from the live site, so they keep their own baseline
+        options["snapshot_file"] = ".build_cache/snapshots/seo_report_local.json"
+        run_monitoring(SEOMonitor(args.base_url, local_root=args.local, **options), args.metrics_file)
+    elif args.serve:
+        with serve_directory(args.serve, args.port) as base_url:
+            run_monitoring(SEOMonitor(base_url, **options), args.metrics_file)
+    else:
+        run_monitoring(SEOMonitor(args.base_url, **options), args.metrics_file)
+
 if __name__ == "__main__":
     main()
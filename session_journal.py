@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Durable checkpoint journal for AI visibility sessions
+Each completed (keyword, platform) query is appended to a JSON-lines file
+and fsynced, so a session that dies or times out halfway can be resumed
+without repeating the queries it already paid for. Extra answers from
+adaptive sampling are journaled too, numbered by sample.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from change_snapshot import fingerprint
+
+class SessionJournal:
+    def __init__(self, journal_file: str, identity: Dict[str, Any], max_age: float = None):
+        self.journal_file = Path(journal_file)
+        # A journal is only resumed by a session asking for the same work, while its answers are fresh
+        self.identity = fingerprint(identity)
+        self.max_age = max_age
+        self.file = None
+        # Extra answers per (keyword, platform) from adaptive sampling, in sample order
+        self.samples: Dict[Tuple[str, str], List[Dict]] = {}
+        # Byte offset just past the last complete entry, where a resumed session appends
+        self.end = 0
+
+    def load(self) -> Dict[Tuple[str, str], Dict]:
+        """Completed results from a journal written by the same session, else nothing"""
+        if not self.journal_file.exists():
+            return {}
+
+        completed = {}
+        samples = {}
+        offset = 0
+        with open(self.journal_file, 'rb') as f:
+            for number, line in enumerate(f):
+                offset += len(line)
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("unterminated line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves at most one torn line at the end
+                    continue
+                self.end = offset
+                if number == 0:
+                    if entry.get("identity") != self.identity:
+                        print(f"[WARNING] {self.journal_file} belongs to a different session; starting over")
+                        return {}
+                    if self.max_age is not None and time.time() - entry.get("started", 0) > self.max_age:
+                        print(f"[WARNING] {self.journal_file} is too old to resume; starting over")
+                        return {}
+                    continue
+                key = (entry["keyword"], entry["platform"])
+                if entry.get("sample"):
+                    samples.setdefault(key, {})[entry["sample"]] = entry["result"]
+                else:
+                    completed[key] = entry["result"]
+        self.samples = {key: [answers[n] for n in sorted(answers)] for key, answers in samples.items()}
+        return completed
+
+    def start(self, resume: bool = False) -> Dict[Tuple[str, str], Dict]:
+        """Open the journal for appending; with resume, return the results it already holds"""
+        completed = self.load() if resume else {}
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        if completed or self.samples:
+            self.file = open(self.journal_file, 'r+', encoding='utf-8')
+            # Drop a torn last line, or the next entry would be appended onto it and lost
+            self.file.truncate(self.end)
+            self.file.seek(self.end)
+            extra = sum(len(answers) for answers in self.samples.values())
+            print(f"Resuming: {len(completed) + extra} completed queries found in {self.journal_file}")
+        else:
+            self.file = open(self.journal_file, 'w', encoding='utf-8')
+            self._write({"identity": self.identity, "started": time.time()})
+        return completed
+
+    def record(self, keyword: str, platform: str, result: Dict, sample: int = 0) -> None:
+        """Durably append one completed query; sample numbers the extra answers of a cell"""
+        if self.file is None:
+            return
+        entry = {"keyword": keyword, "platform": platform, "result": result}
+        if sample:
+            entry["sample"] = sample
+        try:
+            self._write(entry)
+        except OSError as e:
+            print(f"[WARNING] Checkpointing stopped, could not write {self.journal_file}: {e}")
+            self.close()
+
+    def _write(self, entry: Dict) -> None:
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def complete(self) -> None:
+        """The session's results are saved, so the journal is no longer needed"""
+        self.close()
+        self.journal_file.unlink(missing_ok=True)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Streaming sitemap parser shared by the sitemap tools
+- iterparse with element clearing, so memory stays flat however large the sitemap
+- Plain or gzipped sitemaps, and sitemap indexes whose child sitemaps resolve locally
+- Validates as it goes: structure, URL syntax, lastmod format, duplicate URLs
+  and the protocol's limits of 50,000 URLs and 50 MB (uncompressed) per file
+"""
+
+import gzip
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+from datetime import date, datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+XHTML_NS = '{http://www.w3.org/1999/xhtml}'
+MAX_URLS = 50_000
+MAX_BYTES = 50 * 1024 * 1024
+MAX_URL_LENGTH = 2048
+CHANGEFREQS = {"always", "hourly", "daily", "weekly", "monthly", "yearly", "never"}
+# W3C datetime: YYYY, YYYY-MM, YYYY-MM-DD or a full date and time with a timezone designator
+LASTMOD_PATTERN = re.compile(r'^\d{4}(-\d{2}(-\d{2}(T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:\d{2}))?)?)?$')
+GZIP_MAGIC = b'\x1f\x8b'
+WHITESPACE = re.compile(r'\s')
+
+class SitemapEntry(NamedTuple):
+    loc: str
+    lastmod: Optional[str] = None
+    changefreq: Optional[str] = None
+    priority: Optional[float] = None
+    # (hreflang, href) pairs from xhtml:link alternates
+    alternates: Tuple[Tuple[str, str], ...] = ()
+    # The file the entry came from, which differs from the input for sitemap indexes
+    sitemap: str = "sitemap.xml"
+
+class _CountingStream:
+    """Byte stream that can be peeked at and counts what has been read"""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.buffer = b''
+        self.count = 0
+
+    def peek(self, size: int) -> bytes:
+        while len(self.buffer) < size:
+            chunk = self.raw.read(size - len(self.buffer))
+            if not chunk:
+                break
+            self.buffer += chunk
+        return self.buffer[:size]
+
+    def read(self, size: int = -1) -> bytes:
+        if self.buffer:
+            # A short read is fine for callers of read(), so the peeked bytes go out on their own
+            if 0 <= size < len(self.buffer):
+                data, self.buffer = self.buffer[:size], self.buffer[size:]
+            else:
+                data, self.buffer = self.buffer, b''
+        else:
+            data = self.raw.read(size)
+        self.count += len(data)
+        return data
+
+def lastmod_error(value: str) -> Optional[str]:
+    """Why a lastmod value is not a valid W3C datetime, or None if it is"""
+    if not LASTMOD_PATTERN.match(value):
+        return "is not a W3C datetime"
+    try:
+        parts = [int(p) for p in value[:10].split('-')]
+        day = date(parts[0], parts[1] if len(parts) > 1 else 1, parts[2] if len(parts) > 2 else 1)
+        if 'T' in value:
+            datetime.strptime(value[11:16], '%H:%M')
+    except ValueError:
+        return "is not a real date"
+    if day > date.today():
+        return "is in the future"
+    return None
+
+class SitemapReader:
+    def __init__(self, base_url: str = "https://tidiful.com", root: str = None, max_urls: int = MAX_URLS,
+                 max_bytes: int = MAX_BYTES, follow_index: bool = True):
+        self.host = urlparse(base_url).netloc.lower()
+        # Child sitemaps of an index are read from here (default: the index's own directory)
+        self.root = root
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.follow_index = follow_index
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.url_count = 0
+        self.sitemap_count = 0
+        # 64-bit hashes of every URL seen, far smaller than the strings
+        self._seen = set()
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def entries(self, source: Union[str, Path, BinaryIO], name: str = None) -> Iterator[SitemapEntry]:
+        """Yield every URL entry of a sitemap file or byte stream, following sitemap indexes"""
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            if self.root is None:
+                self.root = str(path.parent)
+            with open(path, 'rb') as f:
+                yield from self._read(f, name or path.name)
+        else:
+            yield from self._read(source, name or "sitemap.xml")
+
+    def _read(self, source: BinaryIO, name: str, in_index: bool = False) -> Iterator[SitemapEntry]:
+        stream = _CountingStream(source)
+        if stream.peek(2) == GZIP_MAGIC:
+            # Limits apply to the uncompressed size
+            stream = _CountingStream(gzip.GzipFile(fileobj=stream, mode='rb'))
+        try:
+            yield from self._parse(stream, name, in_index)
+        except (ET.ParseError, OSError, EOFError) as e:
+            self.errors.append(f"{name}: XML is invalid: {e}")
+        if stream.count > self.max_bytes:
+            self.errors.append(f"{name}: {stream.count:,} bytes exceeds the {self.max_bytes:,} byte limit")
+
+    def _parse(self, stream: _CountingStream, name: str, in_index: bool) -> Iterator[SitemapEntry]:
+        root = None
+        children = 0
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if root is None:
+                root = elem
+                if elem.tag not in (f'{SITEMAP_NS}urlset', f'{SITEMAP_NS}sitemapindex'):
+                    self.errors.append(f"{name}: root element is {elem.tag}, not a sitemap urlset or sitemapindex")
+                    return
+                if in_index and elem.tag == f'{SITEMAP_NS}sitemapindex':
+                    self.errors.append(f"{name}: sitemap indexes cannot list other sitemap indexes")
+                    return
+                self.sitemap_count += 1
+                continue
+            if event != 'end':
+                continue
+
+            if elem.tag == f'{SITEMAP_NS}url' and root.tag == f'{SITEMAP_NS}urlset':
+                children += 1
+                if children == self.max_urls + 1:
+                    self.errors.append(f"{name}: more than {self.max_urls:,} URLs")
+                entry = self._entry(elem, name)
+                if entry:
+                    yield entry
+            elif elem.tag == f'{SITEMAP_NS}sitemap' and root.tag == f'{SITEMAP_NS}sitemapindex':
+                children += 1
+                if children == self.max_urls + 1:
+                    self.errors.append(f"{name}: more than {self.max_urls:,} sitemaps")
+                loc = (elem.findtext(f'{SITEMAP_NS}loc') or '').strip()
+                # Drop the finished entry before reading the child, which may be large
+                root.clear()
+                yield from self._child(loc, name)
+                continue
+            else:
+                continue
+            # Drop finished entries so memory stays flat as the parse goes on
+            root.clear()
+
+        if root is not None and root.tag == f'{SITEMAP_NS}urlset' and not children:
+            self.warnings.append(f"{name}: contains no URLs")
+
+    def _entry(self, elem: ET.Element, name: str) -> Optional[SitemapEntry]:
+        loc = (elem.findtext(f'{SITEMAP_NS}loc') or '').strip()
+        if not loc:
+            self.errors.append(f"{name}: <url> without <loc>")
+            return None
+        problem = self.url_error(loc)
+        if problem:
+            self.errors.append(f"{name}: {loc} {problem}")
+
+        digest = hashlib.blake2b(loc.encode('utf-8'), digest_size=8).digest()
+        if digest in self._seen:
+            self.errors.append(f"{name}: duplicate URL {loc}")
+        self._seen.add(digest)
+        self.url_count += 1
+
+        lastmod = (elem.findtext(f'{SITEMAP_NS}lastmod') or '').strip() or None
+        if lastmod:
+            problem = lastmod_error(lastmod)
+            if problem:
+                self.errors.append(f"{name}: lastmod '{lastmod}' of {loc} {problem}")
+
+        changefreq = (elem.findtext(f'{SITEMAP_NS}changefreq') or '').strip() or None
+        if changefreq and changefreq not in CHANGEFREQS:
+            self.errors.append(f"{name}: changefreq '{changefreq}' of {loc} is not one of {sorted(CHANGEFREQS)}")
+
+        priority = None
+        text = (elem.findtext(f'{SITEMAP_NS}priority') or '').strip()
+        if text:
+            try:
+                priority = float(text)
+            except ValueError:
+                pass
+            if priority is None or not 0.0 <= priority <= 1.0:
+                self.errors.append(f"{name}: priority '{text}' of {loc} is not between 0.0 and 1.0")
+                priority = None
+
+        alternates = tuple((link.get('hreflang', ''), link.get('href', ''))
+                           for link in elem.iter(f'{XHTML_NS}link') if link.get('rel') == 'alternate')
+        return SitemapEntry(loc, lastmod, changefreq, priority, alternates, name)
+
+    def _child(self, loc: str, name: str) -> Iterator[SitemapEntry]:
+        """Entries of a sitemap listed in an index, read from the local copy of the site"""
+        if not loc or self.url_error(loc):
+            self.errors.append(f"{name}: invalid child sitemap location '{loc}'")
+            return
+        if not self.follow_index:
+            return
+        path = Path(self.root or ".") / urlparse(loc).path.lstrip('/')
+        if not path.is_file():
+            self.warnings.append(f"{name}: child sitemap {loc} not found at {path}, skipped")
+            return
+
+        with open(path, 'rb') as f:
+            yield from self._read(f, path.name, in_index=True)
+
+    def url_error(self, loc: str) -> Optional[str]:
+        """Why a <loc> is not an acceptable sitemap URL, or None if it is"""
+        if len(loc) > MAX_URL_LENGTH:
+            return f"is longer than {MAX_URL_LENGTH} characters"
+        if WHITESPACE.search(loc):
+            return "contains whitespace"
+        parsed = urlparse(loc)
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            return "is not an absolute http(s) URL"
+        if self.host and parsed.netloc.lower() not in (self.host, f"www.{self.host}"):
+            return f"is not on {self.host}"
+        return None
+
+def files_under(entries: Iterable[SitemapEntry], *prefixes: str) -> Dict[str, List[str]]:
+    """Names below each site path prefix in one pass, e.g. post filenames under '/blog/posts/'"""
+    found = {prefix: [] for prefix in prefixes}
+    for entry in entries:
+        path = urlparse(entry.loc).path
+        for prefix in prefixes:
+            if path.startswith(prefix) and len(path) > len(prefix):
+                found[prefix].append(path[len(prefix):])
+    return found
+
+def read_sitemap(source: Union[str, Path, BinaryIO], base_url: str = "https://tidiful.com") -> List[SitemapEntry]:
+    """All entries of a small sitemap; large ones should iterate SitemapReader.entries instead"""
+    return list(SitemapReader(base_url).entries(source))
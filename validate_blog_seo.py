@@ -9,9 +9,13 @@ import json
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from content_metrics import current_metrics, load_manifest_metrics
+
 class BlogSEOValidator:
-    def __init__(self, blog_file: str):
+    def __init__(self, blog_file: str, metrics: Dict = None):
         self.blog_file = Path(blog_file)
+        # Precomputed content metrics (e.g. from the manifest); computed on demand otherwise
+        self.metrics = metrics
         self.issues = []
         self.warnings = []
         self.passed = []
@@ -25,6 +29,9 @@ class BlogSEOValidator:
         with open(self.blog_file, 'r', encoding='utf-8') as f:
             content = f.read()
         
+        # Manifest metrics are only trusted while the post's markup is unchanged
+        self.metrics = current_metrics(content, self.metrics)
+        
         # Run all validations
         self.check_meta_tags(content)
         self.check_open_graph(content)
@@ -216,19 +223,18 @@ class BlogSEOValidator:
     
     def check_internal_links(self, content: str):
         """Check for internal links"""
-        internal_links = re.findall(r'<a[^>]+href=["\'](?:\.\./|\./|/|https?://tidiful\.com)[^"\']+["\']', content, re.IGNORECASE)
-        if len(internal_links) >= 3:
-            self.passed.append(f"Found {len(internal_links)} internal links (good for SEO)")
-        elif len(internal_links) > 0:
-            self.warnings.append(f"Found only {len(internal_links)} internal links (recommended: 3+)")
+        internal_links = self.metrics['internalLinks']
+        if internal_links >= 3:
+            self.passed.append(f"Found {internal_links} internal links (good for SEO)")
+        elif internal_links > 0:
+            self.warnings.append(f"Found only {internal_links} internal links (recommended: 3+)")
         else:
             self.warnings.append("No internal links found (recommended for SEO)")
     
     def check_headings(self, content: str):
         """Check heading structure"""
-        h1_count = len(re.findall(r'<h1[^>]*>', content, re.IGNORECASE))
-        h2_count = len(re.findall(r'<h2[^>]*>', content, re.IGNORECASE))
-        h3_count = len(re.findall(r'<h3[^>]*>', content, re.IGNORECASE))
+        h1_count = self.metrics['headingCounts']['h1']
+        h2_count = self.metrics['headingCounts']['h2']
         
         if h1_count == 1:
             self.passed.append("Single H1 tag found (correct)")
@@ -244,14 +250,14 @@ class BlogSEOValidator:
     
     def check_images(self, content: str):
         """Check image alt text"""
-        images = re.findall(r'<img[^>]+>', content, re.IGNORECASE)
-        images_with_alt = re.findall(r'<img[^>]+alt=["\'][^"\']+["\']', content, re.IGNORECASE)
+        images = self.metrics['imageCount']
+        images_with_alt = self.metrics['imagesWithAlt']
         
-        if len(images) > 0:
-            if len(images_with_alt) == len(images):
-                self.passed.append(f"All {len(images)} images have alt text")
+        if images > 0:
+            if images_with_alt == images:
+                self.passed.append(f"All {images} images have alt text")
             else:
-                self.warnings.append(f"{len(images) - len(images_with_alt)} images missing alt text")
+                self.warnings.append(f"{images - images_with_alt} images missing alt text")
         else:
             self.warnings.append("No images found (images can improve engagement)")
     
@@ -288,7 +294,9 @@ def main():
         sys.exit(1)
     
     blog_file = sys.argv[1]
-    validator = BlogSEOValidator(blog_file)
+    # Reuse the metrics computed during manifest generation when the post is listed
+    manifest_metrics = load_manifest_metrics(Path(blog_file).parent / "manifest.json")
+    validator = BlogSEOValidator(blog_file, metrics=manifest_metrics.get(Path(blog_file).name))
     success, results = validator.validate()
     
     print(f"\n{'='*60}")
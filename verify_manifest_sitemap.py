@@ -2,10 +2,11 @@
 """Verify manifest and sitemap are in sync"""
 
 import json
-import re
 from pathlib import Path
 from datetime import datetime
 
+from sitemap_stream import SitemapReader, files_under
+
 print("=" * 70)
 print("MANIFEST & SITEMAP VERIFICATION REPORT")
 print("=" * 70)
@@ -21,16 +22,20 @@ print(f"   Last Updated: {manifest['lastUpdated']}")
 
 # Read sitemap
 sitemap_path = Path("sitemap.xml")
-with open(sitemap_path, 'r', encoding='utf-8') as f:
-    sitemap_content = f.read()
+sitemap = SitemapReader()
 
 # Extract blog post URLs from sitemap
-blog_post_urls = re.findall(r'<loc>https://tidiful\.com/blog/posts/([^<]+)</loc>', sitemap_content)
-static_urls = re.findall(r'<loc>https://tidiful\.com/blog/static/([^<]+)</loc>', sitemap_content)
+sitemap_files = files_under(sitemap.entries(sitemap_path), "/blog/posts/", "/blog/static/")
+blog_post_urls = sitemap_files["/blog/posts/"]
+static_urls = sitemap_files["/blog/static/"]
 
 print(f"\n[SITEMAP SUMMARY]")
 print(f"   Blog Post URLs: {len(blog_post_urls)}")
 print(f"   Static URLs: {len(static_urls)}")
+for error in sitemap.errors:
+    print(f"   [ERROR] {error}")
+for warning in sitemap.warnings:
+    print(f"   [WARNING] {warning}")
 
 # Check manifest posts
 print(f"\n[MANIFEST POSTS] ({len(manifest['posts'])})")
@@ -91,6 +96,8 @@ if orphaned:
     issues.append(f"⚠️  {len(orphaned)} orphaned entries in sitemap")
 if posts_without_excerpt:
     issues.append(f"❌ {posts_without_excerpt} posts missing excerpts")
+if sitemap.errors:
+    issues.append(f"❌ {len(sitemap.errors)} sitemap validation errors")
 
 if not issues:
     print("[SUCCESS] Everything is in sync!")
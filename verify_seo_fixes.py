@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 import os
+import re
+
+from content_metrics import load_manifest_metrics
 
 posts = [f for f in os.listdir('blog/posts') if f.endswith('.html')]
 print(f'Total posts: {len(posts)}')
@@ -16,5 +19,14 @@ print(f'Hreflang tags: {hreflang}/{len(posts)}')
 print(f'FAQ schema: {faq}/{len(posts)}')
 print(f'inLanguage: {inlang}/{len(posts)}')
 print(f'wordCount: {wordcount}/{len(posts)}')
+
+# wordCount values should match the metrics precomputed into the manifest
+manifest_metrics = load_manifest_metrics()
+accurate = 0
+for p in posts:
+    match = re.search(r'"wordCount":\s*"(\d+)"', open(f'blog/posts/{p}', encoding='utf-8').read())
+    if match and p in manifest_metrics and int(match.group(1)) == manifest_metrics[p]['wordCount']:
+        accurate += 1
+print(f'wordCount matches manifest: {accurate}/{len(posts)}')
 print(f'article:modified_time: {modified}/{len(posts)}')
 
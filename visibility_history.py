@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Append-only history of AI visibility sessions
+Stores every per-keyword, per-platform result in SQLite and keeps daily and
+weekly rollups up to date as sessions are recorded, so the dashboard reads a
+small pre-aggregated time series instead of raw session dumps.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    visibility_score REAL NOT NULL,
+    brand_mentions INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_time ON sessions (run_at);
+
+CREATE TABLE IF NOT EXISTS results (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    run_at TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    mentioned INTEGER,
+    sentiment TEXT,
+    confidence REAL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_keyword_time ON results (keyword, platform, run_at);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    queries INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    mentions INTEGER NOT NULL DEFAULT 0,
+    positive INTEGER NOT NULL DEFAULT 0,
+    negative INTEGER NOT NULL DEFAULT 0,
+    neutral INTEGER NOT NULL DEFAULT 0,
+    confidence_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, bucket, keyword, platform)
+);
+"""
+
+# Adding one result to its day and week buckets
+ROLLUP_UPSERT = """
+INSERT INTO rollups (period, bucket, keyword, platform, queries, failures, mentions,
+                     positive, negative, neutral, confidence_sum)
+VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (period, bucket, keyword, platform) DO UPDATE SET
+    queries = queries + 1,
+    failures = failures + excluded.failures,
+    mentions = mentions + excluded.mentions,
+    positive = positive + excluded.positive,
+    negative = negative + excluded.negative,
+    neutral = neutral + excluded.neutral,
+    confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+
+PERIODS = ("day", "week")
+COUNT_FIELDS = ("queries", "failures", "mentions", "positive", "negative", "neutral", "confidence_sum")
+
+def bucket_for(run_at: str, period: str) -> str:
+    """Start date of the day or ISO week a timestamp falls in"""
+    day = datetime.fromisoformat(run_at).date()
+    if period == "week":
+        day -= timedelta(days=day.weekday())
+    return day.isoformat()
+
+def downsample(points: List[Dict], max_points: int) -> List[Dict]:
+    """Merge adjacent buckets so a series has at most max_points points"""
+    if len(points) <= max_points:
+        return points
+
+    size = -(-len(points) // max_points)
+    merged = []
+    for i in range(0, len(points), size):
+        group = points[i:i + size]
+        point = {"t": group[0]["t"]}
+        for field in COUNT_FIELDS:
+            point[field] = sum(p[field] for p in group)
+        merged.append(point)
+    return merged
+
+def downsample_scores(points: List[Dict], max_points: int) -> List[Dict]:
+    """Average adjacent visibility scores so the series has at most max_points points"""
+    if len(points) <= max_points:
+        return points
+
+    size = -(-len(points) // max_points)
+    merged = []
+    for i in range(0, len(points), size):
+        group = points[i:i + size]
+        merged.append({"t": group[0]["t"],
+                       "visibility_score": round(sum(p["visibility_score"] for p in group) / len(group), 2)})
+    return merged
+
+def finish_point(point: Dict) -> Dict:
+    """Replace the confidence sum with rates the dashboard can plot directly"""
+    answered = point["queries"] - point["failures"]
+    point["mention_rate"] = round(point["mentions"] / answered, 3) if answered else None
+    point["avg_confidence"] = round(point.pop("confidence_sum") / answered, 3) if answered else None
+    return point
+
+class VisibilityHistory:
+    def __init__(self, db_file: str = ".build_cache/ai_visibility_history.db"):
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record_session(self, full_results: Dict, mode: str = "full", run_at: str = None) -> int:
+        """Append one monitoring session and fold its results into the rollups"""
+        run_at = run_at or full_results.get("generated_at") or datetime.now().isoformat(timespec='seconds')
+        metrics = full_results["monitoring_session"]["metrics"]
+
+        rows = []
+        for keyword_result in full_results["keyword_results"]:
+            for platform, result in keyword_result["platforms"].items():
+                rows.append((keyword_result["query"], platform, result))
+
+        with self.conn:
+            session_id = self.conn.execute(
+                "INSERT INTO sessions (run_at, mode, visibility_score, brand_mentions) VALUES (?, ?, ?, ?)",
+                (run_at, mode, metrics["visibility_score"], metrics["brand_mentions"])
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO results (session_id, run_at, keyword, platform, mentioned, sentiment, confidence, "
+                "cached, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(session_id, run_at, keyword, platform, result.get("mentioned"), result.get("sentiment"),
+                  result.get("confidence"), int(bool(result.get("cached"))), result.get("error"))
+                 for keyword, platform, result in rows]
+            )
+            upserts = []
+            for keyword, platform, result in rows:
+                failed = "error" in result
+                mentioned = not failed and result["mentioned"]
+                sentiment = result.get("sentiment") if mentioned else None
+                counts = (int(failed), int(mentioned), int(sentiment == "positive"),
+                          int(sentiment == "negative"), int(mentioned and sentiment not in ("positive", "negative")),
+                          0.0 if failed else result["confidence"])
+                for period in PERIODS:
+                    upserts.append((period, bucket_for(run_at, period), keyword, platform, *counts))
+            self.conn.executemany(ROLLUP_UPSERT, upserts)
+        return session_id
+
+    def series(self, period: str, group_by: str = None, since: str = None) -> Dict[str, List[Dict]]:
+        """Rollup buckets summed over keywords and/or platforms, oldest first
+
+        group_by is None (one "total" series), "keyword" or "platform".
+        """
+        if group_by not in (None, "keyword", "platform"):
+            raise ValueError(f"Cannot group rollups by {group_by!r}")
+        group = group_by or "'total'"
+        rows = self.conn.execute(f"""
+            SELECT {group} AS name, bucket AS t, SUM(queries) AS queries, SUM(failures) AS failures,
+                   SUM(mentions) AS mentions, SUM(positive) AS positive, SUM(negative) AS negative,
+                   SUM(neutral) AS neutral, SUM(confidence_sum) AS confidence_sum
+            FROM rollups WHERE period = ? AND bucket >= ?
+            GROUP BY name, bucket ORDER BY name, bucket
+        """, (period, since or "")).fetchall()
+
+        series = {}
+        for row in rows:
+            point = dict(row)
+            series.setdefault(point.pop("name"), []).append(point)
+        return series
+
+    def score_series(self, period: str, since: str = None) -> List[Dict]:
+        """Average visibility score per bucket across the sessions in it"""
+        buckets = {}
+        for row in self.conn.execute("SELECT run_at, visibility_score FROM sessions WHERE run_at >= ? ORDER BY run_at",
+                                     (since or "",)):
+            buckets.setdefault(bucket_for(row["run_at"], period), []).append(row["visibility_score"])
+        return [{"t": t, "visibility_score": round(sum(scores) / len(scores), 2)} for t, scores in buckets.items()]
+
+    def export_timeseries(self, output_file: str, period: str = "day", days: int = 180,
+                          max_points: int = 60) -> Dict:
+        """Write the dashboard's pre-aggregated, downsampled time series"""
+        since = (date.today() - timedelta(days=days)).isoformat()
+        latest = self.conn.execute(
+            "SELECT run_at, mode, visibility_score, brand_mentions FROM sessions ORDER BY run_at DESC, id DESC LIMIT 1"
+        ).fetchone()
+
+        def finish(points: List[Dict]) -> List[Dict]:
+            return [finish_point(p) for p in downsample(points, max_points)]
+
+        # Per-keyword series stay in the database; the dashboard ranks keywords over the
+        # window and shows the change between the last two buckets
+        keywords = {}
+        for keyword, points in self.series(period, "keyword", since).items():
+            totals = finish_point({"t": points[0]["t"], **{field: sum(p[field] for p in points)
+                                                           for field in COUNT_FIELDS}})
+            totals["recent_mentions"] = [p["mentions"] for p in points[-2:]]
+            keywords[keyword] = totals
+
+        data = {
+            "generated_at": datetime.now().isoformat(timespec='seconds'),
+            "period": period,
+            "since": since,
+            "latest_session": dict(latest) if latest else None,
+            "total": finish(self.series(period, since=since).get("total", [])),
+            "visibility_score": downsample_scores(self.score_series(period, since), max_points),
+            # Platform series only carry what the charts plot, which keeps the file small
+            "platforms": {name: [{key: p[key] for key in ("t", "queries", "mentions", "mention_rate")}
+                                 for p in finish(points)]
+                          for name, points in self.series(period, "platform", since).items()},
+            "keywords": dict(sorted(keywords.items(), key=lambda item: -item[1]["mentions"]))
+        }
+
+        path = Path(output_file)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        print(f"Time series ({period}, {len(data['total'])} points) written to {path}")
+        return data
+
+def main():
+    parser = argparse.ArgumentParser(description='Query AI visibility history')
+    parser.add_argument('query', choices=['export', 'sessions'], help='Query to run')
+    parser.add_argument('--db', default='.build_cache/ai_visibility_history.db', help='History database file')
+    parser.add_argument('--period', choices=PERIODS, default='day', help='Rollup period for export')
+    parser.add_argument('--days', type=int, default=180, help='Look-back window for export')
+    parser.add_argument('--output', default='ai_visibility_timeseries.json', help='Time series file for export')
+    args = parser.parse_args()
+
+    history = VisibilityHistory(args.db)
+
+    if args.query == 'export':
+        history.export_timeseries(args.output, args.period, args.days)
+    elif args.query == 'sessions':
+        for row in history.conn.execute("SELECT run_at, mode, visibility_score, brand_mentions FROM sessions "
+                                        "ORDER BY run_at DESC LIMIT 20"):
+            print(f"  {row['run_at']}  {row['mode']:<12} score {row['visibility_score']:g}  "
+                  f"mentions {row['brand_mentions']}")
+
+    history.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Keyword x platform x metric arrays for AI visibility scoring
+Materializes monitoring results once into NumPy arrays so scores, platform
+breakdowns, keyword rankings and percentiles are vectorized reductions
+instead of Python loops over nested result dicts.
+
+Reported numbers must stay identical to the dict-based formulas, so sums
+that feed rounded output are accumulated in keyword order (cumsum along
+axis 0) exactly like Python's sum(), and rounding uses Python's round().
+"""
+
+from functools import cached_property
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Metric axis of the values array
+MENTIONED, CONFIDENCE, SENTIMENT = range(3)
+SENTIMENT_CODES = {"positive": 1, "negative": -1}
+
+# Status of each keyword/platform cell
+OK, FAILED, MISSING = range(3)
+
+def ordered_sum(values: np.ndarray) -> np.ndarray:
+    """Sum along axis 0 in order, matching Python's sum() bit for bit"""
+    if len(values) == 0:
+        return np.zeros(values.shape[1:])
+    return np.cumsum(values, axis=0)[-1]
+
+def py_round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Round like Python's round(), which rounds the exact binary value
+
+    np.round scales first and can land on the other side of a tie (0.855
+    gives 0.86 instead of 0.85), so elements whose scaled value is within a
+    hair of .5 are rounded by round() itself; the rest agree exactly.
+    """
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_tie:
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+class VisibilityMatrix:
+    def __init__(self, keywords: List[str], platforms: List[str], values: np.ndarray, status: np.ndarray):
+        self.keywords = keywords
+        self.platforms = platforms
+        # values: keywords x platforms x (mentioned, confidence, sentiment code); zero where not OK
+        self.values = values
+        self.status = status
+
+    @classmethod
+    def from_results(cls, keyword_results: List[Dict[str, Any]], platforms: Sequence[str]) -> "VisibilityMatrix":
+        platforms = list(platforms)
+        shape = (len(keyword_results), len(platforms))
+        # Flat comprehensions over the cells convert far faster than per-cell array writes
+        cells = [result["platforms"].get(platform) for result in keyword_results for platform in platforms]
+        codes = [MISSING if cell is None else FAILED if "error" in cell else OK for cell in cells]
+        answered = [cell if code == OK else {} for cell, code in zip(cells, codes)]
+
+        values = np.empty((*shape, 3))
+        values[:, :, MENTIONED] = np.array([cell.get("mentioned", False) for cell in answered],
+                                           dtype=float).reshape(shape)
+        values[:, :, CONFIDENCE] = np.array([cell.get("confidence", 0) for cell in answered],
+                                            dtype=float).reshape(shape)
+        values[:, :, SENTIMENT] = np.array([SENTIMENT_CODES.get(cell.get("sentiment"), 0) for cell in answered],
+                                           dtype=float).reshape(shape)
+        status = np.array(codes, dtype=np.int8).reshape(shape)
+        return cls([r["query"] for r in keyword_results], platforms, values, status)
+
+    # The arrays are never modified after construction, so derived views are computed once
+    @cached_property
+    def mentioned(self) -> np.ndarray:
+        return self.values[:, :, MENTIONED] > 0
+
+    @property
+    def sentiment(self) -> np.ndarray:
+        return self.values[:, :, SENTIMENT]
+
+    @cached_property
+    def counts(self) -> Dict[str, np.ndarray]:
+        """Per-keyword mention counts by sentiment (same as each keyword's summary)"""
+        mentioned = self.mentioned
+        return {
+            "mentions": mentioned.sum(axis=1),
+            "positive": (mentioned & (self.sentiment > 0)).sum(axis=1),
+            "negative": (mentioned & (self.sentiment < 0)).sum(axis=1),
+            "neutral": (mentioned & (self.sentiment == 0)).sum(axis=1)
+        }
+
+    @cached_property
+    def keyword_confidence(self) -> np.ndarray:
+        """Per-keyword average confidence over answered platforms, rounded like the summary"""
+        answered = (self.status == OK).sum(axis=1)
+        totals = ordered_sum(self.values[:, :, CONFIDENCE].T)
+        averages = np.divide(totals, answered, out=np.zeros(len(self.keywords)), where=answered > 0)
+        return py_round(averages, 2)
+
+    def keyword_scores(self, platform_count: int) -> np.ndarray:
+        """Per-keyword score: share of platforms mentioning, boosted by positive mentions, times confidence"""
+        sentiment_bonus = 1.0 + (self.counts["positive"] * 0.2)
+        return (self.counts["mentions"] / platform_count) * sentiment_bonus * self.keyword_confidence
+
+    def visibility_score(self, weights: np.ndarray, platform_count: int) -> float:
+        """Weighted mean keyword score on a 0-10 scale"""
+        if not self.keywords:
+            return 0.0
+
+        total_score = ordered_sum(self.keyword_scores(platform_count) * weights)
+        total_weight = ordered_sum(weights)
+        return round((float(total_score) / float(total_weight)) * 10, 1) if total_weight > 0 else 0.0
+
+    def top_keywords(self, n: int = 5) -> List[str]:
+        """Keywords with the most mentions; ties keep their original order"""
+        order = np.argsort(-self.counts["mentions"], kind="stable")[:n]
+        return [self.keywords[i] for i in order]
+
+    def platform_breakdown(self) -> Dict[str, Dict[str, Any]]:
+        """Per-platform mentions, positive mentions, average confidence and 0-10 score
+
+        Failed queries are skipped; platforms absent from a keyword's results
+        count as answered without a mention.
+        """
+        counted = self.status != FAILED
+        mentioned = self.mentioned
+        mentions = mentioned.sum(axis=0)
+        positive = (mentioned & (self.sentiment > 0)).sum(axis=0)
+        counts = counted.sum(axis=0)
+        totals = ordered_sum(self.values[:, :, CONFIDENCE])
+        averages = np.divide(totals, counts, out=np.zeros(len(self.platforms)), where=counts > 0)
+
+        keyword_count = len(self.keywords) or 1
+        breakdown = {}
+        for p, platform in enumerate(self.platforms):
+            breakdown[platform] = {
+                "mentions": int(mentions[p]),
+                "positive_mentions": int(positive[p]),
+                "average_confidence": round(float(averages[p]), 2) if counts[p] > 0 else 0,
+                "performance_score": round((int(mentions[p]) / keyword_count) * 10, 1)
+            }
+        return breakdown
+
+    def score_percentiles(self, platform_count: int, percentiles=(50, 90)) -> Dict[str, float]:
+        """Nearest-rank percentiles of the per-keyword scores on a 0-10 scale"""
+        if not self.keywords:
+            return {}
+        scores = self.keyword_scores(platform_count) * 10
+        values = np.percentile(scores, percentiles, method="inverted_cdf")
+        return {f"p{pct}": round(float(value), 2) for pct, value in zip(percentiles, values)}